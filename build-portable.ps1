@@ -70,7 +70,7 @@ $TraySrc = Join-Path $ProjectRoot "tray_app"
 $TrayDst = Join-Path $BuildDir "tray_app"
 New-Item -ItemType Directory -Force -Path $TrayDst | Out-Null
 
-@("tray_manager.py", "icon_idle.ico", "icon_running.ico", "icon_error.ico") | ForEach-Object {
+@("tray_manager.py", "health_monitor.py", "output_pump.py", "log_store.py", "supervisor.py", "status_server.py", "icon_idle.ico", "icon_running.ico", "icon_error.ico") | ForEach-Object {
     Copy-Item -Force (Join-Path $TraySrc $_) (Join-Path $TrayDst $_) -ErrorAction SilentlyContinue
 }
 Write-Info "tray_app 폴더 복사됨"
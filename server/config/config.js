@@ -23,6 +23,19 @@ try {
 // Whisper 서버 URL
 export const WHISPER_SERVER_URL = process.env.WHISPER_SERVER_URL || "http://127.0.0.1:5001";
 
+// 트레이 앱 상태 엔드포인트 (프로세스 재시작 횟수, 가동 시간)
+export const TRAY_STATUS_URL = process.env.TRAY_STATUS_URL || "http://127.0.0.1:5002";
+
+// 서버 측 분할 전사 사용 여부 (Whisper /transcribe/long, 침묵 경계 분할 + 병렬 전사)
+// false로 설정하면 기존 방식 (Node에서 크기 기준 분할 후 순차 전사)
+export const SERVER_SIDE_CHUNKING = process.env.WHISPER_SERVER_SIDE_CHUNKING !== "false";
+
+// 전사 요청에 지정할 Whisper 모델 (예: tiny, small / 비우면 Whisper 서버의 기본 모델)
+export const WHISPER_REQUEST_MODEL = process.env.WHISPER_REQUEST_MODEL || "";
+
+// 전사 요청 언어 (auto: 강의 첫 청크에서 한 번 감지 후 같은 강의의 청크에 재사용 / ko, en 등 고정 / 비우면 Whisper 서버 기본값)
+export const WHISPER_REQUEST_LANGUAGE = process.env.WHISPER_REQUEST_LANGUAGE ?? "auto";
+
 // 기본 설정값
 export const MAX_CHUNK_SIZE_MB = 20;
 export const AUDIO_OPTIONS = {
@@ -34,6 +47,10 @@ export const AUDIO_OPTIONS = {
 
 export default {
   WHISPER_SERVER_URL,
+  TRAY_STATUS_URL,
+  SERVER_SIDE_CHUNKING,
+  WHISPER_REQUEST_MODEL,
+  WHISPER_REQUEST_LANGUAGE,
   MAX_CHUNK_SIZE_MB,
   AUDIO_OPTIONS
 };
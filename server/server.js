@@ -15,14 +15,15 @@ import { corsMiddleware } from "./middleware/cors.js";
 
 // 유틸리티
 import { convertToMp3, splitAudio } from "./utils/audioConverter.js";
-import { transcribeChunks } from "./utils/transcription.js";
+import { transcribeChunks, transcribeLong, cancelWhisperJob, indexTranscript } from "./utils/transcription.js";
+import { SERVER_SIDE_CHUNKING } from "./config/config.js";
 import { PerformanceTracker } from "./utils/performanceTracker.js";
 import { savePerformanceData } from "./utils/performanceLogger.js";
 
 // 서비스
 import { analyzeAndNormalizeTranscript, generateTimelineNote, generateStudyNote } from "./services/openaiService.js";
 import { generate3TabHtml } from "./services/htmlGenerator.js";
-import { readLogFile, getPerformanceData, getSystemMetrics, getServerStatus } from "./services/dashboardService.js";
+import { readLogFile, getPerformanceData, getSystemMetrics, getServerStatus, getWhisperMetrics, getSupervisorStatus } from "./services/dashboardService.js";
 
 // HTML 유틸리티
 function escapeHtml(str) {
@@ -67,6 +68,7 @@ app.use(express.urlencoded({ limit: '500mb', extended: true }));
 // ===== GLOBAL PROCESSING STATE =====
 const processingState = new Map();
 const cancelledSessions = new Set();
+const whisperJobs = new Map();  // sessionId → 진행 중인 Whisper 작업 ID (취소 시 Whisper 서버에 전달)
 
 /**
  * /api/cancel 엔드포인트 - 작업 취소
@@ -77,6 +79,14 @@ app.post("/api/cancel/:sessionId", (req, res) => {
   
   // 취소 목록에 추가
   cancelledSessions.add(sessionId);
+
+  // Whisper 서버에서 진행 중인 전사도 바로 중단 (다음 세그먼트 전에 디코딩 정지)
+  const jobId = whisperJobs.get(sessionId);
+  if (jobId) {
+    cancelWhisperJob(jobId).then(ok => {
+      console.log(`[${getKSTTimestamp()}] [INFO] [Server] Whisper job ${jobId} cancel ${ok ? 'requested' : 'failed'}`);
+    });
+  }
   
   // 상태 업데이트
   if (processingState.has(sessionId)) {
@@ -178,8 +188,13 @@ app.post("/process", upload.fields([{ name: 'file' }, { name: 'apiKey' }, { name
 
     const timestamp = Date.now();
     const isAlreadyMp3 = videoFile.originalname.toLowerCase().endsWith('.mp3');
-    const mp4Path = isAlreadyMp3 ? null : path.join(tmpDir, `raw-${timestamp}.mp4`);
-    const mp3Path = path.join(tmpDir, `audio-${timestamp}.mp3`);
+    // 서버 측 분할 사용 시 원본(영상)을 그대로 Whisper 서버로 전송
+    // (디코딩·16kHz 변환·침묵 제거는 Whisper 서버 전처리에서 한 번만 - 중간 MP3 없음)
+    const sendOriginal = SERVER_SIDE_CHUNKING && !isAlreadyMp3;
+    const sourceExt = path.extname(videoFile.originalname).toLowerCase() || '.mp4';
+    const mp4Path = isAlreadyMp3 ? null : path.join(tmpDir, `raw-${timestamp}${sendOriginal ? sourceExt : '.mp4'}`);
+    const mp3Path = sendOriginal ? null : path.join(tmpDir, `audio-${timestamp}.mp3`);
+    const audioPath = sendOriginal ? mp4Path : mp3Path;
     const chunkDir = path.join(tmpDir, `chunks-${timestamp}`);
 
     // 4. 비디오/오디오 저장
@@ -190,8 +205,14 @@ app.post("/process", upload.fields([{ name: 'file' }, { name: 'apiKey' }, { name
       fs.writeFileSync(mp3Path, videoFile.buffer);
       console.log(`[${getKSTTimestamp()}] [INFO] [Audio] MP3 file saved directly: ${mp3Path}`);
       perfTracker.endStage('download');
+    } else if (sendOriginal) {
+      // 원본 저장만 (오디오 추출은 Whisper 서버에서)
+      updateProgress(10, 'downloading', '비디오 처리 중...');
+      fs.writeFileSync(mp4Path, videoFile.buffer);
+      console.log(`[${getKSTTimestamp()}] [INFO] [Audio] Original file saved, audio extraction deferred to Whisper server: ${mp4Path}`);
+      perfTracker.endStage('download');
     } else {
-      // MP4인 경우 저장 후 변환
+      // MP4인 경우 저장 후 변환 (Node 측 분할용)
       updateProgress(10, 'downloading', '비디오 처리 중...');
       fs.writeFileSync(mp4Path, videoFile.buffer);
       perfTracker.endStage('download');
@@ -212,11 +233,11 @@ app.post("/process", upload.fields([{ name: 'file' }, { name: 'apiKey' }, { name
       perfTracker.endStage('audioConversion');
     }
 
-    // 6. 오디오 분할
+    // 6. 오디오 분할 (서버 측 분할 사용 시 Whisper 서버가 침묵 경계에서 분할)
     perfTracker.markStage('audioSplit', 'Audio splitting');
     console.log(`[${getKSTTimestamp()}] [INFO] [Audio] Splitting audio into chunks...`);
     updateProgress(20, 'processing', '오디오 분할 중...');
-    const chunks = await splitAudio(mp3Path, chunkDir);
+    const chunks = SERVER_SIDE_CHUNKING ? [audioPath] : await splitAudio(mp3Path, chunkDir);
     console.log(`[${getKSTTimestamp()}] [INFO] [Audio] Chunks created: ${chunks.length}`);
     perfTracker.endStage('audioSplit');
 
@@ -231,10 +252,23 @@ app.post("/process", upload.fields([{ name: 'file' }, { name: 'apiKey' }, { name
       throw new Error('CANCELLED');
     }
     
-    const result = await transcribeChunks(chunks);
-    console.log(`[${getKSTTimestamp()}] [INFO] [Transcribe] Transcription completed (chars=${result.text?.length || 0}, segments=${result.segments?.length || 0})`);
+    const result = SERVER_SIDE_CHUNKING
+      ? await transcribeLong(audioPath, sessionId, {
+          onJob: jobId => whisperJobs.set(sessionId, jobId),
+          onProgress: progress => updateProgress(
+            30 + Math.round((progress?.percent || 0) * 0.2), 'processing',
+            `음성 인식 중... (${Math.round(progress?.percent || 0)}%)`
+          ),
+          isCancelled: () => cancelledSessions.has(sessionId)
+        }).finally(() => whisperJobs.delete(sessionId))
+      : await transcribeChunks(chunks, sessionId);
+    const detection = result.languageDetection;
+    console.log(`[${getKSTTimestamp()}] [INFO] [Transcribe] Transcription completed (chars=${result.text?.length || 0}, segments=${result.segments?.length || 0}, lang=${result.language}${detection ? `/${detection.source}, detect=${detection.seconds}s` : ''})`);
     const transcript = result.text;
     const segments = result.segments;
+    if (result.timings) {
+      perfTracker.setBreakdown('transcription', result.timings);
+    }
     
     // 영상 길이 정보 저장 (마지막 세그먼트의 end 시간 = 실제 영상 길이)
     if (segments && segments.length > 0) {
@@ -242,6 +276,14 @@ app.post("/process", upload.fields([{ name: 'file' }, { name: 'apiKey' }, { name
       videoInfo.durationSeconds = Math.round(lastSegment.end);
       console.log(`[${getKSTTimestamp()}] [INFO] [Transcribe] Video duration: ${Math.floor(lastSegment.end / 60)}m ${Math.round(lastSegment.end % 60)}s`);
     }
+
+    // 강의 검색 인덱스에 저장 (Whisper 서버 /search, /lectures/{id}/at - 응답을 기다리지 않음)
+    indexTranscript(sessionId, {
+      title: videoInfo.filename,
+      segments,
+      language: result.language,
+      duration: videoInfo.durationSeconds,
+    });
     
     perfTracker.endStage('transcription');
 
@@ -560,7 +602,7 @@ function cleanupFiles(mp4Path, mp3Path, chunks, chunkDir) {
     const toDelete = new Set();
     toDelete.add(mp4Path);
     
-    if (!chunks.includes(mp3Path)) {
+    if (mp3Path && !chunks.includes(mp3Path)) {
       toDelete.add(mp3Path);
     }
     
@@ -568,7 +610,7 @@ function cleanupFiles(mp4Path, mp3Path, chunks, chunkDir) {
 
     toDelete.forEach(p => {
       try {
-        if (fs.existsSync(p)) fs.unlinkSync(p);
+        if (p && fs.existsSync(p)) fs.unlinkSync(p);
       } catch (e) {}
     });
 
@@ -595,13 +637,16 @@ app.get("/dashboard", (req, res) => {
 });
 
 /**
- * /api/logs/:type - 로그 파일 조회
- * @param type - whisper, whisper_error, nodejs, nodejs_error
+ * /api/logs/:type - 로그 조회 (트레이 앱 로그 버퍼 또는 파일 끝부분)
+ * @param type - whisper, whisper_error, nodejs, nodejs_error (워커: whisper-1, whisper-1_error, ...)
+ * @query maxLines - 최근 N줄 (기본 500)
+ * @query offset - 지정 시 이 줄 번호 이후의 새 줄만 (이전 응답의 nextOffset)
  */
-app.get("/api/logs/:type", (req, res) => {
+app.get("/api/logs/:type", async (req, res) => {
   const { type } = req.params;
-  const maxLines = parseInt(req.query.maxLines) || 500;
-  const logData = readLogFile(type, maxLines);
+  const maxLines = Math.min(parseInt(req.query.maxLines) || 500, 5000);
+  const offset = req.query.offset !== undefined ? parseInt(req.query.offset) || 0 : null;
+  const logData = await readLogFile(type, maxLines, offset);
   res.json(logData);
 });
 
@@ -610,16 +655,20 @@ app.get("/api/logs/:type", (req, res) => {
  */
 app.get("/api/metrics", async (req, res) => {
   try {
-    const [performance, system, serverStatus] = await Promise.all([
+    const [performance, system, serverStatus, whisper, supervisor] = await Promise.all([
       Promise.resolve(getPerformanceData()),
       Promise.resolve(getSystemMetrics()),
-      getServerStatus()
+      getServerStatus(),
+      getWhisperMetrics(),
+      getSupervisorStatus()
     ]);
 
     res.json({
       performance,
       system,
       serverStatus,
+      whisper,
+      supervisor,
       timestamp: new Date().toISOString()
     });
   } catch (err) {
@@ -628,6 +677,17 @@ app.get("/api/metrics", async (req, res) => {
   }
 });
 
+/**
+ * /api/supervisor - 트레이 앱 프로세스 감시 상태 (재시작 횟수, 가동 시간)
+ */
+app.get("/api/supervisor", async (req, res) => {
+  const supervisor = await getSupervisorStatus();
+  if (!supervisor) {
+    return res.status(503).json({ error: "Tray app status endpoint is not available" });
+  }
+  res.json(supervisor);
+});
+
 /**
  * /api/performance - 성능 데이터만 조회
  */
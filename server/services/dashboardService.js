@@ -6,32 +6,43 @@
 import fs from 'fs';
 import path from 'path';
 import os from 'os';
+import { TRAY_STATUS_URL } from '../config/config.js';
+
+// 로그 타입: whisper, nodejs, 워커 프로세스(whisper-1, ...) + 각각의 _error
+const LOG_TYPE_PATTERN = /^(whisper|nodejs)(-\d+)?(_error)?$/;
+const TAIL_BLOCK_BYTES = 64 * 1024;
 
 /**
- * 로그 파일 읽기
- * @param {string} logType - 로그 타입 (whisper, whisper_error, nodejs, nodejs_error)
+ * 로그 조회 - 트레이 앱 로그 버퍼(/logs)에서 최근 N줄, 트레이 없이 실행한 경우 파일 끝에서 N줄
+ * 어느 쪽이든 파일 전체를 읽지 않음 (O(요청 줄 수))
+ * @param {string} logType - 로그 타입 (whisper, whisper_error, nodejs, nodejs_error, whisper-1, ...)
  * @param {number} maxLines - 최대 라인 수
- * @returns {Object} 로그 데이터
+ * @param {number|null} offset - 지정 시 이 줄 번호 이후의 새 줄만 (트레이 버퍼 전용, 응답의 nextOffset 사용)
+ * @returns {Promise<Object>} 로그 데이터
  */
-export function readLogFile(logType, maxLines = 500) {
-  const logsDir = path.join(process.cwd(), '..', 'logs');
-  
-  const logFiles = {
-    'whisper': 'whisper.log',
-    'whisper_error': 'whisper_error.log',
-    'nodejs': 'nodejs.log',
-    'nodejs_error': 'nodejs_error.log'
-  };
-
-  const filename = logFiles[logType];
-  if (!filename) {
+export async function readLogFile(logType, maxLines = 500, offset = null) {
+  if (!LOG_TYPE_PATTERN.test(logType)) {
     return { error: 'Invalid log type', lines: [] };
   }
+  const filename = `${logType}.log`;
 
-  const filePath = path.join(logsDir, filename);
-  
+  const buffered = await readTrayLog(logType, maxLines, offset);
+  if (buffered) {
+    return {
+      filename,
+      exists: true,
+      source: 'buffer',
+      totalLines: buffered.total_lines,
+      lines: buffered.lines,
+      offset: buffered.offset,
+      nextOffset: buffered.next_offset,
+      dropped: buffered.dropped
+    };
+  }
+
+  const filePath = path.join(process.cwd(), '..', 'logs', filename);
   if (!fs.existsSync(filePath)) {
-    return { 
+    return {
       filename,
       exists: false,
       lines: [],
@@ -40,18 +51,14 @@ export function readLogFile(logType, maxLines = 500) {
   }
 
   try {
-    const content = fs.readFileSync(filePath, 'utf-8');
-    const lines = content.split('\n').filter(line => line.trim());
-    
-    // 최근 N개 라인만 반환
-    const recentLines = lines.slice(-maxLines);
-    
+    const { lines, size, mtime } = readFileTail(filePath, maxLines);
     return {
       filename,
       exists: true,
-      totalLines: lines.length,
-      lines: recentLines,
-      lastModified: fs.statSync(filePath).mtime
+      source: 'file',
+      sizeBytes: size,
+      lines,
+      lastModified: mtime
     };
   } catch (err) {
     return {
@@ -63,6 +70,62 @@ export function readLogFile(logType, maxLines = 500) {
   }
 }
 
+/**
+ * 트레이 앱 로그 버퍼 조회 (트레이 앱이 없거나 해당 로그가 없으면 null)
+ */
+async function readTrayLog(logType, maxLines, offset) {
+  try {
+    const params = new URLSearchParams({ name: logType });
+    if (offset !== null) {
+      params.set('offset', String(offset));
+      params.set('limit', String(maxLines));
+    } else {
+      params.set('tail', String(maxLines));
+    }
+    const controller = new AbortController();
+    const timeout = setTimeout(() => controller.abort(), 1000);
+    const response = await fetch(`${TRAY_STATUS_URL}/logs?${params}`, {
+      signal: controller.signal
+    });
+    clearTimeout(timeout);
+    return response.ok ? await response.json() : null;
+  } catch (err) {
+    return null;
+  }
+}
+
+/**
+ * 파일 끝에서부터 블록 단위로 읽어 마지막 maxLines줄 반환
+ */
+function readFileTail(filePath, maxLines) {
+  const fd = fs.openSync(filePath, 'r');
+  try {
+    const { size, mtime } = fs.fstatSync(fd);
+    const chunks = [];
+    let position = size;
+    let newlines = 0;
+    // 마지막 줄의 줄바꿈 + maxLines줄 앞의 줄바꿈까지 읽으면 충분
+    while (position > 0 && newlines <= maxLines) {
+      const length = Math.min(TAIL_BLOCK_BYTES, position);
+      position -= length;
+      const buffer = Buffer.alloc(length);
+      fs.readSync(fd, buffer, 0, length, position);
+      for (const byte of buffer) {
+        if (byte === 0x0a) newlines++;
+      }
+      chunks.unshift(buffer);
+    }
+    let text = Buffer.concat(chunks).toString('utf-8');
+    if (position > 0) {
+      text = text.slice(text.indexOf('\n') + 1);  // 잘린 첫 줄 제외
+    }
+    const lines = text.split('\n').filter(line => line.trim()).slice(-maxLines);
+    return { lines, size, mtime };
+  } finally {
+    fs.closeSync(fd);
+  }
+}
+
 /**
  * 성능 데이터 조회
  * @returns {Object} 성능 데이터
@@ -152,7 +215,7 @@ export function getSystemMetrics() {
 export async function getServerStatus() {
   const status = {
     nodejs: { running: true, port: 3000 },
-    whisper: { running: false, port: 5001, busy: false }
+    whisper: { running: false, ready: false, port: 5001, busy: false }
   };
 
   // Whisper 서버 확인 - 처리 중일 때는 응답이 늦을 수 있으므로 타임아웃 증가
@@ -166,6 +229,12 @@ export async function getServerStatus() {
     clearTimeout(timeout);
     
     status.whisper.running = response.ok;
+    if (response.ok) {
+      // 모델 로드·예열 중이면 running이지만 ready가 아님
+      const body = await response.json();
+      status.whisper.ready = body.ready === true;
+      status.whisper.startup = body.startup || null;
+    }
   } catch (err) {
     // 타임아웃 에러인 경우 - 서버가 바쁜 것으로 간주 (처리 중)
     if (err.name === 'AbortError') {
@@ -180,3 +249,70 @@ export async function getServerStatus() {
 
   return status;
 }
+
+/**
+ * Whisper 서버 메트릭 조회 (단계별 소요 시간, 대기열, 메모리)
+ * @returns {Promise<Object|null>} /metrics?format=json 응답 요약 (서버 미실행 시 null)
+ */
+export async function getWhisperMetrics() {
+  try {
+    const controller = new AbortController();
+    const timeout = setTimeout(() => controller.abort(), 3000);
+    const response = await fetch('http://127.0.0.1:5001/metrics?format=json', {
+      signal: controller.signal
+    });
+    clearTimeout(timeout);
+    if (!response.ok) {
+      return null;
+    }
+
+    const raw = await response.json();
+    const single = (name) => raw[name]?.[0]?.value ?? null;
+
+    // 단계별 평균/누적 시간 (upload, decode, vad, encoder, decoder, total)
+    const stages = {};
+    for (const entry of raw.whisper_stage_seconds || []) {
+      stages[entry.labels.stage] = {
+        count: entry.count,
+        totalSeconds: entry.sum,
+        meanSeconds: entry.mean
+      };
+    }
+
+    return {
+      stages,
+      queueDepth: single('whisper_queue_depth'),
+      inflight: single('whisper_inflight_requests'),
+      audioSeconds: (raw.whisper_audio_seconds_total || []).reduce((sum, e) => sum + e.value, 0),
+      modelLoadSeconds: Object.fromEntries(
+        (raw.whisper_model_load_seconds || []).map(e => [e.labels.model, e.value])
+      ),
+      rssBytes: single('process_resident_memory_bytes'),
+      cpuSeconds: single('process_cpu_seconds_total')
+    };
+  } catch (err) {
+    return null;
+  }
+}
+
+/**
+ * 트레이 앱 프로세스 감시 상태 조회 (재시작 횟수, 가동 시간, 마지막 종료 코드)
+ * 트레이 앱 없이 실행한 경우 null
+ * @returns {Promise<Object|null>} { processes: { whisper, nodejs }, servers }
+ */
+export async function getSupervisorStatus() {
+  try {
+    const controller = new AbortController();
+    const timeout = setTimeout(() => controller.abort(), 1000);
+    const response = await fetch(`${TRAY_STATUS_URL}/status`, {
+      signal: controller.signal
+    });
+    clearTimeout(timeout);
+    if (!response.ok) {
+      return null;
+    }
+    return await response.json();
+  } catch (err) {
+    return null;
+  }
+}
@@ -0,0 +1,147 @@
+"""
+JobStore / JobQueue 테스트 (두 워커 프로세스가 하나의 jobs.sqlite3를 공유하는 디스패처 구성)
+- 주기적 회수(recover)가 실행 중인 자기 작업을 queued로 되돌리지 않음 → 한 작업은 한 워커만 실행
+- 다른 워커로 들어온 취소가 실행 중인 워커에 전달되어 cancelled로 끝남
+- 주기적 회수는 heartbeat가 끊긴 작업만, 시작 시 회수는 자기 이전 실행의 작업도 queued로
+
+실행: python -m pytest server/test_jobs.py  (또는 server에서 python -m unittest test_jobs)
+"""
+
+import asyncio
+import io
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import whisper_jobs
+from whisper_jobs import CANCELLED, COMPLETED, QUEUED, RUNNING, JobQueue, JobStore
+
+WAIT_SECONDS = 10.0
+
+
+class BlockingRunner:
+    """release()될 때까지(또는 취소될 때까지) 실행되는 작업 실행기 - 워커별 실행 기록"""
+
+    def __init__(self, name: str, runs: list):
+        self.name = name
+        self.runs = runs
+        self.released = asyncio.Event()
+
+    async def __call__(self, job, store, guards):
+        self.runs.append((self.name, job.id))
+        while not self.released.is_set() and not guards.cancelled:
+            await asyncio.sleep(0.01)
+        return {} if guards.cancelled else {"text": self.name}
+
+
+@mock.patch.object(whisper_jobs, "JOB_POLL_SECONDS", 0.02)
+@mock.patch.object(whisper_jobs, "JOB_STALE_SECONDS", 0.2)
+class SharedStoreTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.jobs_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.jobs_dir, True)
+        self.runs = []
+        self.runners = {}
+        self.queues = {}
+        for owner in ("worker-a", "worker-b"):
+            self.runners[owner] = BlockingRunner(owner, self.runs)
+            self.queues[owner] = JobQueue(JobStore(self.jobs_dir), self.runners[owner], owner)
+            await self.queues[owner].start()
+
+    async def asyncTearDown(self):
+        for runner in self.runners.values():
+            runner.released.set()
+        for queue in self.queues.values():
+            await queue.shutdown()
+
+    def row(self, job_id: str) -> sqlite3.Row:
+        db = sqlite3.connect(str(Path(self.jobs_dir) / "jobs.sqlite3"))
+        db.row_factory = sqlite3.Row
+        try:
+            return db.execute("SELECT status, owner, attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            db.close()
+
+    async def wait_status(self, job_id: str, *statuses: str) -> sqlite3.Row:
+        deadline = time.monotonic() + WAIT_SECONDS
+        while time.monotonic() < deadline:
+            row = self.row(job_id)
+            if row["status"] in statuses:
+                return row
+            await asyncio.sleep(0.02)
+        self.fail(f"job {job_id} stayed {self.row(job_id)['status']}, expected {statuses}")
+
+    async def submit(self, owner: str = "worker-a") -> str:
+        job = await self.queues[owner].submit(io.BytesIO(b"audio"), "a.wav", "audio/wav", {})
+        return job.id
+
+    async def test_running_job_is_not_recovered(self):
+        job_id = await self.submit()
+        owner = (await self.wait_status(job_id, RUNNING))["owner"]
+
+        # 주기적 회수가 여러 번 돌 동안 (JOB_STALE_SECONDS의 5배) 계속 같은 워커가 실행
+        await asyncio.sleep(1.0)
+        row = self.row(job_id)
+        self.assertEqual((row["status"], row["owner"], row["attempts"]), (RUNNING, owner, 1))
+        self.assertEqual(self.runs, [(owner, job_id)])
+
+        self.runners[owner].released.set()
+        row = await self.wait_status(job_id, COMPLETED)
+        self.assertEqual(row["attempts"], 1)
+        self.assertEqual(self.queues[owner].store.result(job_id), {"text": owner})
+
+    async def test_cancel_from_other_worker(self):
+        job_id = await self.submit()
+        owner = (await self.wait_status(job_id, RUNNING))["owner"]
+        other = "worker-b" if owner == "worker-a" else "worker-a"
+        await asyncio.sleep(0.5)
+
+        self.assertEqual(await self.queues[other].cancel(job_id), whisper_jobs.CANCELLING)
+        await self.wait_status(job_id, CANCELLED)
+        self.assertEqual(self.queues[owner].cancelled, 1)
+        self.assertEqual(self.queues[owner].completed, 0)
+        self.assertEqual(self.runs, [(owner, job_id)])
+
+
+class RecoverTest(unittest.TestCase):
+    def setUp(self):
+        jobs_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, jobs_dir, True)
+        self.store = JobStore(jobs_dir)
+        self.addCleanup(self.store.close)
+
+    def running_job(self, owner: str, heartbeat_age: float) -> str:
+        job_id = self.store.create(io.BytesIO(b"audio"), "a.wav", "audio/wav", {}).id
+        self.assertEqual(self.store.claim(owner).id, job_id)
+        with self.store._transaction() as db:
+            db.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time() - heartbeat_age, job_id))
+        return job_id
+
+    def test_periodic_recover_only_takes_stale_jobs(self):
+        live = self.running_job("worker-a", 1)
+        dead = self.running_job("worker-dead", whisper_jobs.JOB_STALE_SECONDS + 60)
+
+        self.assertEqual(self.store.recover(), 1)
+        self.assertEqual(self.store.get(live).status, RUNNING)
+        self.assertEqual(self.store.get(dead).status, QUEUED)
+
+    def test_periodic_recover_skips_active_jobs(self):
+        slow = self.running_job("worker-a", whisper_jobs.JOB_STALE_SECONDS + 60)
+        self.assertEqual(self.store.recover(None, [slow]), 0)
+        self.assertEqual(self.store.get(slow).status, RUNNING)
+
+    def test_startup_recover_takes_own_jobs(self):
+        own = self.running_job("worker-a", 1)
+        other = self.running_job("worker-b", 1)
+
+        self.assertEqual(self.store.recover("worker-a"), 1)
+        self.assertEqual(self.store.get(own).status, QUEUED)
+        self.assertEqual(self.store.get(other).status, RUNNING)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -57,6 +57,21 @@ export class PerformanceTracker {
     }
   }
   
+  /**
+   * 단계 내부 세부 시간 기록 (예: Whisper 서버가 보고한 decode/vad/encoder/decoder 시간)
+   * @param {string} stageName - 단계 식별자
+   * @param {Object<string, number>} breakdown - 세부 항목별 시간 (초)
+   */
+  setBreakdown(stageName, breakdown) {
+    if (!this.stages[stageName]) {
+      console.warn(`[PerformanceTracker] Stage not found: ${stageName}`);
+      return;
+    }
+    this.stages[stageName].breakdown = Object.fromEntries(
+      Object.entries(breakdown).map(([key, seconds]) => [key, Math.round(seconds * 1000)])
+    );
+  }
+  
   /**
    * 모든 미완료 단계 종료
    */
@@ -84,7 +99,8 @@ export class PerformanceTracker {
       stagesWithPercentage[stageName] = {
         label: stage.label,
         duration: stage.duration,
-        percentage: totalTime > 0 ? ((stage.duration / totalTime) * 100).toFixed(1) : 0
+        percentage: totalTime > 0 ? ((stage.duration / totalTime) * 100).toFixed(1) : 0,
+        ...(stage.breakdown && { breakdown: stage.breakdown })
       };
     }
     
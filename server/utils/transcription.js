@@ -2,41 +2,95 @@ import FormData from "form-data";
 import axios from "axios";
 import fs from "fs";
 import path from "path";
-import { WHISPER_SERVER_URL } from "../config/config.js";
+import { WHISPER_SERVER_URL, WHISPER_REQUEST_MODEL, WHISPER_REQUEST_LANGUAGE } from "../config/config.js";
+
+// Whisper 대기열 포화(429) 시 재시도 설정
+const MAX_BUSY_RETRIES = 10;
+// Whisper 작업(/jobs) 폴링 설정
+const JOB_POLL_INTERVAL_MS = 2000;
+const JOB_MAX_POLL_FAILURES = 150;  // 연속 조회 실패 허용 횟수 (약 5분 - Whisper 서버 재시작 대기)
+const JOB_MAX_RETRIES = 1;  // 실패한 작업 재등록 횟수 (같은 오디오는 Whisper 체크포인트에서 이어서 전사)
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+/**
+ * 세션 ID → X-Lecture-Id 헤더 값 (Whisper 서버 허용 문자 [A-Za-z0-9_.:-], 최대 128자)
+ * @param {string|undefined} lectureId
+ * @returns {string|null}
+ */
+function toLectureHeader(lectureId) {
+  if (!lectureId) return null;
+  return String(lectureId).replace(/[^\w.:-]/g, "_").slice(0, 128);
+}
+
+/**
+ * 오디오 파일 하나를 Whisper 서버에 전송 (429 응답 시 Retry-After 만큼 대기 후 재시도)
+ * @param {string} filePath - 오디오 파일 경로
+ * @param {string} endpoint - Whisper 서버 엔드포인트 경로
+ * @param {string} [lectureId] - 강의(세션) ID - language=auto일 때 첫 청크에서 감지한 언어를 나머지 청크에 재사용
+ * @returns {Promise<import("axios").AxiosResponse>} Whisper 서버 응답
+ */
+async function postToWhisper(filePath, endpoint = "/transcribe", lectureId) {
+  const lectureHeader = toLectureHeader(lectureId);
+  for (let attempt = 0; ; attempt++) {
+    // FormData로 파일 전송 (스트림은 재사용 불가하므로 매 시도마다 새로 생성)
+    const form = new FormData();
+    const fileName = path.basename(filePath);
+    form.append('file', fs.createReadStream(filePath), {
+      filename: fileName,
+      // 원본 영상/오디오도 그대로 전송 (형식은 Whisper 서버가 내용으로 판별)
+      contentType: fileName.toLowerCase().endsWith('.mp3') ? 'audio/mpeg' : 'application/octet-stream'
+    });
+    if (WHISPER_REQUEST_MODEL) {
+      form.append('model', WHISPER_REQUEST_MODEL);
+    }
+    if (WHISPER_REQUEST_LANGUAGE) {
+      form.append('language', WHISPER_REQUEST_LANGUAGE);
+    }
+
+    // 로컬 Whisper 서버 호출
+    const response = await axios.post(`${WHISPER_SERVER_URL}${endpoint}`, form, {
+      headers: {
+        ...form.getHeaders(),
+        ...(lectureHeader ? { 'X-Lecture-Id': lectureHeader } : {}),
+      },
+      maxContentLength: Infinity,
+      maxBodyLength: Infinity,
+      responseType: "json",
+      validateStatus: () => true,
+    });
+
+    if (response.status !== 429 || attempt >= MAX_BUSY_RETRIES) {
+      return response;
+    }
+
+    const retryAfter = parseInt(response.headers['retry-after'], 10) || 5;
+    console.warn(`Whisper server busy, retrying in ${retryAfter}s (${attempt + 1}/${MAX_BUSY_RETRIES})`);
+    // eslint-disable-next-line no-await-in-loop
+    await sleep(retryAfter * 1000);
+  }
+}
 
 /**
  * 여러 chunk mp3를 Whisper로 전사해서 하나의 텍스트로 합치기
  * @param {string[]} chunkPaths - 분할된 오디오 파일 경로 배열
- * @returns {Promise<{text: string, segments: Array}>} 전체 텍스트 + 타임스탬프 세그먼트
+ * @param {string} [lectureId] - 강의(세션) ID (언어 감지는 첫 청크에서 한 번만)
+ * @returns {Promise<{text: string, segments: Array, duration: number, timings: Object, language: string|null, languageDetection: Object|null}>}
+ *   전체 텍스트 + 타임스탬프 세그먼트 + Whisper 단계별 시간 + 언어 (감지 비용·확률)
  */
-export async function transcribeChunks(chunkPaths) {
+export async function transcribeChunks(chunkPaths, lectureId) {
   let fullText = "";
   let allSegments = [];
   let index = 0;
   let cumulativeTime = 0; // 누적 시간 오프셋
+  const timings = {};     // Whisper 서버 단계별 시간 합계 (초)
+  let language = null;
+  let languageDetection = null;  // 첫 청크의 언어 결정 결과 (이후 청크는 캐시 재사용)
 
   for (const chunk of chunkPaths) {
     index += 1;
 
     try {
-      // FormData로 파일 전송
-      const form = new FormData();
-      const fileName = path.basename(chunk);
-      form.append('file', fs.createReadStream(chunk), {
-        filename: fileName,
-        contentType: 'audio/mpeg'
-      });
-
-      // 로컬 Whisper 서버 호출
-      const response = await axios.post(`${WHISPER_SERVER_URL}/transcribe`, form, {
-        headers: {
-          ...form.getHeaders(),
-        },
-        maxContentLength: Infinity,
-        maxBodyLength: Infinity,
-        responseType: "json",
-        validateStatus: () => true,
-      });
+      const response = await postToWhisper(chunk, "/transcribe", lectureId);
 
       if (response.status < 200 || response.status >= 300) {
         const errorText = typeof response.data === 'string' ? response.data : JSON.stringify(response.data);
@@ -46,6 +100,11 @@ export async function transcribeChunks(chunkPaths) {
       const result = response.data;
       const text = result.text;
       const segments = result.segments || [];
+      language = language || result.language || null;
+      languageDetection = languageDetection || result.language_detection || null;
+      for (const [stage, seconds] of Object.entries(result.timings || {})) {
+        timings[stage] = (timings[stage] || 0) + seconds;
+      }
       
       fullText += text + "\n";
       
@@ -72,6 +131,168 @@ export async function transcribeChunks(chunkPaths) {
   return {
     text: fullText.trim(),
     segments: allSegments,
-    duration: cumulativeTime // 전체 영상 길이 (초)
+    duration: cumulativeTime, // 전체 영상 길이 (초)
+    timings,
+    language,
+    languageDetection
   };
 }
+
+/**
+ * Whisper 작업 취소 (DELETE /jobs/{id}) - 실행 중이면 Whisper 서버가 다음 세그먼트 전에 디코딩을 멈춤
+ * @param {string} jobId - Whisper 작업 ID
+ * @returns {Promise<boolean>} 취소 요청 성공 여부
+ */
+export async function cancelWhisperJob(jobId) {
+  try {
+    const response = await axios.delete(`${WHISPER_SERVER_URL}/jobs/${jobId}`, { validateStatus: () => true });
+    return response.status >= 200 && response.status < 300;
+  } catch (err) {
+    console.warn(`Whisper job cancel failed (${jobId}):`, err.message);
+    return false;
+  }
+}
+
+/**
+ * 강의 전사를 Whisper 서버 검색 인덱스에 저장 (PUT /lectures/{id}/transcript)
+ * - 청크 모드 전사도 GET /search, GET /lectures/{id}/at으로 찾을 수 있도록 (서버 측 분할 작업은 Whisper 서버가
+ *   완료 시 이미 인덱싱 - 같은 ID로 다시 보내 제목을 원본 파일명으로 교체)
+ * - 실패해도 요약 처리에는 영향 없음
+ * @param {string} lectureId - 강의(세션) ID
+ * @param {{title?: string, segments: Array, language?: string|null, duration?: number}} transcript
+ * @returns {Promise<boolean>} 저장 성공 여부
+ */
+export async function indexTranscript(lectureId, { title, segments, language, duration }) {
+  const lectureHeader = toLectureHeader(lectureId);
+  if (!lectureHeader || !segments?.length) return false;
+  try {
+    const response = await axios.put(
+      `${WHISPER_SERVER_URL}/lectures/${encodeURIComponent(lectureHeader)}/transcript`,
+      {
+        title,
+        segments: segments.map(({ start, end, text }) => ({ start, end, text })),
+        language,
+        duration,
+      },
+      { maxBodyLength: Infinity, validateStatus: () => true }
+    );
+    if (response.status < 200 || response.status >= 300) {
+      console.warn(`Whisper transcript indexing failed (${lectureHeader}): ${response.status}`);
+      return false;
+    }
+    return true;
+  } catch (err) {
+    console.warn(`Whisper transcript indexing failed (${lectureHeader}):`, err.message);
+    return false;
+  }
+}
+
+/**
+ * Whisper 작업 상태 조회 (연결 실패·5xx는 null - Whisper 서버 재시작 중에도 작업은 유지되므로 다시 조회)
+ * @param {string} jobId
+ * @returns {Promise<Object|null>}
+ */
+async function fetchJob(jobId) {
+  let response;
+  try {
+    response = await axios.get(`${WHISPER_SERVER_URL}/jobs/${jobId}`, {
+      params: { segments: false },
+      responseType: "json",
+      validateStatus: () => true,
+    });
+  } catch (err) {
+    return null;
+  }
+  if (response.status === 404) {
+    throw new Error(`Whisper 작업을 찾을 수 없습니다 (${jobId})`);
+  }
+  return response.status >= 200 && response.status < 300 ? response.data : null;
+}
+
+/**
+ * 강의 전체 오디오를 Whisper 작업으로 전사 (서버 측 침묵 경계 분할 + 병렬 전사)
+ * - POST /jobs로 등록 후 완료될 때까지 GET /jobs/{id} 폴링 (긴 HTTP 요청 하나에 의존하지 않음)
+ * - Whisper 서버가 재시작되어도 작업은 마지막으로 기록된 세그먼트부터 이어서 진행
+ * - 작업이 실패하면 한 번 다시 등록 (이미 전사된 부분은 Whisper 체크포인트에서 재사용)
+ * - isCancelled()가 true가 되면 작업을 취소(DELETE)하고 'CANCELLED' 에러
+ * @param {string} audioPath - 전체 오디오(또는 원본 영상) 파일 경로
+ * @param {string} [lectureId] - 강의(세션) ID
+ * @param {Object} [options]
+ * @param {(jobId: string) => void} [options.onJob] - 작업 등록 직후 호출 (/api/cancel에서 바로 취소할 수 있도록)
+ * @param {(progress: Object) => void} [options.onProgress] - 진행률 {windows_done, windows_total, percent, ...}
+ * @param {() => boolean} [options.isCancelled] - 취소 여부
+ * @returns {Promise<{text: string, segments: Array, duration: number, timings: Object, language: string|null, languageDetection: Object|null}>}
+ *   전체 텍스트 + 전역 타임스탬프 세그먼트 + Whisper 단계별 시간 + 언어 (감지 비용·확률)
+ */
+export async function transcribeLong(audioPath, lectureId, options = {}) {
+  let job;
+  for (let attempt = 0; ; attempt += 1) {
+    // eslint-disable-next-line no-await-in-loop
+    job = await runWhisperJob(audioPath, lectureId, options);
+    if (job.status !== "failed" || attempt >= JOB_MAX_RETRIES) {
+      break;
+    }
+    console.warn(`Whisper 작업 실패 (${job.id}): ${job.error} - 다시 등록합니다`);
+  }
+  if (job.status === "failed") {
+    throw new Error(`Whisper 작업 실패 (${job.id}): ${job.error}`);
+  }
+
+  const result = job.result;
+  return {
+    text: (result.text || "").trim(),
+    segments: result.segments || [],
+    duration: result.duration || 0,
+    timings: result.timings || {},
+    language: result.language || null,
+    languageDetection: result.language_detection || null
+  };
+}
+
+/**
+ * Whisper 작업 등록 후 끝날 때까지 폴링 (completed | failed 작업 반환, 취소되면 'CANCELLED' 에러)
+ * @param {string} audioPath
+ * @param {string} [lectureId]
+ * @param {Object} [options] - transcribeLong과 동일
+ * @returns {Promise<Object>}
+ */
+async function runWhisperJob(audioPath, lectureId, { onJob, onProgress, isCancelled } = {}) {
+  const response = await postToWhisper(audioPath, "/jobs", lectureId);
+
+  if (response.status < 200 || response.status >= 300) {
+    const errorText = typeof response.data === 'string' ? response.data : JSON.stringify(response.data);
+    throw new Error(`Whisper 서버 응답 에러 (${response.status}): ${errorText}`);
+  }
+
+  const jobId = response.data.id;
+  onJob?.(jobId);
+
+  let failures = 0;
+  let job = response.data;
+  while (!["completed", "failed", "cancelled"].includes(job.status)) {
+    // eslint-disable-next-line no-await-in-loop
+    await sleep(JOB_POLL_INTERVAL_MS);
+    if (isCancelled?.()) {
+      // eslint-disable-next-line no-await-in-loop
+      await cancelWhisperJob(jobId);
+      throw new Error('CANCELLED');
+    }
+    // eslint-disable-next-line no-await-in-loop
+    const polled = await fetchJob(jobId);
+    if (!polled) {
+      failures += 1;
+      if (failures >= JOB_MAX_POLL_FAILURES) {
+        throw new Error(`Whisper 서버에서 작업 상태를 가져오지 못했습니다 (${jobId})`);
+      }
+      continue;
+    }
+    failures = 0;
+    job = polled;
+    onProgress?.(job.progress);
+  }
+
+  if (job.status === "cancelled") {
+    throw new Error('CANCELLED');
+  }
+  return job;
+}
@@ -0,0 +1,221 @@
+"""
+요청 간 마이크로 배칭
+- 동시에 들어온 전사 요청들의 VAD 구간(최대 30초 청크)을 짧은 시간 창 동안 모아
+  faster-whisper 배치 파이프라인(BatchedInferencePipeline)으로 한 번에 디코딩
+- 결과는 청크 단위로 원래 요청에 되돌려 줌
+- 추가 지연은 최대 BATCH_WINDOW_MS (배치가 가득 차면 즉시 실행)
+- 기본은 비활성화 (WHISPER_BATCH_WINDOW_MS=0): 배치 경로는 온도 fallback과 condition_on_previous_text가 없어
+  (첫 온도로 한 번만 디코딩) 순차 경로와 결과가 같지 않음
+"""
+
+import asyncio
+import functools
+import os
+from dataclasses import astuple, dataclass, fields
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from whisper_pool import InferencePool
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+    from faster_whisper.tokenizer import Tokenizer
+    from faster_whisper.transcribe import Segment, TranscriptionInfo, TranscriptionOptions
+
+# 요청을 모으는 시간 창 (ms, 0이면 배칭 비활성화 - 기본값)
+BATCH_WINDOW_MS = int(os.getenv("WHISPER_BATCH_WINDOW_MS", "0"))
+
+# 한 번에 디코딩할 최대 청크 수
+BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "8"))
+
+
+@dataclass
+class PreparedAudio:
+    """배치 디코딩 직전 상태 (VAD 청크별 특징 + 디코딩 설정)"""
+    features: List[np.ndarray]           # 청크별 log-mel 특징 (30초로 패딩)
+    chunks_metadata: List[Dict[str, Any]]  # 청크별 원본 오디오 기준 시작/끝 시각
+    tokenizer: "Tokenizer"
+    options: "TranscriptionOptions"
+    info: Optional["TranscriptionInfo"] = None
+    detection: Optional[Any] = None        # 언어 결정 방식 (whisper_language.LanguageDetection)
+    source: Optional[Any] = None           # 전처리 결과 (whisper_preprocess.PreprocessedAudio)
+
+
+@functools.lru_cache(maxsize=None)
+def _preparing_pipeline():
+    """
+    transcribe()의 전처리(VAD 분할, 특징 추출, 언어/옵션 결정)만 수행하는 파이프라인 클래스
+
+    faster-whisper==1.1.0 의 세그먼트 생성기 진입점을 가로채 디코딩 대신
+    준비된 입력을 돌려준다 (requirements.txt 버전 고정 전제).
+    faster-whisper는 첫 배치 요청 때 import한다.
+    """
+    from faster_whisper import BatchedInferencePipeline
+
+    class _PreparingPipeline(BatchedInferencePipeline):
+        def _batched_segments_generator(self, features, tokenizer, chunks_metadata,
+                                        batch_size, options, log_progress):
+            return PreparedAudio(list(features), chunks_metadata, tokenizer, options)
+
+    return _PreparingPipeline
+
+
+def prepare_audio(model: "WhisperModel", audio: np.ndarray, options: dict) -> PreparedAudio:
+    """
+    오디오를 배치 디코딩 입력으로 변환 (동기 - 추론 워커 스레드에서 실행)
+
+    BatchedInferencePipeline.transcribe()의 기본값 without_timestamps=True는 VAD 청크(최대 30초)마다
+    세그먼트 하나를 만들므로, 순차 경로처럼 문장 단위 세그먼트가 나오도록 타임스탬프 토큰을 켠다.
+    """
+    options = {**options, "without_timestamps": False}
+    prepared, info = _preparing_pipeline()(model).transcribe(audio, **options)
+    prepared.info = info
+    return prepared
+
+
+# 준비 단계(VAD 청크 분할)에서만 쓰이고 배치 디코딩에는 영향이 없는 옵션 (배치 키에서 제외)
+_PREPARE_ONLY_OPTIONS = {"clip_timestamps"}
+
+
+def _hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+
+def batch_key(model_name: str, tokenizer: "Tokenizer", options: "TranscriptionOptions") -> Hashable:
+    """
+    같은 배치로 묶을 수 있는 요청의 키 (모델 + 토크나이저 언어/작업 + 디코딩 옵션 전체)
+
+    배치는 마지막으로 들어온 요청의 tokenizer/options로 디코딩하므로, 이 중 하나라도 다른 요청은 섞지 않는다.
+    """
+    values = tuple(
+        (field.name, _hashable(value))
+        for field, value in zip(fields(options), astuple(options))
+        if field.name not in _PREPARE_ONLY_OPTIONS
+    )
+    return (model_name, tokenizer.language_code, tokenizer.task, values)
+
+
+def decode_batch(model: "WhisperModel", tokenizer: "Tokenizer", options: "TranscriptionOptions",
+                 items: List[Tuple[np.ndarray, Dict[str, Any]]]) -> List[List["Segment"]]:
+    """
+    여러 요청의 청크를 한 배치로 디코딩 (동기 - 추론 워커 스레드에서 실행)
+
+    Args:
+        items: [(특징, 청크 메타데이터), ...]
+
+    Returns:
+        청크별 세그먼트 목록 (타임스탬프는 각 요청의 원본 오디오 기준)
+    """
+    from faster_whisper import BatchedInferencePipeline
+    from faster_whisper.transcribe import Segment, Word
+
+    features = np.stack([feature for feature, _ in items])
+    chunks_metadata = [meta for _, meta in items]
+    outputs = BatchedInferencePipeline(model).forward(features, tokenizer, chunks_metadata, options)
+    return [
+        [
+            Segment(
+                id=0,
+                seek=seg["seek"],
+                start=round(seg["start"], 3),
+                end=round(seg["end"], 3),
+                text=seg["text"],
+                tokens=seg["tokens"],
+                avg_logprob=seg["avg_logprob"],
+                compression_ratio=seg["compression_ratio"],
+                no_speech_prob=seg["no_speech_prob"],
+                words=[Word(**w) for w in seg["words"]] if options.word_timestamps else None,
+                temperature=options.temperatures[0]
+            )
+            for seg in output
+        ]
+        for output in outputs
+    ]
+
+
+class MicroBatcher:
+    """
+    호환되는(같은 key) 항목을 시간 창 동안 모아 추론 풀에서 한 번에 실행
+
+    submit()한 항목은 BATCH_SIZE가 차거나 window_ms가 지나면 runner(items)로 실행되고,
+    결과는 항목 순서대로 각 호출자에게 돌아간다. 호출자가 취소한 항목은 실행 전에 제외된다.
+    """
+
+    def __init__(self, pool: InferencePool, batch_size: int = BATCH_SIZE,
+                 window_ms: int = BATCH_WINDOW_MS):
+        self.pool = pool
+        self.batch_size = max(1, batch_size)
+        self.window = max(0, window_ms) / 1000
+        self._pending: Dict[Hashable, List[Tuple[Any, asyncio.Future]]] = {}
+        self._runners: Dict[Hashable, Callable[[list], list]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self.batches = 0
+        self.items = 0
+        self.requests = 0
+        self.max_batch = 0
+
+    async def submit(self, key: Hashable, runner: Callable[[list], list], items: list) -> list:
+        """
+        항목 묶음을 배치 대기열에 넣고 결과를 기다림
+
+        Args:
+            key: 같은 배치로 묶을 수 있는 항목끼리 같은 값 (모델, 언어, 디코딩 옵션 등)
+            runner: 항목 목록 → 같은 길이의 결과 목록 (동기, 워커 스레드에서 실행)
+            items: 이 요청의 항목들
+        """
+        if not items:
+            return []
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in items]
+        pending = self._pending.setdefault(key, [])
+        pending.extend(zip(items, futures))
+        self._runners[key] = runner
+        self.requests += 1
+
+        if len(pending) >= self.batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+        return await asyncio.gather(*futures)
+
+    def _flush(self, key: Hashable):
+        """대기 중인 항목을 batch_size 단위로 잘라 실행"""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        pending = [(item, fut) for item, fut in self._pending.pop(key, []) if not fut.done()]
+        runner = self._runners.pop(key)
+        for i in range(0, len(pending), self.batch_size):
+            asyncio.ensure_future(self._run(runner, pending[i:i + self.batch_size]))
+
+    async def _run(self, runner: Callable[[list], list], batch: List[Tuple[Any, asyncio.Future]]):
+        self.batches += 1
+        self.items += len(batch)
+        self.max_batch = max(self.max_batch, len(batch))
+        try:
+            results = await self.pool.run(runner, [item for item, _ in batch])
+        except BaseException as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
+
+    def stats(self) -> dict:
+        """헬스 체크용 배칭 통계"""
+        return {
+            "window_ms": int(self.window * 1000),
+            "batch_size": self.batch_size,
+            "requests": self.requests,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch": self.max_batch
+        }
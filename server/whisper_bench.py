@@ -0,0 +1,632 @@
+#!/usr/bin/env python3
+"""
+Whisper 전사 서버 벤치마크
+- 길이별 고정 오디오 fixture를 생성하거나 폴더에서 불러와 전사
+- in-process (앱 엔드포인트 직접 호출) / HTTP (실행 중인 서버) 두 경로 지원
+- 모델 × compute type × 프로파일 × 동시성(1..N) 조합마다
+  실시간 배율(RTF), p50/p95/p99 지연, 처리량, 최대 RSS 측정
+- 서버/트레이 진입점 import 시간 프로파일 포함 (whisper_importtime.py, --import-only로 단독 실행)
+- 응답 형식별(json, orjson, msgpack, columnar) 직렬화 시간·크기 측정 (--formats-only로 단독 실행)
+- 결과를 JSON으로 저장하고 이전 결과와 비교 (--compare, 회귀 시 종료 코드 1)
+
+사용 예:
+    python whisper_bench.py --lengths 30,120 --concurrency 1,2,4 --profiles fast,balanced
+    python whisper_bench.py --mode http --url http://127.0.0.1:5001 --models tiny,base
+    python whisper_bench.py --fixtures ./lectures --compare .cache/bench/baseline.json
+    python whisper_bench.py --import-only --compare .cache/bench/baseline.json
+    python whisper_bench.py --formats-only --format-segments 1000,20000
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from whisper_importtime import format_summary, profile_entry_points
+
+SAMPLE_RATE = 16000
+REPO_ROOT = Path(__file__).parent.parent
+DEFAULT_OUTPUT_DIR = REPO_ROOT / '.cache' / 'bench'
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.m4a', '.flac', '.ogg', '.opus'}
+
+# import 시간 비교 시 무시할 절대 변화량 (ms, 측정 잡음)
+IMPORT_NOISE_MS = 20
+
+
+@dataclass
+class Fixture:
+    """벤치마크 입력 오디오"""
+    name: str
+    data: bytes
+    filename: str
+    duration: float
+
+
+# ---------------------------------------------------------------------------
+# 응답 직렬화
+# ---------------------------------------------------------------------------
+
+def synthetic_result(segments: int, words: bool) -> dict:
+    """직렬화 측정용 전사 결과 (세그먼트 3초, 강의 자막 길이의 한국어 텍스트, words=True면 단어 타임스탬프 포함)"""
+    phrase = ["오늘은", "트랜스포머의", "어텐션", "구조를", "살펴보겠습니다", "먼저", "쿼리와", "키를"]
+    items = []
+    for index in range(segments):
+        start = index * 3.0
+        tokens = [phrase[(index + k) % len(phrase)] for k in range(6)]
+        segment = {"start": round(start, 2), "end": round(start + 2.8, 2), "text": " ".join(tokens)}
+        if words:
+            segment["words"] = [
+                {"start": round(start + k * 0.45, 2), "end": round(start + k * 0.45 + 0.4, 2),
+                 "word": " " + token, "probability": round(0.8 + (index * 7 + k) % 20 / 100, 3)}
+                for k, token in enumerate(tokens)
+            ]
+        items.append(segment)
+    return {
+        "text": " ".join(segment["text"] for segment in items),
+        "segments": items,
+        "language": "ko",
+        "duration": round(segments * 3.0, 2),
+        "model": "base/int8",
+        "profile": "balanced",
+        "processing_time": 1.0,
+        "rtf": 0.1
+    }
+
+
+def measure_formats(counts: List[int], repeat: int) -> List[dict]:
+    """
+    응답 형식별 직렬화 시간(최소값)과 크기
+
+    baseline은 기존 JSONResponse와 같은 json.dumps 호출이다.
+    """
+    import whisper_formats as formats
+
+    def stdlib_json(payload):
+        return json.dumps(
+            payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+
+    encoders = [("baseline", stdlib_json), ("json", lambda p: formats.render(p, formats.JSON))]
+    encoders.append(("columnar", lambda p: formats.render(p, formats.COLUMNAR)))
+    if formats.msgpack is not None:
+        encoders.append(("msgpack", lambda p: formats.render(p, formats.MSGPACK)))
+        encoders.append(("columnar-msgpack", lambda p: formats.render(p, formats.COLUMNAR_MSGPACK)))
+
+    rows = []
+    for count, words in product(counts, (False, True)):
+        payload = synthetic_result(count, words)
+        base = None
+        for name, encode in encoders:
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                body = encode(payload)
+                best = min(best, time.perf_counter() - started)
+            row = {"segments": count, "words": words, "format": name,
+                   "ms": round(best * 1000, 2), "bytes": len(body)}
+            base = base or row
+            rows.append(row)
+            print(
+                f"format {name:<17} segments={count:<6} words={'y' if words else 'n'} "
+                f"{row['ms']:>8.2f}ms ({row['ms'] / base['ms'] if base['ms'] else 0:.2f}x) "
+                f"{row['bytes'] / 1024:>9.1f}KB ({row['bytes'] / base['bytes']:.2f}x)"
+            )
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Fixture
+# ---------------------------------------------------------------------------
+
+def synthetic_audio(seconds: float, seed: int = 0) -> np.ndarray:
+    """
+    발화/침묵이 번갈아 나오는 합성 오디오 (재현 가능, 난수 시드 고정)
+
+    실제 음성이 아니므로 인식 결과와 VAD 통과 비율은 의미가 없다.
+    파이프라인 처리량 비교용이며, 정확한 수치는 --fixtures / --seed-audio로 실제 강의를 사용한다.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    audio = np.zeros(total, dtype=np.float32)
+    pos = 0
+    while pos < total:
+        burst = int(rng.uniform(1.0, 4.0) * SAMPLE_RATE)
+        end = min(total, pos + burst)
+        t = np.arange(end - pos) / SAMPLE_RATE
+        pitch = rng.uniform(100, 220)
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(3, 6) * t)  # 음절 단위 진폭 변화
+        noise = rng.normal(0, 0.05, end - pos)
+        audio[pos:end] = (0.2 * voiced * envelope + noise).astype(np.float32)
+        pos = end + int(rng.uniform(0.3, 1.2) * SAMPLE_RATE)
+    return np.clip(audio, -1.0, 1.0)
+
+
+def tile_audio(seed: np.ndarray, seconds: float) -> np.ndarray:
+    """시드 오디오를 반복하여 원하는 길이로 만듦"""
+    total = int(seconds * SAMPLE_RATE)
+    reps = -(-total // max(1, len(seed)))
+    return np.tile(seed, reps)[:total]
+
+
+def to_wav_bytes(audio: np.ndarray) -> bytes:
+    """float32 배열 → 16kHz mono 16-bit WAV"""
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype('<i2')
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def load_fixtures(args) -> List[Fixture]:
+    """--fixtures 폴더의 오디오 또는 길이별 생성 오디오 (생성 결과는 디스크에 보관하여 재사용)"""
+    from faster_whisper.audio import decode_audio
+
+    if args.fixtures:
+        fixtures = []
+        for path in sorted(Path(args.fixtures).iterdir()):
+            if path.suffix.lower() not in AUDIO_EXTENSIONS:
+                continue
+            duration = len(decode_audio(str(path), sampling_rate=SAMPLE_RATE)) / SAMPLE_RATE
+            fixtures.append(Fixture(path.stem, path.read_bytes(), path.name, duration))
+        if not fixtures:
+            raise SystemExit(f"No audio fixtures found in {args.fixtures}")
+        return fixtures
+
+    seed = decode_audio(args.seed_audio, sampling_rate=SAMPLE_RATE) if args.seed_audio else None
+    fixture_dir = DEFAULT_OUTPUT_DIR / 'fixtures'
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+    kind = f"seed-{Path(args.seed_audio).stem}" if args.seed_audio else "synthetic"
+
+    fixtures = []
+    for seconds in args.lengths:
+        path = fixture_dir / f"{kind}-{seconds:g}s.wav"
+        if not path.exists():
+            audio = tile_audio(seed, seconds) if seed is not None else synthetic_audio(seconds)
+            path.write_bytes(to_wav_bytes(audio))
+        fixtures.append(Fixture(path.stem, path.read_bytes(), path.name, float(seconds)))
+    return fixtures
+
+
+# ---------------------------------------------------------------------------
+# 통계
+# ---------------------------------------------------------------------------
+
+def percentile(values: List[float], pct: float) -> float:
+    """선형 보간 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lo = int(rank)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo)
+
+
+def summarize(latencies: List[float], server_rtfs: List[float], fixture_seconds: float,
+              wall: float, errors: int, peak_rss: int) -> dict:
+    """한 조합의 측정 결과 요약"""
+    ok = len(latencies)
+    audio_seconds = fixture_seconds * ok
+    return {
+        "requests": ok + errors,
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "latency_p50": round(percentile(latencies, 50), 3),
+        "latency_p95": round(percentile(latencies, 95), 3),
+        "latency_p99": round(percentile(latencies, 99), 3),
+        "latency_mean": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "rtf": round(percentile(latencies, 50) / fixture_seconds, 4) if ok and fixture_seconds > 0 else 0.0,
+        "server_rtf": round(statistics.fmean(server_rtfs), 4) if server_rtfs else 0.0,
+        "throughput_rps": round(ok / wall, 3) if wall > 0 else 0.0,
+        "throughput_audio_x": round(audio_seconds / wall, 2) if wall > 0 else 0.0,  # 처리한 오디오 초 / 경과 초
+        "peak_rss_mb": round(peak_rss / (1024 * 1024), 1)
+    }
+
+
+# ---------------------------------------------------------------------------
+# 대상 (in-process / HTTP)
+# ---------------------------------------------------------------------------
+
+class InProcessTarget:
+    """
+    같은 프로세스에서 whisper_server 앱을 초기화하고 엔드포인트 함수를 직접 호출
+
+    HTTP 파싱/네트워크 비용을 제외한 서버 내부 경로(입장 제어, 풀, 배칭, 모델)를 측정한다.
+    결과 캐시는 비활성화된다.
+    """
+
+    def __init__(self, endpoint: str):
+        os.environ["WHISPER_RESULT_CACHE_MB"] = "0"
+        import whisper_server
+        self.server = whisper_server
+        self.endpoint = {
+            "/transcribe": whisper_server.transcribe_audio,
+            "/transcribe/long": whisper_server.transcribe_long_audio,
+        }[endpoint]
+        self._lifespan = None
+
+    async def __aenter__(self):
+        self._lifespan = self.server.lifespan(self.server.app)
+        await self._lifespan.__aenter__()
+        # 기본 모델 로드·예열은 백그라운드에서 진행되므로 준비될 때까지 대기
+        while not self.server.startup.ready:
+            if self.server.startup.error is not None:
+                raise RuntimeError(f"Server startup failed: {self.server.startup.error}")
+            await asyncio.sleep(0.1)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._lifespan.__aexit__(*exc)
+
+    def rss(self) -> int:
+        from whisper_resources import current_rss
+        return current_rss()
+
+    async def transcribe(self, fixture: Fixture, model: str, compute_type: str, profile: str) -> dict:
+        import inspect
+        from fastapi import HTTPException
+        from starlette.datastructures import Headers, UploadFile
+
+        upload = UploadFile(
+            file=io.BytesIO(fixture.data),
+            filename=fixture.filename,
+            headers=Headers({"content-type": "application/octet-stream"})
+        )
+        # Form/Header 기본값을 실제 값으로 채워 FastAPI 없이 호출
+        kwargs = {}
+        for name, param in inspect.signature(self.endpoint).parameters.items():
+            default = getattr(param.default, "default", param.default)
+            kwargs[name] = default if default is not inspect.Parameter.empty else None
+        kwargs.update(file=upload, model=model, compute_type=compute_type, profile=profile)
+        try:
+            response = await self.endpoint(**kwargs)
+        except HTTPException as e:
+            raise RuntimeError(f"HTTP {e.status_code}: {e.detail}")
+        return json.loads(response.body)
+
+
+class HttpTarget:
+    """실행 중인 Whisper 서버에 HTTP로 요청 (결과 캐시는 Cache-Control: no-cache로 우회)"""
+
+    def __init__(self, url: str, endpoint: str, concurrency: int):
+        import requests
+        self.url = url.rstrip("/")
+        self.endpoint = endpoint
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(10, concurrency))
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+
+    async def __aenter__(self):
+        await asyncio.get_running_loop().run_in_executor(self.executor, self._wait_ready)
+        return self
+
+    def _wait_ready(self, timeout: float = 600):
+        """/readyz가 200을 돌려줄 때까지 대기 (모델 로드·예열 중이면 503)"""
+        import requests
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                response = self.session.get(self.url + "/readyz", timeout=2)
+                if response.ok or response.status_code == 404:  # 404: /readyz 이전 버전 서버
+                    return
+                if response.json().get("status") == "failed":
+                    raise RuntimeError(f"Server startup failed: {response.json().get('error')}")
+            except requests.RequestException as e:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Server not reachable: {e}")
+            if time.monotonic() > deadline:
+                raise RuntimeError("Server did not become ready in time")
+            time.sleep(0.5)
+
+    async def __aexit__(self, *exc):
+        self.executor.shutdown(wait=False)
+        self.session.close()
+
+    def rss(self) -> int:
+        """서버 헬스 체크 응답의 rss_mb (서버 프로세스 기준)"""
+        try:
+            return int(self.session.get(self.url + "/", timeout=2).json().get("rss_mb", 0) * 1024 * 1024)
+        except Exception:
+            return 0
+
+    def _post(self, fixture: Fixture, model: str, compute_type: str, profile: str) -> dict:
+        response = self.session.post(
+            self.url + self.endpoint,
+            files={"file": (fixture.filename, fixture.data, "application/octet-stream")},
+            data={"model": model, "compute_type": compute_type, "profile": profile},
+            headers={"Cache-Control": "no-cache"},
+            timeout=3600
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    async def transcribe(self, fixture: Fixture, model: str, compute_type: str, profile: str) -> dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._post, fixture, model, compute_type, profile)
+
+
+class PeakRss:
+    """측정 구간 동안 대상의 RSS를 주기적으로 조회하여 최대값 기록"""
+
+    def __init__(self, target, interval: float = 0.2):
+        self.target = target
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bench-rss", daemon=True)
+
+    def __enter__(self):
+        self.peak = self.target.rss()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.target.rss())
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.target.rss())
+
+
+# ---------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------
+
+async def run_case(target, fixture: Fixture, model: str, compute_type: str, profile: str,
+                   concurrency: int, rounds: int) -> dict:
+    """동시성 concurrency로 fixture를 concurrency × rounds 회 전사"""
+    latencies, server_rtfs = [], []
+    errors = []
+    limiter = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with limiter:
+            started = time.perf_counter()
+            try:
+                result = await target.transcribe(fixture, model, compute_type, profile)
+            except Exception as e:
+                errors.append(str(e))
+                return
+            latencies.append(time.perf_counter() - started)
+            if "rtf" in result:
+                server_rtfs.append(result["rtf"])
+
+    with PeakRss(target) as rss:
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(concurrency * rounds)))
+        wall = time.perf_counter() - started
+
+    if errors:
+        print(f"  ! {len(errors)} errors, first: {errors[0]}", file=sys.stderr)
+    return summarize(latencies, server_rtfs, fixture.duration, wall, len(errors), rss.peak)
+
+
+async def run_benchmark(args) -> dict:
+    """모든 조합 실행 후 JSON 직렬화 가능한 결과 반환"""
+    imports = {}
+    if args.import_profile:
+        # 서버 import 전에 새 인터프리터에서 측정 (in-process 대상이 whisper_server를 import하기 전)
+        imports = profile_entry_points(args.import_repeat)
+        for summary in imports.values():
+            print(format_summary(summary))
+        print()
+    formats = []
+    if args.format_segments:
+        orjson_state = "orjson" if importlib.util.find_spec("orjson") else "stdlib json"
+        print(f"Response serialization ({orjson_state}, best of {args.format_repeat})")
+        formats = measure_formats(args.format_segments, args.format_repeat)
+        print()
+    if args.import_only or args.formats_only:
+        return {"meta": run_metadata(args), "imports": imports, "formats": formats, "results": []}
+
+    fixtures = load_fixtures(args)
+    max_concurrency = max(args.concurrency)
+    if args.mode == "http":
+        target = HttpTarget(args.url, args.endpoint, max_concurrency)
+    else:
+        target = InProcessTarget(args.endpoint)
+
+    results = []
+    async with target:
+        for model, compute_type, profile in product(args.models, args.compute_types, args.profiles):
+            if args.warmup:
+                # 모델 로드 + 첫 실행 비용 제외
+                try:
+                    await target.transcribe(fixtures[0], model, compute_type, profile)
+                except Exception as e:
+                    print(f"Skipping {model}/{compute_type}/{profile}: {e}", file=sys.stderr)
+                    continue
+            for fixture, concurrency in product(fixtures, args.concurrency):
+                stats = await run_case(target, fixture, model, compute_type, profile, concurrency, args.rounds)
+                case = {
+                    "mode": args.mode,
+                    "endpoint": args.endpoint,
+                    "model": model,
+                    "compute_type": compute_type,
+                    "profile": profile,
+                    "fixture": fixture.name,
+                    "audio_seconds": round(fixture.duration, 2),
+                    "concurrency": concurrency,
+                    **stats
+                }
+                results.append(case)
+                print(
+                    f"{model}/{compute_type} {profile:<8} {fixture.name:<24} c={concurrency:<3} "
+                    f"p50={stats['latency_p50']:.2f}s p95={stats['latency_p95']:.2f}s "
+                    f"rtf={stats['rtf']:.3f} x{stats['throughput_audio_x']:.1f} "
+                    f"rss={stats['peak_rss_mb']:.0f}MB"
+                )
+
+    return {"meta": run_metadata(args), "imports": imports, "formats": formats, "results": results}
+
+
+def run_metadata(args) -> dict:
+    """결과 비교에 필요한 실행 환경 정보"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except Exception:
+        commit = ""
+    try:
+        import faster_whisper
+        fw_version = faster_whisper.__version__
+    except Exception:
+        fw_version = ""
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "faster_whisper": fw_version,
+        "env": {k: v for k, v in os.environ.items() if k.startswith("WHISPER_")},
+        "args": {k: v for k, v in vars(args).items() if k not in ("compare", "output")}
+    }
+
+
+def case_key(case: dict) -> tuple:
+    return (case["mode"], case["endpoint"], case["model"], case["compute_type"],
+            case["profile"], case["fixture"], case["concurrency"])
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    """
+    기준 결과와 비교 출력
+
+    Returns:
+        p50 지연 또는 처리량이 threshold(%) 이상 나빠진 조합,
+        import 시간이 threshold(%)와 IMPORT_NOISE_MS 이상 늘었거나 무거운 패키지가 새로 import된 진입점이 있으면 True
+    """
+    base_cases = {case_key(c): c for c in baseline.get("results", [])}
+    regressed = False
+    print(f"\nCompared with {baseline.get('meta', {}).get('commit') or 'baseline'} (threshold {threshold:.0f}%)")
+    base_imports = baseline.get("imports", {})
+    for name, summary in current.get("imports", {}).items():
+        base = base_imports.get(name)
+        if not base or not base.get("total_ms") or not summary.get("total_ms"):
+            continue
+        delta_ms = summary["total_ms"] - base["total_ms"]
+        delta = (summary["total_ms"] / base["total_ms"] - 1) * 100
+        new_heavy = sorted(set(summary["heavy"]) - set(base.get("heavy", [])))
+        flag = (delta > threshold and delta_ms > IMPORT_NOISE_MS) or bool(new_heavy)
+        regressed = regressed or flag
+        print(
+            f"{'REGRESSION' if flag else 'ok':<10} import {name:<44} "
+            f"{summary['total_ms']:.0f}ms ({delta:+.1f}%)"
+            + (f"  new heavy imports: {', '.join(new_heavy)}" if new_heavy else "")
+        )
+    base_formats = {(f["segments"], f["words"], f["format"]): f for f in baseline.get("formats", [])}
+    for row in current.get("formats", []):
+        base = base_formats.get((row["segments"], row["words"], row["format"]))
+        if not base or not base["ms"]:
+            continue
+        delta = (row["ms"] / base["ms"] - 1) * 100
+        flag = delta > threshold and row["ms"] - base["ms"] > 1.0  # 1ms 미만 변화는 측정 잡음
+        regressed = regressed or flag
+        print(
+            f"{'REGRESSION' if flag else 'ok':<10} format {row['format']:<17} segments={row['segments']:<6} "
+            f"words={'y' if row['words'] else 'n'} {row['ms']:.2f}ms ({delta:+.1f}%)"
+        )
+    for case in current["results"]:
+        base = base_cases.get(case_key(case))
+        if base is None:
+            continue
+        latency_delta = (case["latency_p50"] / base["latency_p50"] - 1) * 100 if base["latency_p50"] else 0.0
+        throughput_delta = (
+            (case["throughput_audio_x"] / base["throughput_audio_x"] - 1) * 100
+            if base["throughput_audio_x"] else 0.0
+        )
+        flag = latency_delta > threshold or throughput_delta < -threshold
+        regressed = regressed or flag
+        print(
+            f"{'REGRESSION' if flag else 'ok':<10} {case['model']}/{case['compute_type']} "
+            f"{case['profile']:<8} {case['fixture']:<24} c={case['concurrency']:<3} "
+            f"p50 {latency_delta:+.1f}%  throughput {throughput_delta:+.1f}%"
+        )
+    return regressed
+
+
+def parse_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Whisper transcription server benchmark")
+    parser.add_argument("--mode", choices=["inproc", "http"], default="inproc",
+                        help="inproc: 앱 엔드포인트 직접 호출, http: 실행 중인 서버에 요청")
+    parser.add_argument("--url", default="http://127.0.0.1:5001", help="HTTP 모드 서버 주소")
+    parser.add_argument("--endpoint", choices=["/transcribe", "/transcribe/long"], default="/transcribe")
+    parser.add_argument("--models", type=parse_list, default=[os.getenv("WHISPER_MODEL", "base")])
+    parser.add_argument("--compute-types", type=parse_list, default=[os.getenv("WHISPER_COMPUTE", "int8")])
+    parser.add_argument("--profiles", type=parse_list, default=["balanced"])
+    parser.add_argument("--lengths", type=lambda v: [float(x) for x in parse_list(v)], default=[10.0, 60.0, 300.0],
+                        help="생성할 fixture 길이 (초)")
+    parser.add_argument("--fixtures", help="fixture 대신 사용할 오디오 폴더")
+    parser.add_argument("--seed-audio", help="지정 길이만큼 반복하여 fixture를 만들 실제 음성 파일")
+    parser.add_argument("--concurrency", type=lambda v: [int(x) for x in parse_list(v)], default=[1, 2, 4])
+    parser.add_argument("--rounds", type=int, default=2, help="동시성 단위 반복 횟수 (요청 수 = 동시성 × rounds)")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false")
+    parser.add_argument("--no-import-profile", dest="import_profile", action="store_false",
+                        help="진입점 import 시간 측정 생략")
+    parser.add_argument("--import-only", action="store_true", help="import 시간만 측정 (전사 생략)")
+    parser.add_argument("--import-repeat", type=int, default=5, help="import 시간 측정 반복 횟수 (최소값 사용)")
+    parser.add_argument("--format-segments", type=lambda v: [int(x) for x in parse_list(v)], default=[],
+                        help="응답 직렬화를 측정할 세그먼트 수 (예: 1000,20000, 생략 시 측정 안 함)")
+    parser.add_argument("--format-repeat", type=int, default=5, help="직렬화 측정 반복 횟수 (최소값 사용)")
+    parser.add_argument("--formats-only", action="store_true", help="응답 직렬화만 측정 (전사 생략)")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: .cache/bench/bench-<commit>-<time>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=10.0, help="회귀로 판단할 변화율 (%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.formats_only and not args.format_segments:
+        args.format_segments = [1000, 20000]
+    report = asyncio.run(run_benchmark(args))
+
+    output = Path(args.output) if args.output else (
+        DEFAULT_OUTPUT_DIR / f"bench-{report['meta']['commit'] or 'local'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if compare(baseline, report, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
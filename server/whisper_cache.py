@@ -0,0 +1,149 @@
+"""
+전사 결과 캐시 (content-addressed)
+- 키: 업로드 바이트 SHA-256 + 모델/디코딩 파라미터
+- 결과 JSON을 디스크에 저장하고, 총 용량 상한을 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+- 서버 재시작 후에도 유지 (파일 mtime을 마지막 사용 시각으로 사용)
+- 여러 워커 프로세스가 같은 폴더를 공유 (다른 프로세스가 저장한 항목은 조회 시 색인에 추가)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(audio_digest: str, params: dict) -> str:
+    """오디오 해시 + 파라미터(정렬된 JSON)로 캐시 키 생성"""
+    payload = audio_digest + "\n" + json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TranscriptionCache:
+    """디스크 기반 LRU 전사 결과 캐시 (스레드 안전)"""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key → 파일 크기 (오래된 순)
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_index()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self):
+        """디스크의 기존 항목을 마지막 사용 시각(mtime) 순으로 색인"""
+        files = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+                files.append((stat.st_mtime, path.stem, stat.st_size))
+            except OSError:
+                continue
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def get(self, key: str) -> Optional[dict]:
+        """캐시 조회 (적중 시 LRU 순서 갱신)"""
+        path = self._path(key)
+        with self._lock:
+            if key not in self._entries and not self._adopt(key, path):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path)  # 재시작 후에도 LRU 순서 유지
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cache entry unreadable, dropping: {key[:12]} - {e}")
+            self._discard(key)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result: dict):
+        """결과 저장 (원자적 교체) 후 용량 상한 초과분 삭제"""
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            data = json.dumps(result, ensure_ascii=False).encode("utf-8")
+            if len(data) > self.max_bytes:
+                return
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {key[:12]}: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _adopt(self, key: str, path: Path) -> bool:
+        """다른 워커 프로세스가 저장한 항목을 색인에 추가 (락 보유 상태에서 호출)"""
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return False
+        self._entries[key] = size
+        self._total_bytes += size
+        return True
+
+    def _discard(self, key: str):
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def _evict(self):
+        """용량 상한을 넘는 동안 가장 오래된 항목 삭제 (락 보유 상태에서 호출)"""
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        """헬스 체크용 캐시 통계"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,189 @@
+"""
+장시간 전사 체크포인트 (세그먼트 단위 이어서 하기)
+- 키: 업로드 바이트 SHA-256 + 모델/디코딩 파라미터 (결과 캐시와 같은 방식) + 창 범위(인코더 입력 기준 샘플)
+- 세그먼트 제너레이터를 소비하면서 세그먼트마다 기록 (세그먼트 + 디코딩을 마친 위치)
+- 같은 오디오·파라미터로 다시 요청하거나(재시도, 새 작업) 서버가 재시작되면
+  창마다 마지막으로 기록된 위치부터 이어서 디코딩 → 중단 시 잃는 작업은 진행 중이던 세그먼트 하나
+- 이어서 디코딩할 때는 기록된 마지막 문장들을 initial_prompt로 넘겨 문맥 유지
+- 전체 결과가 만들어지면 삭제 (결과 캐시/작업 결과가 대신함), 남은 체크포인트는 보관 기간 후 정리
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+CHECKPOINTS = os.getenv("WHISPER_CHECKPOINTS", "1") != "0"
+CHECKPOINT_TTL_SECONDS = float(os.getenv("WHISPER_CHECKPOINT_TTL_HOURS", "72")) * 3600  # 남은 체크포인트 보관 기간
+PROMPT_CHARS = 200  # 이어서 디코딩할 때 initial_prompt로 넘길 기록된 텍스트 길이 (끝부분)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    key TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    committed INTEGER NOT NULL,
+    segments INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL,
+    PRIMARY KEY (key, start, end)
+);
+CREATE TABLE IF NOT EXISTS checkpoint_segments (
+    key TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    segment TEXT NOT NULL,
+    PRIMARY KEY (key, start, end, seq)
+);
+"""
+
+
+@dataclass
+class WindowCheckpoint:
+    """
+    창 하나의 체크포인트 (start/end/committed: 인코더 입력 오디오 기준 샘플)
+
+    committed: 디코딩을 마친 위치 - 이어서 할 때 여기부터 디코딩
+    segments: 지금까지 기록된 세그먼트 (응답 형식, 원본 오디오 기준 시각)
+    """
+    store: "CheckpointStore"
+    key: str
+    start: int
+    end: int
+    committed: int
+    done: bool = False
+    segments: List[dict] = field(default_factory=list)
+
+    @property
+    def resumed(self) -> bool:
+        """이전 실행에서 기록된 진행분이 있는지"""
+        return self.done or self.committed > self.start
+
+    def prompt(self) -> Optional[str]:
+        """이어서 디코딩할 때 넘길 문맥 (기록된 텍스트 끝부분)"""
+        text = " ".join(segment["text"] for segment in self.segments[-8:]).strip()
+        return text[-PROMPT_CHARS:] or None
+
+    def commit(self, segment: dict, until: int):
+        """세그먼트 하나 기록 (until: 이 세그먼트까지 디코딩을 마친 위치)"""
+        self.segments.append(segment)
+        self.committed = max(self.committed, min(until, self.end))
+        self.store.append(self, segment)
+
+    def finish(self):
+        """창 디코딩 완료 - 다시 요청되면 디코딩 없이 기록된 세그먼트 반환"""
+        self.done = True
+        self.committed = self.end
+        self.store.mark_done(self)
+
+
+class CheckpointStore:
+    """SQLite 체크포인트 저장소 (스레드 안전, 여러 워커 프로세스가 같은 파일을 공유)"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            str(self.directory / "checkpoints.sqlite3"), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")  # 세그먼트마다 fsync하지 않음 (프로세스 crash에는 안전)
+        self._db.executescript(_SCHEMA)
+        self.resumed_windows = 0
+        self.commits = 0
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def window(self, key: str, start: int, end: int) -> WindowCheckpoint:
+        """창 체크포인트 불러오기 (없으면 창 시작 위치의 빈 체크포인트)"""
+        start, end = int(start), int(end)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT committed, done FROM checkpoints WHERE key = ? AND start = ? AND end = ?", (key, start, end)
+            ).fetchone()
+            if row is None:
+                return WindowCheckpoint(self, key, start, end, committed=start)
+            segments = [
+                json.loads(r["segment"]) for r in self._db.execute(
+                    "SELECT segment FROM checkpoint_segments WHERE key = ? AND start = ? AND end = ? ORDER BY seq",
+                    (key, start, end)
+                )
+            ]
+            self.resumed_windows += 1
+        return WindowCheckpoint(self, key, start, end, row["committed"], bool(row["done"]), segments)
+
+    def append(self, checkpoint: WindowCheckpoint, segment: dict):
+        with self._transaction() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO checkpoint_segments (key, start, end, seq, segment) VALUES (?, ?, ?, ?, ?)",
+                (checkpoint.key, checkpoint.start, checkpoint.end, len(checkpoint.segments) - 1,
+                 json.dumps(segment, ensure_ascii=False))
+            )
+            self._upsert(db, checkpoint)
+            self.commits += 1
+
+    def mark_done(self, checkpoint: WindowCheckpoint):
+        with self._transaction() as db:
+            self._upsert(db, checkpoint)
+
+    @staticmethod
+    def _upsert(db: sqlite3.Connection, checkpoint: WindowCheckpoint):
+        db.execute(
+            "INSERT INTO checkpoints (key, start, end, committed, segments, done, updated) VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (key, start, end) DO UPDATE SET committed = excluded.committed, "
+            "segments = excluded.segments, done = excluded.done, updated = excluded.updated",
+            (checkpoint.key, checkpoint.start, checkpoint.end, checkpoint.committed,
+             len(checkpoint.segments), int(checkpoint.done), time.time())
+        )
+
+    def discard(self, key: str):
+        """전체 결과가 만들어진 오디오의 체크포인트 삭제"""
+        with self._transaction() as db:
+            db.execute("DELETE FROM checkpoint_segments WHERE key = ?", (key,))
+            db.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+
+    def prune(self, ttl: float = CHECKPOINT_TTL_SECONDS) -> int:
+        """보관 기간 동안 갱신되지 않은 체크포인트 삭제 (오디오 단위)"""
+        cutoff = time.time() - ttl
+        with self._lock:
+            keys = [row["key"] for row in self._db.execute(
+                "SELECT key FROM checkpoints GROUP BY key HAVING MAX(updated) < ?", (cutoff,)
+            )]
+        for key in keys:
+            self.discard(key)
+        return len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COUNT(DISTINCT key) AS audios, COUNT(*) AS windows, COALESCE(SUM(segments), 0) AS segments "
+                "FROM checkpoints"
+            ).fetchone()
+            return {
+                "audios": row["audios"],
+                "windows": row["windows"],
+                "segments": row["segments"],
+                "resumed_windows": self.resumed_windows,
+                "commits": self.commits
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
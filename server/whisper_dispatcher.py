@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Whisper 워커 디스패처 (로컬 리버스 프록시)
+- 트레이가 Whisper 서버를 여러 프로세스(워커)로 실행할 때 5001 포트에서 요청을 받아 워커로 전달
+- 전사 요청마다 처리 중 요청이 가장 적은 준비된 워커 선택 (디코딩이 코어 수만큼 확장, 한 프로세스의 GIL이 상한이 되지 않음)
+- 표준 라이브러리 asyncio만 사용: 요청 헤더만 해석하고 본문/응답(SSE 포함)은 바이트 그대로 중계
+- 워커 /readyz를 주기적으로 확인해 준비된 워커에만 전달, /readyz는 워커 하나라도 준비되면 200
+
+사용 예:
+    python whisper_dispatcher.py --workers 5011,5012,5013
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='[%(asctime)s] [%(levelname)s] [Dispatcher] %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+HEADER_LIMIT = 64 * 1024     # 요청 줄 + 헤더 최대 크기 (초과 시 431)
+CHUNK_SIZE = 64 * 1024
+PROBE_TIMEOUT = 2.0
+FAST_PROBE_INTERVAL = 0.5    # 준비 안 된 워커가 있을 때 확인 주기 (초)
+PROBE_INTERVAL = 2.0
+
+DOWN = 'down'
+STARTING = 'starting'
+READY = 'ready'
+FAILED = 'failed'
+
+# 디스패처가 직접 응답하는 경로 (나머지는 모두 워커로 전달)
+LOCAL_PATHS = ('/livez', '/readyz', '/dispatcher')
+
+# 워커로 전달하지 않는 hop-by-hop 헤더 (연결은 요청마다 새로 열고 닫음)
+HOP_HEADERS = (b'connection', b'keep-alive', b'proxy-connection')
+
+
+@dataclass
+class Worker:
+    """워커 프로세스 하나의 상태 (디스패처 이벤트 루프에서만 변경)"""
+    port: int
+    host: str = '127.0.0.1'
+    state: str = DOWN
+    detail: str = ''
+    inflight: int = 0      # 전달 중인 요청 수 (최소 부하 선택 기준)
+    total: int = 0
+    errors: int = 0        # 연결 실패 수
+    checked_at: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'port': self.port,
+            'state': self.state,
+            'detail': self.detail,
+            'inflight': self.inflight,
+            'total': self.total,
+            'errors': self.errors,
+            'checked_at': self.checked_at
+        }
+
+
+class Dispatcher:
+    """최소 부하 워커로 HTTP 요청을 중계하는 asyncio 서버"""
+
+    def __init__(self, ports: List[int], host: str = '127.0.0.1'):
+        if not ports:
+            raise ValueError("at least one worker port is required")
+        self.workers = [Worker(port, host) for port in ports]
+        self.started = time.time()
+        self.rejected = 0      # 준비된 워커가 없어 503으로 응답한 요청 수
+        self._next = 0         # 부하가 같으면 돌아가며 선택
+
+    # ------------------------------------------------------------------
+    # 워커 선택 / 상태
+    # ------------------------------------------------------------------
+
+    def pick(self, exclude=()) -> Optional[Worker]:
+        """처리 중 요청이 가장 적은 준비된 워커 (없으면 None)"""
+        candidates = [w for w in self.workers if w.state == READY and w not in exclude]
+        if not candidates:
+            return None
+        self._next += 1
+        start = self._next % len(candidates)
+        return min(candidates[start:] + candidates[:start], key=lambda w: w.inflight)
+
+    def readiness(self) -> Tuple[int, dict]:
+        """/readyz 응답: 워커 하나라도 준비되면 200, 모두 실패하면 status=failed"""
+        ready = sum(1 for w in self.workers if w.state == READY)
+        body = {'workers': len(self.workers), 'workers_ready': ready}
+        if ready:
+            return 200, dict(body, status='ready')
+        failed = [w for w in self.workers if w.state == FAILED]
+        if len(failed) == len(self.workers):
+            return 503, dict(body, status=FAILED, error=failed[0].detail)
+        return 503, dict(body, status='loading')
+
+    def stats(self) -> dict:
+        return {
+            'workers': [w.to_dict() for w in self.workers],
+            'inflight': sum(w.inflight for w in self.workers),
+            'rejected': self.rejected,
+            'uptime_seconds': round(time.time() - self.started, 1)
+        }
+
+    # ------------------------------------------------------------------
+    # 워커 상태 확인
+    # ------------------------------------------------------------------
+
+    async def probe_loop(self):
+        while True:
+            await asyncio.gather(*(self._probe(w) for w in self.workers))
+            settled = all(w.state in (READY, FAILED) for w in self.workers)
+            await asyncio.sleep(PROBE_INTERVAL if settled else FAST_PROBE_INTERVAL)
+
+    async def _probe(self, worker: Worker):
+        previous = worker.state
+        try:
+            status, body = await asyncio.wait_for(self._get(worker, '/readyz'), PROBE_TIMEOUT)
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            worker.state, worker.detail = DOWN, type(e).__name__
+        else:
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                payload = {}
+            if status == 200:
+                worker.state, worker.detail = READY, ''
+            elif payload.get('status') == FAILED:
+                worker.state, worker.detail = FAILED, payload.get('error') or ''
+            else:
+                worker.state, worker.detail = STARTING, payload.get('status') or str(status)
+        worker.checked_at = time.time()
+
+        if worker.state != previous:
+            ready = sum(1 for w in self.workers if w.state == READY)
+            if worker.state == READY:
+                logger.info(f"Dispatch ready: worker {worker.port} ({ready}/{len(self.workers)} ready)")
+            else:
+                log = logger.info if worker.state == STARTING else logger.warning
+                log(f"Worker {worker.port} {previous} -> {worker.state} {worker.detail}".rstrip())
+            if self.readiness()[1]['status'] == FAILED:
+                logger.error(f"Dispatch failed: all workers failed ({worker.detail})")
+
+    @staticmethod
+    async def _get(worker: Worker, path: str) -> Tuple[int, bytes]:
+        reader, writer = await asyncio.open_connection(worker.host, worker.port)
+        try:
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {worker.host}:{worker.port}\r\n"
+                         f"Connection: close\r\n\r\n".encode('latin-1'))
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
+        head, _, body = response.partition(b'\r\n\r\n')
+        status_line = head.split(b'\r\n', 1)[0].split()
+        if len(status_line) < 2:
+            raise ValueError("malformed response")
+        return int(status_line[1]), body
+
+    # ------------------------------------------------------------------
+    # 요청 중계
+    # ------------------------------------------------------------------
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """클라이언트 연결 하나 = 요청 하나 (응답 후 연결 종료)"""
+        try:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except asyncio.LimitOverrunError:
+                return await self._respond(writer, 431, {'detail': 'Request header too large'})
+            except asyncio.IncompleteReadError:
+                return  # 요청 없이 끊긴 연결 (keep-alive 종료 등)
+
+            request_line, *header_lines = head[:-4].split(b'\r\n')
+            try:
+                method, target, version = request_line.decode('latin-1').split(' ', 2)
+            except ValueError:
+                return await self._respond(writer, 400, {'detail': 'Malformed request line'})
+            path = target.split('?', 1)[0]
+
+            if path in LOCAL_PATHS and method == 'GET':
+                return await self._local(writer, path)
+
+            upstream_head = self._rewrite(request_line, header_lines, writer)
+            tried = []
+            while True:
+                worker = self.pick(exclude=tried)
+                if worker is None:
+                    self.rejected += 1
+                    detail = 'Model not loaded yet' if not tried else 'No worker available'
+                    return await self._respond(writer, 503, {'detail': detail}, {'Retry-After': '5'})
+                try:
+                    return await self._proxy(worker, upstream_head, reader, writer)
+                except OSError as e:
+                    # 연결 단계 실패만 여기로 옴 (본문 전송 전) → 다른 워커로 재시도
+                    worker.errors += 1
+                    worker.state, worker.detail = DOWN, type(e).__name__
+                    logger.warning(f"Worker {worker.port} unreachable ({type(e).__name__}), retrying on another worker")
+                    tried.append(worker)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # 클라이언트가 중간에 끊음
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _rewrite(request_line: bytes, header_lines: List[bytes], client: asyncio.StreamWriter) -> bytes:
+        """hop-by-hop 헤더를 빼고 Connection: close, X-Forwarded-For 추가"""
+        headers = [line for line in header_lines
+                   if line.split(b':', 1)[0].strip().lower() not in HOP_HEADERS]
+        peer = client.get_extra_info('peername')
+        if peer:
+            headers.append(b'X-Forwarded-For: ' + str(peer[0]).encode('latin-1'))
+        headers.append(b'Connection: close')
+        return b'\r\n'.join([request_line, *headers]) + b'\r\n\r\n'
+
+    async def _proxy(self, worker: Worker, head: bytes, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter):
+        upstream_reader, upstream_writer = await asyncio.open_connection(worker.host, worker.port)
+        worker.inflight += 1
+        worker.total += 1
+        try:
+            upstream_writer.write(head)
+            await upstream_writer.drain()
+            # 요청 본문은 받는 대로 워커로, 응답은 워커가 연결을 닫을 때까지 클라이언트로
+            upload = asyncio.ensure_future(self._pipe(reader, upstream_writer))
+            try:
+                await self._pipe(upstream_reader, writer)
+            finally:
+                upload.cancel()
+                upload.add_done_callback(lambda task: task.cancelled() or task.exception())
+        except OSError:
+            pass  # 전달 도중 끊김은 재시도하지 않음 (본문 일부가 이미 전송됨)
+        finally:
+            worker.inflight -= 1
+            upstream_writer.close()
+
+    @staticmethod
+    async def _pipe(source: asyncio.StreamReader, sink: asyncio.StreamWriter):
+        while True:
+            chunk = await source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            sink.write(chunk)
+            await sink.drain()
+
+    async def _local(self, writer: asyncio.StreamWriter, path: str):
+        if path == '/livez':
+            return await self._respond(writer, 200, {'status': 'alive'})
+        if path == '/readyz':
+            status, body = self.readiness()
+            return await self._respond(writer, status, body, {} if status == 200 else {'Retry-After': '1'})
+        return await self._respond(writer, 200, self.stats())
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, body: dict, headers: Optional[dict] = None):
+        reasons = {200: 'OK', 400: 'Bad Request', 431: 'Request Header Fields Too Large',
+                   503: 'Service Unavailable'}
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        lines = [f"HTTP/1.1 {status} {reasons.get(status, '')}",
+                 "Content-Type: application/json",
+                 f"Content-Length: {len(data)}",
+                 "Connection: close"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + data)
+        await writer.drain()
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle, host, port, limit=HEADER_LIMIT)
+        ports = ', '.join(str(w.port) for w in self.workers)
+        logger.info(f"Dispatcher listening on {host}:{port} -> workers {ports}")
+        probe = asyncio.ensure_future(self.probe_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            probe.cancel()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Least-loaded dispatcher for Whisper worker processes")
+    parser.add_argument("--workers", required=True, help="워커 포트 목록 (쉼표 구분)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    args = parser.parse_args(argv)
+
+    ports = [int(port) for port in args.workers.split(",") if port.strip()]
+    try:
+        asyncio.run(Dispatcher(ports).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""
+전사 결과 응답 형식 (Accept 헤더 또는 ?format= 협상)
+- json: 기본 (orjson이 설치되어 있으면 orjson으로 직렬화)
+- msgpack: application/msgpack (msgpack 설치 시)
+- columnar: 세그먼트를 열 단위로 (SegmentColumns - start/end 숫자 열 + 텍스트 열)
+  - application/vnd.whisper.columnar+json: 열을 JSON 배열로 (세그먼트마다 키 이름을 반복하지 않음)
+  - application/vnd.whisper.columnar+msgpack: float32 열 + 하나의 UTF-8 텍스트 버퍼와 오프셋 (Arrow 스타일 little-endian 버퍼)
+- 세그먼트 수만큼 dict를 직렬화하는 비용과 응답 크기를 줄임 (단어 타임스탬프를 포함하면 효과가 큼)
+"""
+
+import json
+import sys
+from array import array
+from itertools import accumulate
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성 - 없으면 json 모듈
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성 - 없으면 msgpack 형식 비활성화 (406)
+    msgpack = None
+
+JSON = "json"
+MSGPACK = "msgpack"
+COLUMNAR = "columnar"
+COLUMNAR_MSGPACK = "columnar-msgpack"
+
+MEDIA_TYPES = {
+    JSON: "application/json",
+    MSGPACK: "application/msgpack",
+    COLUMNAR: "application/vnd.whisper.columnar+json",
+    COLUMNAR_MSGPACK: "application/vnd.whisper.columnar+msgpack",
+}
+_ACCEPT_ALIASES = {
+    **{media_type: name for name, media_type in MEDIA_TYPES.items()},
+    "application/x-msgpack": MSGPACK,
+    "application/*": JSON,
+    "*/*": JSON,
+}
+COLUMNAR_VERSION = "columnar/v1"
+
+
+class UnsupportedFormatError(ValueError):
+    """알 수 없는 형식 (HTTP 400) 또는 설치되지 않은 직렬화 라이브러리 (HTTP 406)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _le(values: array) -> bytes:
+    """열 버퍼를 little-endian 바이트로"""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _float32(values: array) -> bytes:
+    """float64 열 → float32 little-endian 버퍼 (4.5시간까지 1ms 이하 오차 - 읽는 쪽에서 소수 2자리로 반올림)"""
+    return _le(array("f", values))
+
+
+def _text_buffer(texts: List[str]) -> Tuple[bytes, bytes]:
+    """문자열 열 → (UTF-8 이어 붙인 버퍼, uint32 바이트 오프셋 n + 1개) - i번째 = buffer[offsets[i]:offsets[i + 1]]"""
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = array("I", [0])
+    offsets.extend(accumulate(len(item) for item in encoded))
+    return b"".join(encoded), _le(offsets)
+
+
+class WordColumns:
+    """단어 타임스탬프 열 (segment_offsets[i]:segment_offsets[i + 1] = i번째 세그먼트의 단어)"""
+    __slots__ = ("start", "end", "probability", "word", "segment_offsets")
+
+    def __init__(self, segments: List[dict]):
+        words = [word for segment in segments for word in segment.get("words") or ()]
+        self.start = array("d", [word["start"] for word in words])
+        self.end = array("d", [word["end"] for word in words])
+        self.probability = array("d", [word["probability"] for word in words])
+        self.word = [word["word"] for word in words]
+        self.segment_offsets = array("I", [0])
+        self.segment_offsets.extend(accumulate(len(segment.get("words") or ()) for segment in segments))
+
+    def words(self, index: int) -> List[dict]:
+        return [
+            {"start": self.start[i], "end": self.end[i], "word": self.word[i], "probability": self.probability[i]}
+            for i in range(self.segment_offsets[index], self.segment_offsets[index + 1])
+        ]
+
+    def to_json(self) -> dict:
+        return {
+            "count": len(self.word),
+            "start": self.start.tolist(),
+            "end": self.end.tolist(),
+            "word": self.word,
+            "probability": self.probability.tolist(),
+            "segment_offsets": self.segment_offsets.tolist()
+        }
+
+    def to_binary(self) -> dict:
+        text, offsets = _text_buffer(self.word)
+        return {
+            "count": len(self.word),
+            "start": _float32(self.start),
+            "end": _float32(self.end),
+            "probability": _float32(self.probability),
+            "text": text,
+            "text_offsets": offsets,
+            "segment_offsets": _le(self.segment_offsets)
+        }
+
+
+class SegmentColumns:
+    """
+    세그먼트 목록의 열 표현 (세그먼트마다 dict를 두지 않음)
+
+    start/end: array('d') 열 (응답 값 그대로, 바이너리 형식에서는 float32 버퍼)
+    text: 세그먼트 텍스트 열 (바이너리 형식에서는 하나의 UTF-8 버퍼 + 바이트 오프셋)
+    words: 단어 타임스탬프가 있으면 WordColumns
+    """
+    __slots__ = ("start", "end", "text", "words")
+
+    def __init__(self, segments: List[dict]):
+        self.start = array("d", [segment["start"] for segment in segments])
+        self.end = array("d", [segment["end"] for segment in segments])
+        self.text = [segment["text"] for segment in segments]
+        has_words = any("words" in segment for segment in segments)
+        self.words: Optional[WordColumns] = WordColumns(segments) if has_words else None
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[dict]) -> "SegmentColumns":
+        return cls(segments if isinstance(segments, list) else list(segments))
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def to_segments(self) -> List[dict]:
+        """응답 형식 세그먼트 목록으로 복원"""
+        segments = []
+        for index, text in enumerate(self.text):
+            segment = {"start": self.start[index], "end": self.end[index], "text": text}
+            if self.words is not None:
+                segment["words"] = self.words.words(index)
+            segments.append(segment)
+        return segments
+
+    def to_json(self) -> dict:
+        """columnar+json의 segments (열마다 JSON 배열)"""
+        result = {
+            "format": COLUMNAR_VERSION,
+            "count": len(self),
+            "start": self.start.tolist(),
+            "end": self.end.tolist(),
+            "text": self.text
+        }
+        if self.words is not None:
+            result["words"] = self.words.to_json()
+        return result
+
+    def to_binary(self) -> dict:
+        """columnar+msgpack의 segments (float32/uint32 little-endian 버퍼, UTF-8 텍스트 버퍼 + 바이트 오프셋)"""
+        text, offsets = _text_buffer(self.text)
+        result = {
+            "format": COLUMNAR_VERSION,
+            "count": len(self),
+            "start": _float32(self.start),
+            "end": _float32(self.end),
+            "text": text,
+            "text_offsets": offsets
+        }
+        if self.words is not None:
+            result["words"] = self.words.to_binary()
+        return result
+
+
+def negotiate(accept: Optional[str] = None, format: Optional[str] = None) -> str:
+    """
+    응답 형식 결정 (format 쿼리 우선, 없으면 Accept 헤더의 q값 순, 모르는 형식뿐이면 json)
+
+    Raises:
+        UnsupportedFormatError: 알 수 없는 format (400), msgpack 미설치 (406)
+    """
+    if format is not None:
+        name = format.strip().lower()
+        if name not in MEDIA_TYPES:
+            raise UnsupportedFormatError(f"Unknown format: {format} (available: {', '.join(MEDIA_TYPES)})")
+        return _available(name)
+
+    candidates = []
+    for position, part in enumerate((accept or "").split(",")):
+        media_type, _, params = part.strip().partition(";")
+        name = _ACCEPT_ALIASES.get(media_type.strip().lower())
+        if name is None:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    pass
+        if quality > 0:
+            candidates.append((-quality, position, name))
+    ranked = [name for _, _, name in sorted(candidates)]
+    for name in ranked:
+        if name not in (MSGPACK, COLUMNAR_MSGPACK) or msgpack is not None:
+            return name  # msgpack 미설치면 다음 선호 형식
+    return _available(ranked[0]) if ranked else JSON
+
+
+def _available(name: str) -> str:
+    if name in (MSGPACK, COLUMNAR_MSGPACK) and msgpack is None:
+        raise UnsupportedFormatError(f"{MEDIA_TYPES[name]} requires the msgpack package", status_code=406)
+    return name
+
+
+def columnarize(payload: dict) -> dict:
+    """payload의 segments (작업 조회 응답이면 result.segments 포함)를 SegmentColumns로 바꾼 사본"""
+    payload = dict(payload)
+    if isinstance(payload.get("segments"), list):
+        payload["segments"] = SegmentColumns.from_segments(payload["segments"])
+    if isinstance(payload.get("result"), dict):
+        payload["result"] = columnarize(payload["result"])
+    return payload
+
+
+def _dumps_json(payload: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, default=_json_default)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def _json_default(value):
+    if isinstance(value, SegmentColumns):
+        return value.to_json()
+    if isinstance(value, np.generic):  # numpy 스칼라 (json 모듈은 float 하위 클래스로 받지만 orjson은 거부)
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _msgpack_default(value):
+    if isinstance(value, SegmentColumns):
+        return value.to_binary()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+
+def render(payload: dict, name: str = JSON) -> bytes:
+    """응답 본문 직렬화"""
+    if name in (COLUMNAR, COLUMNAR_MSGPACK):
+        payload = columnarize(payload)
+    if name in (MSGPACK, COLUMNAR_MSGPACK):
+        return msgpack.packb(payload, use_bin_type=True, default=_msgpack_default)
+    return _dumps_json(payload)
@@ -0,0 +1,270 @@
+"""
+디코딩 예산 가드 (환각 반복 / 온도 fallback 폭주 방지)
+- 침묵·음악이 많은 구간에서 디코더가 같은 문구를 반복하거나 온도 fallback을 끝까지 돌면
+  창 하나의 디코딩 시간이 5~10배로 늘어나므로, 세그먼트가 나올 때마다 확인해 예산을 넘지 않게 함
+  - rtf: 30초 디코딩 창 하나에 걸린 시간이 WHISPER_MAX_SEGMENT_RTF × 30초 초과
+         → 남은 오디오는 온도 fallback 없이 (첫 온도만) 이어서 디코딩
+  - repetition: 세그먼트 안에서 같은 n-gram이 연속 반복되거나 같은 문장이 연속 세그먼트로 반복
+         → 세그먼트를 버리고 그 끝부터 이전 문맥 없이 이어서 디코딩
+  - compression_ratio: fallback을 다 거쳐도 압축률 임계값 초과 (반복 텍스트) → repetition과 동일하게 처리
+  - log_prob: 평균 log-prob 임계값 미만 (기록만, 세그먼트 유지)
+  - fallback: 온도 fallback이 일어난 창 수 (기록만)
+  - timeout: 요청 마감 시각이 지나면 그때까지의 세그먼트만 반환 (partial)
+- 작업 취소(DELETE /jobs/{id})도 같은 경로로 전달 → 디코딩 루프가 다음 세그먼트 전에 멈춤
+- 이어서 디코딩할 때는 원본 배열을 잘라(slice) 다시 전사하고 타임스탬프는 오프셋으로 보정
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Generator, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+    from faster_whisper.transcribe import Segment, TranscriptionInfo
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 30.0  # Whisper 디코딩 창 길이
+
+# faster-whisper fallback 임계값 (기본값은 faster-whisper와 동일, 프로파일 공통 옵션으로 전달)
+COMPRESSION_RATIO_THRESHOLD = float(os.getenv("WHISPER_COMPRESSION_RATIO_THRESHOLD", "2.4"))
+LOG_PROB_THRESHOLD = float(os.getenv("WHISPER_LOG_PROB_THRESHOLD", "-1.0"))
+NO_SPEECH_THRESHOLD = float(os.getenv("WHISPER_NO_SPEECH_THRESHOLD", "0.6"))
+
+MAX_SEGMENT_RTF = float(os.getenv("WHISPER_MAX_SEGMENT_RTF", "1.0"))   # 창 하나의 최대 실시간 배율 (0이면 비활성화)
+DECODE_TIMEOUT = float(os.getenv("WHISPER_DECODE_TIMEOUT", "0"))       # 요청 기본 마감 (초, 0이면 무제한)
+REPEAT_NGRAM = int(os.getenv("WHISPER_REPEAT_NGRAM", "8"))             # 반복 검사할 최대 n-gram 길이 (토큰)
+REPEAT_LIMIT = int(os.getenv("WHISPER_REPEAT_LIMIT", "5"))             # n-gram 연속 반복 허용 횟수 미만
+REPEAT_MIN_TOKENS = 12                                                  # 반복 구간 최소 토큰 수 (짧은 맞장구 제외)
+REPEAT_SEGMENTS = int(os.getenv("WHISPER_REPEAT_SEGMENTS", "3"))       # 같은 문장 연속 세그먼트 허용 개수 미만
+MAX_RESTARTS = 32                                                       # 요청당 이어서 디코딩 최대 횟수
+
+GUARDS = ("rtf", "repetition", "compression_ratio", "log_prob", "fallback", "timeout")
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+class InvalidBudgetError(ValueError):
+    """잘못된 timeout 값 (HTTP 400)"""
+
+
+@dataclass
+class DecodeGuards:
+    """요청 하나의 디코딩 예산과 가드 발동 횟수 (/transcribe/long 창들이 공유, 스레드 안전)"""
+    timeout: Optional[float] = None
+    max_rtf: float = MAX_SEGMENT_RTF
+    started: float = field(default_factory=time.monotonic)
+    fired: Dict[str, int] = field(default_factory=dict)
+    partial: bool = False
+    cancelled: bool = False
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def begin(self):
+        """마감 기준 시각을 지금으로 (입장 대기 시간은 예산에서 제외)"""
+        self.started = time.monotonic()
+
+    def fire(self, guard: str, count: int = 1):
+        with self._lock:
+            self.fired[guard] = self.fired.get(guard, 0) + count
+
+    def cancel(self):
+        """디코딩 중단 요청 (작업 취소, 서버 종료) - 이후 expired()가 True"""
+        with self._lock:
+            self.cancelled = True
+            self.partial = True
+
+    def expired(self) -> bool:
+        """마감 시각이 지났거나 취소됐는지 (마감이면 partial로 표시하고 timeout 한 번 기록)"""
+        if self.cancelled:
+            return True
+        if not self.timeout or time.monotonic() - self.started < self.timeout:
+            return False
+        with self._lock:
+            if not self.partial:
+                self.partial = True
+                self.fired["timeout"] = self.fired.get("timeout", 0) + 1
+        return True
+
+    def mark_partial(self):
+        with self._lock:
+            self.partial = True
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "fired": dict(self.fired),
+                "partial": self.partial,
+                "timeout": self.timeout,
+                "max_rtf": self.max_rtf
+            }
+
+
+def make_guards(timeout: Optional[float] = None) -> DecodeGuards:
+    """요청 timeout(초, 없으면 WHISPER_DECODE_TIMEOUT)으로 가드 생성"""
+    if timeout is None:
+        timeout = DECODE_TIMEOUT
+    if timeout < 0:
+        raise InvalidBudgetError("timeout must be >= 0 seconds (0 = no limit)")
+    return DecodeGuards(timeout=timeout or None)
+
+
+def has_ngram_loop(tokens: Sequence[int], max_n: int = REPEAT_NGRAM, limit: int = REPEAT_LIMIT) -> bool:
+    """같은 n-gram(n ≤ max_n)이 limit번 이상 연속 반복되는지 (토큰 ID 기준 - 띄어쓰기 없는 언어도 동일)"""
+    tokens = list(tokens)
+    length = len(tokens)
+    for n in range(1, max_n + 1):
+        needed = max(limit, -(-REPEAT_MIN_TOKENS // n))  # 반복 구간이 REPEAT_MIN_TOKENS 토큰 이상이어야 함
+        if n * needed > length:
+            break
+        for shift in range(n):  # 반복이 시작하는 위치가 n의 배수가 아닌 경우
+            run = 1
+            for i in range(shift + n, length - n + 1, n):
+                if tokens[i:i + n] == tokens[i - n:i]:
+                    run += 1
+                    if run >= needed:
+                        return True
+                else:
+                    run = 1
+    return False
+
+
+class RepetitionTracker:
+    """연속 세그먼트의 같은 문장 반복 추적"""
+
+    def __init__(self, limit: int = REPEAT_SEGMENTS):
+        self.limit = limit
+        self._last = None
+        self._count = 0
+
+    def check(self, segment: "Segment") -> Optional[str]:
+        """버려야 할 세그먼트면 가드 이름 (repetition | compression_ratio), 아니면 None"""
+        if segment.compression_ratio > COMPRESSION_RATIO_THRESHOLD:
+            return "compression_ratio"
+        if has_ngram_loop(segment.tokens):
+            return "repetition"
+        key = _NON_WORD.sub("", segment.text).lower()
+        if key and key == self._last:
+            self._count += 1
+            if self._count >= self.limit:
+                return "repetition"
+        else:
+            self._last, self._count = key, 1
+        return None
+
+
+def screen_segments(segments: List["Segment"], guards: DecodeGuards) -> List["Segment"]:
+    """반복/압축률 가드만 적용해 세그먼트 거르기 (배치 경로 - 이어서 디코딩하지 않음)"""
+    tracker = RepetitionTracker()
+    kept = []
+    for segment in segments:
+        guard = tracker.check(segment)
+        if guard is not None:
+            guards.fire(guard)
+            continue
+        if segment.avg_logprob < LOG_PROB_THRESHOLD:
+            guards.fire("log_prob")
+        kept.append(segment)
+    return kept
+
+
+class GuardedSegments:
+    """
+    가드를 적용한 (세그먼트, 타임스탬프 오프셋 초) 지연 생성기
+
+    completed: 다 순회한 뒤 오디오 끝까지 디코딩했으면 True (마감·취소·재시작 한도로 멈췄거나 순회 중이면 False)
+    """
+
+    def __init__(self, segments: Generator[Tuple["Segment", float], None, bool]):
+        self._segments = segments
+        self.completed = False
+
+    def __iter__(self) -> Iterator[Tuple["Segment", float]]:
+        self.completed = yield from self._segments
+
+
+def transcribe_guarded(model: "WhisperModel", audio: np.ndarray, options: dict,
+                       guards: DecodeGuards) -> Tuple[GuardedSegments, "TranscriptionInfo"]:
+    """
+    가드를 적용한 전사 (동기 - 추론 워커 스레드에서 실행)
+
+    Returns:
+        ((세그먼트, 타임스탬프 오프셋 초) 지연 생성기, 전체 오디오의 TranscriptionInfo)
+    """
+    segments, info = model.transcribe(audio, **options)
+    return GuardedSegments(_guarded(model, audio, dict(options), guards, segments)), info
+
+
+def _guarded(model: "WhisperModel", audio: np.ndarray, options: dict, guards: DecodeGuards,
+             segments: Iterator["Segment"]) -> Generator[Tuple["Segment", float], None, bool]:
+    offset = 0        # 현재 생성기의 원본 기준 시작 샘플
+    restarts = 0
+    tracker = RepetitionTracker()
+    temperatures = options.get("temperature", (0.0, 0.2, 0.4, 0.6, 0.8, 1.0))
+    if isinstance(temperatures, (int, float)):
+        temperatures = [temperatures]
+    fallback = len(temperatures) > 1
+
+    while True:
+        restart_at = None
+        seek = None
+        try:
+            while not guards.expired():
+                # 새 창의 첫 세그먼트면 next()가 그 창의 인코딩 + 디코딩(fallback 포함) 시간
+                before = time.monotonic()
+                segment = next(segments, None)
+                if segment is None:
+                    return True
+                window_seconds = time.monotonic() - before
+                new_window = segment.seek != seek
+                seek = segment.seek
+                if new_window and segment.temperature != temperatures[0]:
+                    guards.fire("fallback")
+
+                guard = tracker.check(segment)
+                if guard is not None:
+                    # 반복은 이전 문맥(prompt)으로 이어지므로 문맥 없이 세그먼트 끝부터 다시 디코딩
+                    guards.fire(guard)
+                    options["condition_on_previous_text"] = False
+                    restart_at = segment.end
+                    break
+                if new_window and segment.avg_logprob < LOG_PROB_THRESHOLD:
+                    guards.fire("log_prob")
+
+                yield segment, offset / SAMPLE_RATE
+
+                if (new_window and fallback and guards.max_rtf > 0
+                        and window_seconds > guards.max_rtf * WINDOW_SECONDS):
+                    # 창 하나가 예산을 넘음 (fallback 반복) → 남은 오디오는 첫 온도로만 디코딩
+                    guards.fire("rtf")
+                    logger.warning(
+                        f"Decode window took {window_seconds:.1f}s (>{guards.max_rtf}x of {WINDOW_SECONDS:.0f}s), "
+                        f"disabling temperature fallback after {offset / SAMPLE_RATE + segment.end:.1f}s"
+                    )
+                    options["temperature"] = [temperatures[0]]
+                    fallback = False
+                    restart_at = segment.end
+                    break
+        finally:
+            close = getattr(segments, "close", None)
+            if close is not None:
+                close()
+
+        if restart_at is None:
+            return False  # 마감
+        restarts += 1
+        start = offset + max(int(restart_at * SAMPLE_RATE), SAMPLE_RATE // 2)  # 최소 0.5초 전진
+        if restarts > MAX_RESTARTS or start >= len(audio) - SAMPLE_RATE // 10:
+            if restarts > MAX_RESTARTS:
+                logger.warning(f"Decode guard restart limit reached at {start / SAMPLE_RATE:.1f}s, stopping")
+                guards.mark_partial()
+                return False
+            return True
+        offset = start
+        segments, _ = model.transcribe(audio[offset:], **options)
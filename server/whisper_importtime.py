@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+모듈 import 시간 프로파일 (-X importtime 요약)
+- 대상 모듈을 새 인터프리터에서 `python -X importtime -c "import <모듈>"`로 import하고 stderr 파싱
+- 최상위 패키지별 시간(self 합계), 전체 import 시간, 시작 경로에 들어오면 안 되는 무거운 패키지 검출
+- 여러 번 실행해 전체 시간이 가장 짧은 실행을 보고 (디스크 캐시·스케줄링 잡음 제외, whisper_bench.py 결과에 포함)
+
+사용 예:
+    python whisper_importtime.py whisper_server
+    python whisper_importtime.py tray_manager --path ../tray_app --top 15
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SERVER_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SERVER_DIR.parent
+
+# 서버/트레이 시작 경로에서 import되면 안 되는 패키지 (모델 로드·요청 처리 시점에만 필요)
+HEAVY_PACKAGES = ("faster_whisper", "ctranslate2", "tokenizers", "av", "onnxruntime", "huggingface_hub")
+
+# 벤치마크에서 확인하는 진입점: 이름 → (모듈, sys.path에 추가할 폴더)
+ENTRY_POINTS = {
+    "whisper_server": ("whisper_server", SERVER_DIR),
+    "tray_manager": ("tray_manager", REPO_ROOT / "tray_app"),
+}
+
+
+def parse_importtime(stderr: str) -> List[dict]:
+    """
+    -X importtime 출력 → [{name, self_us, cumulative_us, depth}, ...] (출력 순서 = import 완료 순서)
+
+    형식: "import time: self [us] | cumulative | imported package" (들여쓰기 2칸 = 중첩 1단계)
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 헤더 줄
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        entries.append({
+            "name": stripped,
+            "self_us": int(parts[0]),
+            "cumulative_us": int(parts[1]),
+            "depth": (len(name) - len(stripped)) // 2
+        })
+    return entries
+
+
+def summarize(entries: List[dict], module: str, top: int = 10) -> dict:
+    """
+    import 항목 요약
+
+    - total_ms: 대상 모듈 누적 시간 (인터프리터 시작 시 site 등은 제외)
+    - packages: 최상위 패키지별 self 시간 합계 상위 top개 (ms)
+    - heavy: 대상 모듈 import 중 로드된 HEAVY_PACKAGES
+    """
+    index = next((i for i in range(len(entries) - 1, -1, -1)
+                  if entries[i]["name"] == module and entries[i]["depth"] == 0), None)
+    if index is None:
+        target, subtree = None, entries
+    else:
+        # 대상 모듈 줄 바로 앞의 depth > 0 항목들이 대상 모듈이 import한 모듈
+        target, start = entries[index], index
+        while start > 0 and entries[start - 1]["depth"] > 0:
+            start -= 1
+        subtree = entries[start:index + 1]
+    by_package: Dict[str, int] = {}
+    for entry in subtree:
+        root = entry["name"].split(".")[0]
+        by_package[root] = by_package.get(root, 0) + entry["self_us"]
+    ranked = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": round(target["cumulative_us"] / 1000, 1) if target else None,
+        "modules": len(subtree),
+        "packages": {name: round(us / 1000, 1) for name, us in ranked},
+        "heavy": sorted(name for name in HEAVY_PACKAGES if name in by_package)
+    }
+
+
+def run_once(module: str, path: Path, top: int = 10, python: str = sys.executable) -> dict:
+    """새 인터프리터에서 모듈을 한 번 import하여 요약 (import 실패 시 RuntimeError)"""
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(path), env.get("PYTHONPATH", "")]))
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(path), env=env, capture_output=True, text=True, timeout=120
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+        raise RuntimeError(f"import {module} failed: {error}")
+    summary = summarize(parse_importtime(proc.stderr), module, top)
+    summary["wall_ms"] = round(wall * 1000, 1)  # 인터프리터 시작 포함
+    return summary
+
+
+def profile_imports(module: str, path: Path, repeat: int = 5, top: int = 10) -> dict:
+    """repeat회 실행 후 total_ms가 가장 짧은 실행의 요약 (+ 전체 실행의 total_ms 목록)"""
+    runs = sorted((run_once(module, path, top) for _ in range(max(1, repeat))),
+                  key=lambda run: run["total_ms"] or 0.0)
+    result = dict(runs[0])
+    result["runs_ms"] = [run["total_ms"] for run in runs]
+    result["stdev_ms"] = round(statistics.pstdev(result["runs_ms"]), 1) if len(runs) > 1 else 0.0
+    return result
+
+
+def profile_entry_points(repeat: int = 5, top: int = 10) -> Dict[str, dict]:
+    """서버/트레이 진입점 import 프로파일 (실패한 항목은 error만 기록)"""
+    results = {}
+    for name, (module, path) in ENTRY_POINTS.items():
+        try:
+            results[name] = profile_imports(module, path, repeat, top)
+        except Exception as e:
+            results[name] = {"module": module, "error": str(e)}
+    return results
+
+
+def format_summary(summary: dict) -> str:
+    if "error" in summary:
+        return f"{summary['module']}: {summary['error']}"
+    lines = [
+        f"{summary['module']}: {summary['total_ms']:.0f}ms import "
+        f"({summary['modules']} modules, {summary['wall_ms']:.0f}ms wall incl. interpreter)"
+    ]
+    for name, ms in summary["packages"].items():
+        lines.append(f"  {name:<28} {ms:8.1f}ms")
+    if summary["heavy"]:
+        lines.append(f"  ! heavy packages imported at startup: {', '.join(summary['heavy'])}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Summarized -X importtime profile")
+    parser.add_argument("module", nargs="?", help="대상 모듈 (생략 시 whisper_server, tray_manager 모두)")
+    parser.add_argument("--path", default=str(SERVER_DIR), help="모듈이 있는 폴더")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="표시할 패키지 수")
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args(argv)
+
+    if args.module:
+        results = {args.module: profile_imports(args.module, Path(args.path), args.repeat, args.top)}
+    else:
+        results = profile_entry_points(args.repeat, args.top)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print("\n\n".join(format_summary(summary) for summary in results.values()))
+    # 무거운 패키지가 시작 경로에 들어왔거나 import가 실패하면 1
+    return 1 if any("error" in s or s.get("heavy") for s in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
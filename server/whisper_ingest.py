@@ -0,0 +1,138 @@
+"""
+업로드 오디오 수집 (ingest)
+- 업로드 전체를 메모리로 읽거나 임시 파일로 다시 복사하지 않고,
+  Starlette가 스풀링해 둔 파일 객체를 디코더에 직접 전달
+- Raw PCM (audio/L16, 16kHz mono) 업로드는 고정 크기 블록 단위로 읽어
+  MP3 인코딩/디코딩 왕복 없이 바로 float32 배열로 변환
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Tuple
+
+import numpy as np
+
+# Whisper 입력 샘플레이트 (고정)
+SAMPLE_RATE = 16000
+
+# 업로드를 읽을 때 사용하는 블록 크기 (기본 1MB)
+INGEST_BLOCK_SIZE = int(os.getenv("WHISPER_INGEST_BLOCK_KB", "1024")) * 1024
+
+# 디코더(PyAV)로 처리하는 압축/컨테이너 포맷 (영상 컨테이너는 첫 오디오 스트림만 디코딩)
+ENCODED_EXTENSIONS = {
+    '.mp3', '.wav', '.m4a', '.flac', '.ogg', '.opus', '.aac', '.wma',
+    '.mp4', '.m4v', '.webm', '.mkv', '.mov', '.avi'
+}
+
+# Raw PCM 입력
+# - audio/L16: RFC 2586에 따라 big-endian (ffmpeg -f s16be)
+# - audio/pcm, *.pcm, *.raw: little-endian (ffmpeg -f s16le)
+PCM_BIG_ENDIAN_TYPES = {'audio/l16'}
+PCM_LITTLE_ENDIAN_TYPES = {'audio/pcm'}
+PCM_EXTENSIONS = {'.pcm', '.raw'}
+
+
+class UnsupportedAudioError(ValueError):
+    """지원하지 않는 업로드 형식 (HTTP 400)"""
+
+
+@dataclass
+class AudioUpload:
+    """디코딩 전 업로드 정보 (파일 객체는 요청이 끝날 때까지 유효)"""
+    fileobj: BinaryIO
+    filename: str
+    content_type: str
+    size: int
+    kind: str             # "encoded" | "pcm"
+    byteorder: str = "<"  # PCM 바이트 순서 ("<" little, ">" big)
+    digest: Optional[str] = None  # hash_upload 결과 (캐시 키·체크포인트 키에서 한 번만 계산)
+
+
+def parse_content_type(value: str) -> Tuple[str, Dict[str, str]]:
+    """'audio/L16; rate=16000; channels=1' → ('audio/l16', {'rate': '16000', 'channels': '1'})"""
+    if not value:
+        return "", {}
+    parts = [p.strip() for p in value.split(";")]
+    params = {}
+    for part in parts[1:]:
+        if "=" in part:
+            key, _, val = part.partition("=")
+            params[key.strip().lower()] = val.strip().strip('"')
+    return parts[0].lower(), params
+
+
+def inspect_upload(fileobj: BinaryIO, filename: str, content_type: str) -> AudioUpload:
+    """
+    업로드 형식 검증 및 크기 확인 (데이터는 읽지 않음)
+
+    Raises:
+        UnsupportedAudioError: 지원하지 않는 포맷 또는 PCM 파라미터
+    """
+    mime, params = parse_content_type(content_type or "")
+    ext = Path(filename or "").suffix.lower()
+
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(0)
+
+    if mime in PCM_BIG_ENDIAN_TYPES or mime in PCM_LITTLE_ENDIAN_TYPES or ext in PCM_EXTENSIONS:
+        try:
+            rate = int(params.get("rate", SAMPLE_RATE))
+            channels = int(params.get("channels", 1))
+        except ValueError:
+            raise UnsupportedAudioError(f"Invalid PCM parameters: {content_type}")
+        if rate != SAMPLE_RATE or channels != 1:
+            raise UnsupportedAudioError(
+                f"Raw PCM must be {SAMPLE_RATE} Hz mono (got rate={rate}, channels={channels})"
+            )
+        byteorder = ">" if mime in PCM_BIG_ENDIAN_TYPES else "<"
+        return AudioUpload(fileobj, filename, content_type, size, "pcm", byteorder)
+
+    if ext not in ENCODED_EXTENSIONS:
+        raise UnsupportedAudioError(f"Unsupported file format: {ext}")
+
+    return AudioUpload(fileobj, filename, content_type, size, "encoded")
+
+
+def iter_blocks(fileobj: BinaryIO, block_size: int = INGEST_BLOCK_SIZE):
+    """파일 객체를 처음부터 고정 크기 블록으로 순회"""
+    fileobj.seek(0)
+    while True:
+        block = fileobj.read(block_size)
+        if not block:
+            break
+        yield block
+
+
+def hash_upload(upload: AudioUpload) -> str:
+    """업로드 원본 바이트의 SHA-256 (블록 단위로 읽어 메모리 사용 일정, 업로드당 한 번만 계산)"""
+    if upload.digest is not None:
+        return upload.digest
+    digest = hashlib.sha256()
+    for block in iter_blocks(upload.fileobj):
+        digest.update(block)
+    upload.fileobj.seek(0)
+    upload.digest = digest.hexdigest()
+    return upload.digest
+
+
+def read_pcm16(upload: AudioUpload) -> np.ndarray:
+    """16-bit PCM 업로드를 블록 단위로 읽어 float32 [-1, 1] 배열로 변환"""
+    raw = np.empty(upload.size - upload.size % 2, dtype=np.uint8)
+    offset = 0
+    for block in iter_blocks(upload.fileobj):
+        n = min(len(block), raw.size - offset)
+        raw[offset:offset + n] = np.frombuffer(block, dtype=np.uint8, count=n)
+        offset += n
+    samples = raw[:offset - offset % 2].view(np.dtype(f"{upload.byteorder}i2"))
+    return samples.astype(np.float32) / 32768.0
+
+
+def load_audio(upload: AudioUpload) -> np.ndarray:
+    """업로드를 16kHz mono float32 배열로 디코딩 (동기 - 워커 스레드에서 호출)"""
+    if upload.kind == "pcm":
+        return read_pcm16(upload)
+    from whisper_preprocess import decode_file  # PyAV - 첫 디코딩 시 로드
+    return decode_file(upload.fileobj)
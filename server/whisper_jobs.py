@@ -0,0 +1,611 @@
+"""
+비동기 전사 작업 (POST /jobs → GET /jobs/{id} → DELETE /jobs/{id})
+- /transcribe/long은 수십 분짜리 HTTP 요청 하나라서 클라이언트 타임아웃·연결 끊김이면 작업 전체를 잃음
+  → 업로드를 작업 폴더에 저장하고 작업 ID를 바로 반환, 전사는 백그라운드에서 실행
+- 작업 상태와 창(window)별 세그먼트를 SQLite(WAL)에 기록
+  - 창 분할 계획도 저장 → 서버가 재시작되면 대기/실행 중이던 작업을 이어서 실행하고 이미 기록된 창은 건너뜀
+  - 여러 워커 프로세스(whisper_dispatcher.py)가 같은 DB를 공유: 작업은 한 프로세스만 가져가고(claim),
+    실행 중인 프로세스는 heartbeat를 갱신 → heartbeat가 끊긴 작업은 다른 프로세스가 다시 대기열로 돌림
+- 취소: DB에 cancelling으로 표시 → 실행 중인 프로세스가 작업의 DecodeGuards를 취소해
+  디코딩 루프가 세그먼트 사이에서 멈춤 (남은 창은 실행하지 않음)
+
+상태: queued → running → completed | failed | cancelled (running → cancelling → cancelled)
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple
+
+from whisper_guards import DecodeGuards
+from whisper_ingest import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("WHISPER_JOB_WORKERS", "1"))                 # 프로세스당 동시 실행 작업 수
+JOB_MAX_PENDING = int(os.getenv("WHISPER_JOB_MAX_PENDING", "100"))       # 대기 작업 상한 (초과 시 429)
+JOB_WINDOW_SECONDS = float(os.getenv("WHISPER_JOB_WINDOW", "120"))      # 기록 단위 창 길이 목표 (초, 인코더 입력 기준)
+JOB_TTL_SECONDS = float(os.getenv("WHISPER_JOB_TTL_HOURS", "168")) * 3600  # 끝난 작업 보관 기간
+JOB_MAX_ATTEMPTS = int(os.getenv("WHISPER_JOB_MAX_ATTEMPTS", "3"))       # 재시작으로 중단된 작업 재실행 상한
+JOB_POLL_SECONDS = 1.0     # 대기열 확인 / heartbeat / 취소 확인 주기
+JOB_STALE_SECONDS = 30.0   # heartbeat가 이보다 오래 멈춘 실행 중 작업은 다시 대기열로
+
+QUEUED = "queued"
+RUNNING = "running"
+CANCELLING = "cancelling"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINAL_STATES = (COMPLETED, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    content_type TEXT,
+    upload_path TEXT NOT NULL,
+    params TEXT NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    owner TEXT,
+    heartbeat REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    duration REAL,
+    speech_samples INTEGER,
+    detection TEXT,
+    error TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+CREATE TABLE IF NOT EXISTS job_windows (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    segments TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+
+class JobNotFoundError(KeyError):
+    """없는 작업 ID (HTTP 404)"""
+
+
+class JobQueueFullError(Exception):
+    """대기 작업이 상한에 도달 (HTTP 429)"""
+
+
+@dataclass
+class Job:
+    """작업 한 건 (DB 행)"""
+    id: str
+    status: str
+    filename: str
+    content_type: Optional[str]
+    upload_path: str
+    params: dict
+    created: float
+    updated: float
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    attempts: int = 0
+    duration: Optional[float] = None
+    speech_samples: Optional[int] = None
+    detection: Optional[dict] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class JobWindow:
+    """작업의 창 하나 (start/end: 인코더 입력 오디오 기준 샘플, segments: 전사 전이면 None)"""
+    index: int
+    start: int
+    end: int
+    segments: Optional[List[dict]] = None
+
+
+class JobStore:
+    """
+    SQLite 작업 저장소 (스레드 안전, 여러 프로세스가 같은 파일을 공유)
+
+    모든 메서드는 동기 - 이벤트 루프에서는 executor로 호출한다.
+    """
+
+    def __init__(self, jobs_dir: str):
+        self.jobs_dir = Path(jobs_dir)
+        self.uploads_dir = self.jobs_dir / "uploads"
+        self.uploads_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            str(self.jobs_dir / "jobs.sqlite3"), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE ~ COMMIT (다른 프로세스와 쓰기 경합 시 busy timeout까지 대기)"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    # ------------------------------------------------------------------
+    # 생성 / 조회
+    # ------------------------------------------------------------------
+
+    def create(self, fileobj: BinaryIO, filename: str, content_type: Optional[str], params: dict) -> Job:
+        """업로드를 작업 폴더로 복사하고 queued 작업 생성"""
+        job_id = uuid.uuid4().hex
+        upload_path = self.uploads_dir / f"{job_id}{Path(filename or '').suffix.lower()}"
+        fileobj.seek(0)
+        with open(upload_path, "wb") as f:
+            shutil.copyfileobj(fileobj, f, 1024 * 1024)
+        fileobj.seek(0)
+
+        now = time.time()
+        try:
+            with self._transaction() as db:
+                pending = db.execute(f"SELECT COUNT(*) FROM jobs WHERE status = '{QUEUED}'").fetchone()[0]
+                if pending >= JOB_MAX_PENDING:
+                    raise JobQueueFullError(f"Job queue is full ({pending} queued jobs)")
+                db.execute(
+                    "INSERT INTO jobs (id, status, filename, content_type, upload_path, params, created, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, QUEUED, filename, content_type, str(upload_path),
+                     json.dumps(params, ensure_ascii=False), now, now)
+                )
+        except BaseException:
+            upload_path.unlink(missing_ok=True)
+            raise
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise JobNotFoundError(job_id)
+        return self._to_job(row)
+
+    def list(self, limit: int = 50) -> List[Job]:
+        with self._lock:
+            rows = self._db.execute("SELECT * FROM jobs ORDER BY created DESC LIMIT ?", (limit,)).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def windows(self, job_id: str) -> List[JobWindow]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT idx, start, end, segments FROM job_windows WHERE job_id = ? ORDER BY idx", (job_id,)
+            ).fetchall()
+        return [
+            JobWindow(row["idx"], row["start"], row["end"],
+                      json.loads(row["segments"]) if row["segments"] is not None else None)
+            for row in rows
+        ]
+
+    def result(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row["result"]) if row is not None and row["result"] else None
+
+    def counts(self) -> Dict[str, int]:
+        """상태별 작업 수"""
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"], status=row["status"], filename=row["filename"], content_type=row["content_type"],
+            upload_path=row["upload_path"], params=json.loads(row["params"]),
+            created=row["created"], updated=row["updated"], started=row["started"], finished=row["finished"],
+            attempts=row["attempts"], duration=row["duration"], speech_samples=row["speech_samples"],
+            detection=json.loads(row["detection"]) if row["detection"] else None, error=row["error"]
+        )
+
+    # ------------------------------------------------------------------
+    # 실행 (작업을 가져간 프로세스에서 호출)
+    # ------------------------------------------------------------------
+
+    def claim(self, owner: str) -> Optional[Job]:
+        """가장 오래된 queued 작업을 running으로 가져옴 (재실행 상한을 넘은 작업은 failed 처리)"""
+        while True:
+            now = time.time()
+            with self._transaction() as db:
+                row = db.execute(
+                    f"SELECT id, attempts FROM jobs WHERE status = '{QUEUED}' ORDER BY created LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["attempts"] >= JOB_MAX_ATTEMPTS:
+                    db.execute(
+                        "UPDATE jobs SET status = ?, error = ?, finished = ?, updated = ? WHERE id = ?",
+                        (FAILED, f"Interrupted {row['attempts']} times (server restarted during the job)",
+                         now, now, row["id"])
+                    )
+                    logger.warning(f"Job {row['id']} abandoned after {row['attempts']} interrupted attempts")
+                    continue
+                db.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, heartbeat = ?, attempts = attempts + 1, "
+                    "started = COALESCE(started, ?), updated = ? WHERE id = ?",
+                    (RUNNING, owner, now, now, now, row["id"])
+                )
+            return self.get(row["id"])
+
+    def save_plan(self, job_id: str, duration: float, speech_samples: int, windows: List[Tuple[int, int]]):
+        """창 분할 계획 저장 (기존 계획과 기록된 창은 삭제)"""
+        with self._transaction() as db:
+            db.execute("DELETE FROM job_windows WHERE job_id = ?", (job_id,))
+            db.executemany(
+                "INSERT INTO job_windows (job_id, idx, start, end) VALUES (?, ?, ?, ?)",
+                [(job_id, index, int(start), int(end)) for index, (start, end) in enumerate(windows)]
+            )
+            db.execute(
+                "UPDATE jobs SET duration = ?, speech_samples = ?, updated = ? WHERE id = ?",
+                (duration, int(speech_samples), time.time(), job_id)
+            )
+
+    def save_detection(self, job_id: str, detection: dict):
+        """language=auto 감지 결과 (재개 시 다시 감지하지 않음)"""
+        with self._transaction() as db:
+            db.execute("UPDATE jobs SET detection = ?, updated = ? WHERE id = ?",
+                       (json.dumps(detection, ensure_ascii=False), time.time(), job_id))
+
+    def commit_window(self, job_id: str, index: int, segments: List[dict]):
+        """전사한 창 기록 - 재개 시 이 창은 건너뜀"""
+        with self._transaction() as db:
+            db.execute("UPDATE job_windows SET segments = ? WHERE job_id = ? AND idx = ?",
+                       (json.dumps(segments, ensure_ascii=False), job_id, index))
+            db.execute("UPDATE jobs SET updated = ? WHERE id = ?", (time.time(), job_id))
+
+    def finish(self, job_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None):
+        """완료/실패/취소 기록 후 업로드 파일 삭제"""
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute("SELECT upload_path FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, owner = NULL, finished = ?, updated = ? "
+                "WHERE id = ?",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 error, now, now, job_id)
+            )
+        if row is not None:
+            Path(row["upload_path"]).unlink(missing_ok=True)
+
+    def release(self, job_id: str):
+        """프로세스 종료로 중단 - 다음 실행(또는 다른 프로세스)이 이어서 하도록 queued로 되돌림"""
+        with self._transaction() as db:
+            db.execute(
+                f"UPDATE jobs SET status = CASE status WHEN '{CANCELLING}' THEN '{CANCELLED}' ELSE '{QUEUED}' END, "
+                "owner = NULL, updated = ? WHERE id = ? AND status IN (?, ?)",
+                (time.time(), job_id, RUNNING, CANCELLING)
+            )
+
+    def heartbeat(self, job_ids: List[str]) -> List[str]:
+        """실행 중인 작업의 heartbeat 갱신, 취소 요청된 작업 ID 반환"""
+        if not job_ids:
+            return []
+        marks = ",".join("?" * len(job_ids))
+        with self._transaction() as db:
+            db.execute(f"UPDATE jobs SET heartbeat = ? WHERE id IN ({marks})", (time.time(), *job_ids))
+            rows = db.execute(
+                f"SELECT id FROM jobs WHERE id IN ({marks}) AND status = '{CANCELLING}'", job_ids
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def recover(self, owner: Optional[str] = None, active: Sequence[str] = ()) -> int:
+        """
+        중단된 작업을 다시 대기열로 (heartbeat가 끊긴 작업)
+
+        취소 요청 중이던 작업은 cancelled로 마무리한다.
+
+        Args:
+            owner: 시작 시에만 지정 - 이 소유자의 이전 실행이 남긴 작업도 heartbeat와 무관하게 회수
+                   (실행 중 주기적 회수에서는 None - 자기 작업을 되돌리지 않도록)
+            active: 이 프로세스에서 실행 중인 작업 ID (heartbeat가 늦어도 회수하지 않음)
+        """
+        stale = time.time() - JOB_STALE_SECONDS
+        marks = ",".join("?" * len(active))
+        with self._transaction() as db:
+            rows = db.execute(
+                f"SELECT id, status, upload_path FROM jobs WHERE status IN ('{RUNNING}', '{CANCELLING}') "
+                "AND (owner = ? OR heartbeat IS NULL OR heartbeat < ?)"
+                + (f" AND id NOT IN ({marks})" if active else ""),
+                (owner, stale, *active)
+            ).fetchall()
+            now = time.time()
+            for row in rows:
+                if row["status"] == CANCELLING:
+                    db.execute("UPDATE jobs SET status = ?, owner = NULL, finished = ?, updated = ? WHERE id = ?",
+                               (CANCELLED, now, now, row["id"]))
+                else:
+                    db.execute("UPDATE jobs SET status = ?, owner = NULL, updated = ? WHERE id = ?",
+                               (QUEUED, now, row["id"]))
+        for row in rows:
+            if row["status"] == CANCELLING:
+                Path(row["upload_path"]).unlink(missing_ok=True)
+        return sum(1 for row in rows if row["status"] == RUNNING)
+
+    # ------------------------------------------------------------------
+    # 취소 / 삭제
+    # ------------------------------------------------------------------
+
+    def request_cancel(self, job_id: str) -> str:
+        """
+        취소 요청 (queued는 바로 cancelled, running은 cancelling → 실행 중인 프로세스가 멈춘 뒤 cancelled)
+
+        Returns:
+            변경 후 상태 (이미 끝난 작업은 그대로)
+        """
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute("SELECT status, upload_path FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                raise JobNotFoundError(job_id)
+            status = row["status"]
+            if status == QUEUED:
+                status = CANCELLED
+                db.execute("UPDATE jobs SET status = ?, finished = ?, updated = ? WHERE id = ?",
+                           (status, now, now, job_id))
+            elif status == RUNNING:
+                status = CANCELLING
+                db.execute("UPDATE jobs SET status = ?, updated = ? WHERE id = ?", (status, now, job_id))
+        if status == CANCELLED and row["status"] == QUEUED:
+            Path(row["upload_path"]).unlink(missing_ok=True)
+        return status
+
+    def delete(self, job_id: str):
+        """끝난 작업과 기록된 세그먼트 삭제"""
+        with self._transaction() as db:
+            row = db.execute("SELECT upload_path FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            db.execute("DELETE FROM job_windows WHERE job_id = ?", (job_id,))
+            db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        if row is not None:
+            Path(row["upload_path"]).unlink(missing_ok=True)
+
+    def prune(self, ttl: float = JOB_TTL_SECONDS) -> int:
+        """보관 기간이 지난 끝난 작업 삭제"""
+        cutoff = time.time() - ttl
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT id FROM jobs WHERE status IN ('{COMPLETED}', '{FAILED}', '{CANCELLED}') AND finished < ?",
+                (cutoff,)
+            ).fetchall()
+        for row in rows:
+            self.delete(row["id"])
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def job_view(store: JobStore, job: Job, segments: bool = True, result: bool = True) -> dict:
+    """
+    GET /jobs/{id} 응답 본문
+
+    progress는 인코더 입력(침묵 제거 후) 기준 창/오디오 진행률, segments는 지금까지 기록된 창의 세그먼트
+    (완료된 작업은 /transcribe/long과 같은 형식의 result).
+    """
+    windows = store.windows(job.id)
+    done = [w for w in windows if w.segments is not None]
+    total_samples = job.speech_samples or 0
+    done_samples = sum(w.end - w.start for w in done)
+    view = {
+        "id": job.id,
+        "status": job.status,
+        "filename": job.filename,
+        "params": job.params,
+        "created": job.created,
+        "started": job.started,
+        "finished": job.finished,
+        "attempts": job.attempts,
+        "error": job.error,
+        "language_detection": job.detection,
+        "progress": {
+            "windows_done": len(done),
+            "windows_total": len(windows),
+            "audio_seconds_done": round(done_samples / SAMPLE_RATE, 2),
+            "audio_seconds_total": round(total_samples / SAMPLE_RATE, 2),
+            "duration": round(job.duration, 2) if job.duration is not None else None,
+            "percent": 100.0 if job.status == COMPLETED else (
+                round(100.0 * done_samples / total_samples, 1) if total_samples else 0.0
+            )
+        }
+    }
+    if job.status == COMPLETED:
+        if result:
+            view["result"] = store.result(job.id)
+    elif segments:
+        view["segments"] = [segment for w in done for segment in w.segments]
+    return view
+
+
+# (작업, 저장소, 가드) → 결과 - 창마다 store.commit_window로 기록, 취소되면 가드가 디코딩을 멈춤
+JobRunner = Callable[[Job, JobStore, DecodeGuards], Awaitable[dict]]
+
+
+class JobQueue:
+    """
+    프로세스 하나의 작업 실행기 (이벤트 루프에서 동작)
+
+    JOB_POLL_SECONDS마다 DB에서 작업을 가져오고(claim, 모델 준비 후), 실행 중인 작업의 heartbeat 갱신과
+    다른 프로세스로 들어온 취소 요청 확인, 중단된 작업 회수를 함께 처리한다.
+    """
+
+    def __init__(self, store: JobStore, runner: JobRunner, owner: str,
+                 ready: Callable[[], bool] = lambda: True, workers: int = JOB_WORKERS):
+        self.store = store
+        self.runner = runner
+        self.owner = owner
+        self.ready = ready              # 모델 준비 전에는 작업을 가져가지 않음
+        self.workers = max(1, workers)
+        self._active: Dict[str, DecodeGuards] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._cancel_requested = set()  # 사용자가 취소한 작업 (종료로 인한 중단과 구분)
+        self._wake: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    async def _io(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args))
+
+    async def start(self):
+        """중단된 작업 회수 + 오래된 작업 정리 후 실행 루프 시작 (lifespan)"""
+        self._wake = asyncio.Event()
+        resumed = await self._io(self.store.recover, self.owner)
+        pruned = await self._io(self.store.prune)
+        if resumed:
+            logger.info(f"Resuming {resumed} interrupted job(s)")
+        if pruned:
+            logger.info(f"Pruned {pruned} expired job(s)")
+        self._loop_task = asyncio.ensure_future(self._run())
+
+    async def submit(self, fileobj: BinaryIO, filename: str, content_type: Optional[str], params: dict) -> Job:
+        """업로드 저장 + queued 작업 생성 (대기 작업이 상한이면 JobQueueFullError)"""
+        job = await self._io(self.store.create, fileobj, filename, content_type, params)
+        logger.info(f"Job queued: {job.id} ({filename})")
+        if self._wake is not None:
+            self._wake.set()
+        return job
+
+    async def cancel(self, job_id: str) -> str:
+        """
+        취소 요청 - 이 프로세스에서 실행 중이면 바로 디코딩 중단,
+        다른 프로세스에서 실행 중이면 그 프로세스가 다음 heartbeat에서 중단
+        """
+        status = await self._io(self.store.request_cancel, job_id)
+        guards = self._active.get(job_id)
+        if guards is not None:
+            self._cancel_requested.add(job_id)
+            guards.cancel()
+        return status
+
+    async def shutdown(self):
+        """실행 루프 중지 - 실행 중인 작업은 디코딩을 멈추고 queued로 되돌려 다음 실행에서 이어서 처리"""
+        self._stopping = True
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+        for guards in self._active.values():
+            guards.cancel()
+        if self._tasks:
+            tasks = dict(self._tasks)
+            _, stuck = await asyncio.wait(list(tasks.values()), timeout=10)
+            if stuck:
+                # 창 하나가 끝나지 않음 - 작업 태스크를 취소하고 끝날 때까지 기다린 뒤 queued로 되돌림
+                # (디코딩 스레드는 취소된 가드로 다음 세그먼트에서 멈추고, 기록된 위치는 체크포인트에 남음)
+                for task in stuck:
+                    task.cancel()
+                await asyncio.gather(*stuck, return_exceptions=True)
+                for job_id, task in tasks.items():
+                    if task in stuck:
+                        logger.warning(f"Job did not stop in time, requeued: {job_id}")
+                        await self._io(self.store.release, job_id)
+        self.store.close()
+
+    def stats(self) -> dict:
+        return {
+            "owner": self.owner,
+            "workers": self.workers,
+            "running": sorted(self._active),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "states": self.store.counts()
+        }
+
+    async def _run(self):
+        last_recover = time.monotonic()
+        while not self._stopping:
+            try:
+                for job_id in await self._io(self.store.heartbeat, list(self._active)):
+                    guards = self._active.get(job_id)
+                    if guards is not None and job_id not in self._cancel_requested:
+                        logger.info(f"Job cancel requested: {job_id}")
+                        self._cancel_requested.add(job_id)
+                        guards.cancel()
+                if time.monotonic() - last_recover > JOB_STALE_SECONDS:
+                    last_recover = time.monotonic()
+                    if await self._io(self.store.recover, None, list(self._active)):
+                        logger.warning("Requeued job(s) from a worker that stopped sending heartbeats")
+                while self.ready() and len(self._active) < self.workers:
+                    job = await self._io(self.store.claim, self.owner)
+                    if job is None:
+                        break
+                    guards = self._active[job.id] = DecodeGuards(timeout=None)
+                    self._tasks[job.id] = asyncio.ensure_future(self._execute(job, guards))
+            except sqlite3.Error as e:
+                logger.error(f"Job store error: {e}")
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, job: Job, guards: DecodeGuards):
+        started = time.perf_counter()
+        resumed = f", attempt {job.attempts}" if job.attempts > 1 else ""
+        logger.info(f"Job started: {job.id} ({job.filename}{resumed})")
+        try:
+            try:
+                result = await self.runner(job, self.store, guards)
+            except Exception as e:
+                result, error = None, e
+            else:
+                error = None
+            cancelled = job.id in self._cancel_requested
+            if self._stopping and not cancelled:
+                # 종료로 중단 - 기록된 창은 남겨 두고 다음 실행(또는 다른 프로세스)에서 이어서
+                await self._io(self.store.release, job.id)
+                logger.info(f"Job interrupted by shutdown: {job.id} (will resume)")
+                return
+        finally:
+            self._active.pop(job.id, None)
+            self._tasks.pop(job.id, None)
+            self._cancel_requested.discard(job.id)
+            if self._wake is not None:
+                self._wake.set()
+
+        if error is not None and not cancelled:
+            logger.error(f"Job failed: {job.id} - {error}")
+            await self._io(self.store.finish, job.id, FAILED, None, str(error))
+            self.failed += 1
+            return
+        if cancelled:
+            await self._io(self.store.finish, job.id, CANCELLED, None, None)
+            self.cancelled += 1
+            logger.info(f"Job cancelled: {job.id} (after {time.perf_counter() - started:.1f}s)")
+            return
+        await self._io(self.store.finish, job.id, COMPLETED, result, None)
+        self.completed += 1
+        logger.info(f"Job completed: {job.id} ({time.perf_counter() - started:.1f}s)")
+
+
+def default_owner(port: int) -> str:
+    """작업 소유자 ID (호스트 + 포트 - 재시작한 같은 워커가 자기 작업을 바로 회수)"""
+    return f"{socket.gethostname()}:{port}"
@@ -0,0 +1,166 @@
+"""
+언어 자동 감지 + 강의별 감지 결과 캐시
+- language=auto 요청은 디코딩 전에 오디오 앞부분(음성 구간 30초)으로 언어를 한 번 감지해 고정
+  (감지하지 않고 맡기면 faster-whisper가 매번 감지하고 비용도 보이지 않음)
+- X-Lecture-Id 헤더가 있으면 강의의 첫 청크에서만 감지하고, 이후 청크는 캐시된 언어를 재사용
+- 같은 강의의 청크가 동시에 들어와도 감지는 한 번만 (나머지는 첫 감지 결과를 기다림)
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Dict, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+
+logger = logging.getLogger(__name__)
+
+AUTO = "auto"
+DEFAULT_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "ko")  # 요청에 language가 없을 때 (auto 가능)
+LANGUAGE_CACHE_SIZE = int(os.getenv("WHISPER_LANGUAGE_CACHE_SIZE", "256"))   # 기억할 강의 수
+LANGUAGE_CACHE_TTL = float(os.getenv("WHISPER_LANGUAGE_CACHE_TTL", "21600"))  # 초 (6시간)
+DETECTION_SEGMENTS = int(os.getenv("WHISPER_LANGUAGE_DETECTION_SEGMENTS", "1"))  # 감지에 쓸 30초 구간 수
+
+_LECTURE_ID = re.compile(r"^[\w.:-]{1,128}$")
+
+
+class InvalidLanguageError(ValueError):
+    """지원하지 않는 언어 코드 또는 잘못된 강의 ID (HTTP 400)"""
+
+
+@dataclass
+class LanguageDetection:
+    """요청에 적용한 언어와 결정 방식"""
+    language: str
+    source: str                       # fixed (요청/기본값) | detected (이번 요청에서 감지) | cache (같은 강의의 이전 감지)
+    probability: Optional[float] = None
+    seconds: float = 0.0              # 이번 요청에서 감지에 쓴 시간 (cache/fixed는 0)
+    lecture_id: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        result = asdict(self)
+        if self.probability is not None:
+            result["probability"] = round(self.probability, 4)
+        result["seconds"] = round(self.seconds, 3)
+        return result
+
+
+def normalize_language(language: Optional[str]) -> str:
+    """요청 language 값 검증 (없으면 WHISPER_LANGUAGE) - auto 또는 Whisper 언어 코드"""
+    language = (language or DEFAULT_LANGUAGE).strip().lower()
+    if language == AUTO:
+        return language
+    from faster_whisper.tokenizer import _LANGUAGE_CODES  # requirements.txt 버전 고정 전제
+    if language not in _LANGUAGE_CODES:
+        raise InvalidLanguageError(f"Unsupported language: {language} (use 'auto' or a Whisper language code)")
+    return language
+
+
+def normalize_lecture_id(lecture_id: Optional[str]) -> Optional[str]:
+    if lecture_id is None or not lecture_id.strip():
+        return None
+    lecture_id = lecture_id.strip()
+    if not _LECTURE_ID.match(lecture_id):
+        raise InvalidLanguageError("X-Lecture-Id must be 1-128 characters of [A-Za-z0-9_.:-]")
+    return lecture_id
+
+
+def detect_language(model: "WhisperModel", audio: np.ndarray, vad_filter: bool = True) -> LanguageDetection:
+    """
+    오디오 앞부분의 음성 구간으로 언어 감지 (동기 - 추론 워커 스레드에서 실행)
+
+    vad_filter=False: 전처리에서 침묵을 이미 잘라 낸 오디오
+    """
+    started = time.perf_counter()
+    language, probability, _ = model.detect_language(
+        audio, vad_filter=vad_filter, language_detection_segments=DETECTION_SEGMENTS
+    )
+    return LanguageDetection(language, "detected", probability, time.perf_counter() - started)
+
+
+class LanguageCache:
+    """강의 ID → 감지 결과 (LRU + TTL, 스레드 안전, 강의별 감지는 한 번만 실행)"""
+
+    def __init__(self, max_entries: int = LANGUAGE_CACHE_SIZE, ttl: float = LANGUAGE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # id → (감지 결과, 저장 시각)
+        self._pending: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.detections = 0
+        self.detect_seconds = 0.0
+
+    def resolve(self, model: "WhisperModel", audio: np.ndarray, lecture_id: Optional[str],
+                vad_filter: bool = True) -> LanguageDetection:
+        """
+        강의 ID의 언어 (캐시에 없으면 이 오디오로 감지 후 저장)
+
+        같은 강의를 다른 스레드가 감지 중이면 그 결과를 기다린다 (실패하면 직접 감지).
+        """
+        if lecture_id is None:
+            return self._detect(model, audio, vad_filter)
+        while True:
+            with self._lock:
+                cached = self._get(lecture_id)
+                if cached is not None:
+                    self.hits += 1
+                    return LanguageDetection(cached.language, "cache", cached.probability, 0.0, lecture_id)
+                waiting = self._pending.get(lecture_id)
+                if waiting is None:
+                    done = self._pending[lecture_id] = threading.Event()
+                    break
+            waiting.wait()
+
+        try:
+            detection = self._detect(model, audio, vad_filter)
+            detection.lecture_id = lecture_id
+            with self._lock:
+                self._entries[lecture_id] = (detection, time.monotonic())
+                self._entries.move_to_end(lecture_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            logger.info(
+                f"Language detected for lecture {lecture_id}: {detection.language} "
+                f"(prob={detection.probability:.2%}, {detection.seconds:.2f}s)"
+            )
+            return detection
+        finally:
+            with self._lock:
+                self._pending.pop(lecture_id, None)
+            done.set()
+
+    def _get(self, lecture_id: str) -> Optional[LanguageDetection]:
+        """캐시 조회 (락 보유 상태에서 호출, 만료 항목은 삭제)"""
+        entry = self._entries.get(lecture_id)
+        if entry is None:
+            return None
+        detection, stored = entry
+        if time.monotonic() - stored > self.ttl:
+            del self._entries[lecture_id]
+            return None
+        self._entries.move_to_end(lecture_id)
+        return detection
+
+    def _detect(self, model: "WhisperModel", audio: np.ndarray, vad_filter: bool) -> LanguageDetection:
+        detection = detect_language(model, audio, vad_filter)
+        with self._lock:
+            self.detections += 1
+            self.detect_seconds += detection.seconds
+        return detection
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "lectures": len(self._entries),
+                "detections": self.detections,
+                "hits": self.hits,
+                "detect_seconds": round(self.detect_seconds, 3)
+            }
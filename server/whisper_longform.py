@@ -0,0 +1,86 @@
+"""
+장시간 오디오 분할 계획
+- 고정 오프셋이 아닌 VAD 침묵 구간에서 오디오를 나눔 (단어 중간 절단 방지)
+- 워커 수에 맞춰 창(window) 길이를 정해 병렬 전사 후 전역 타임스탬프로 이어 붙임
+"""
+
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from whisper_ingest import SAMPLE_RATE
+
+# 창 길이 범위 (초)
+LONG_MIN_WINDOW_S = float(os.getenv("WHISPER_LONG_MIN_WINDOW", "60"))
+LONG_MAX_WINDOW_S = float(os.getenv("WHISPER_LONG_MAX_WINDOW", "600"))
+
+# 분할 지점 후보로 인정할 최소 침묵 길이 (ms)
+LONG_SPLIT_SILENCE_MS = int(os.getenv("WHISPER_LONG_SPLIT_SILENCE_MS", "300"))
+
+
+def find_silence_gaps(audio: np.ndarray) -> List[Tuple[int, int]]:
+    """음성 구간 사이의 침묵 구간 목록 (샘플 단위, 시작/끝 포함)"""
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    speech = get_speech_timestamps(
+        audio,
+        VadOptions(min_silence_duration_ms=LONG_SPLIT_SILENCE_MS, speech_pad_ms=100)
+    )
+    if not speech:
+        return [(0, len(audio))]
+
+    gaps = []
+    prev_end = 0
+    for chunk in speech:
+        if chunk["start"] > prev_end:
+            gaps.append((prev_end, chunk["start"]))
+        prev_end = max(prev_end, chunk["end"])
+    if prev_end < len(audio):
+        gaps.append((prev_end, len(audio)))
+    return gaps
+
+
+def plan_windows(audio: np.ndarray, workers: int,
+                 cut_points: Optional[List[int]] = None) -> List[Tuple[int, int]]:
+    """
+    오디오를 침묵 구간 경계에서 병렬 전사용 창으로 분할
+
+    창 길이 목표는 전체 길이 / workers 이며 [LONG_MIN_WINDOW_S, LONG_MAX_WINDOW_S]로 제한한다.
+    목표 지점에 가장 가까운 침묵 구간의 중앙에서 자르고, 허용 범위 안에 침묵이 없으면
+    목표 지점에서 강제로 자른다.
+
+    cut_points: 분할 후보 지점 (전처리에서 침묵을 잘라 낸 이음매) - 주어지면 VAD를 다시 실행하지 않음
+
+    Returns:
+        [(start_sample, end_sample), ...] - 빈틈 없이 전체 오디오를 덮음
+    """
+    total = len(audio)
+    duration = total / SAMPLE_RATE
+    target_s = min(LONG_MAX_WINDOW_S, max(LONG_MIN_WINDOW_S, duration / max(1, workers)))
+    if duration <= target_s * 1.5:
+        return [(0, total)]
+
+    min_len = int(LONG_MIN_WINDOW_S * SAMPLE_RATE)
+    max_len = int(LONG_MAX_WINDOW_S * SAMPLE_RATE)
+    target_len = int(target_s * SAMPLE_RATE)
+
+    # 침묵 구간 중앙 = 분할 후보 지점
+    if cut_points is None:
+        cut_points = [(start + end) // 2 for start, end in find_silence_gaps(audio)]
+
+    windows = []
+    start = 0
+    while total - start > target_len + min_len // 2:
+        lo, hi = start + min_len, min(start + max_len, total - min_len // 2)
+        if hi <= lo:
+            break
+        target = min(start + target_len, hi)
+        # 목표 지점 ±50% 안의 침묵을 우선, 없으면 허용 범위 전체에서 탐색
+        near = [p for p in cut_points if abs(p - target) <= target_len // 2 and lo <= p <= hi]
+        candidates = near or [p for p in cut_points if lo <= p <= hi]
+        cut = min(candidates, key=lambda p: abs(p - target)) if candidates else target
+        windows.append((start, cut))
+        start = cut
+    windows.append((start, total))
+    return windows
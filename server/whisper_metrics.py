@@ -0,0 +1,354 @@
+"""
+Whisper 서버 메트릭 (Prometheus 텍스트 형식)
+- 외부 의존성(prometheus_client) 없이 Counter / Gauge / Histogram 구현
+- 단계별 소요 시간(upload, decode, vad, encoder, decoder, total) 히스토그램
+- 요청 단위 단계 시간 합계 (응답의 timings 항목, 워커 스레드 기준)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 단계 소요 시간 히스토그램 구간 (초)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class _Metric:
+    """
+    메트릭 공통 (라벨별 값 저장)
+
+    collect를 지정하면 저장된 값 대신 수집 시점에 호출한 결과를 사용한다.
+    collect: () -> 단일 값 또는 {라벨 값(문자열 또는 튜플): 값}
+    """
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 collect: Optional[Callable[[], object]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._collect = collect
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def snapshot(self) -> dict:
+        if self._collect is not None:
+            try:
+                collected = self._collect()
+            except Exception:
+                return {}
+            if collected is None:
+                return {}
+            if isinstance(collected, dict):
+                return {k if isinstance(k, tuple) else (k,): v for k, v in collected.items()}
+            return {(): collected}
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self.snapshot().items())
+        ]
+
+
+class Counter(_Metric):
+    """단조 증가 값"""
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """현재 값"""
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """누적 구간(bucket) 히스토그램"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = STAGE_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def snapshot(self) -> Dict[LabelValues, dict]:
+        """라벨별 {count, sum, buckets: [(상한, 누적 개수)]}"""
+        with self._lock:
+            result = {}
+            for key, counts in self._counts.items():
+                cumulative, total = [], 0
+                for bound, count in zip(self.buckets, counts):
+                    total += count
+                    cumulative.append((bound, total))
+                result[key] = {"count": total, "sum": self._sums[key], "buckets": cumulative}
+            return result
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, data in sorted(self.snapshot().items()):
+            for bound, count in data["buckets"]:
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(data['sum'], 6))}")
+            lines.append(f"{self.name}_count{labels} {data['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 목록 + 렌더링"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 형식 (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        """대시보드용 JSON 형식 (히스토그램은 count / sum / mean만)"""
+        result = {}
+        for metric in self._metrics:
+            values = []
+            for key, value in sorted(metric.snapshot().items()):
+                labels = dict(zip(metric.labelnames, key))
+                if isinstance(metric, Histogram):
+                    values.append({
+                        "labels": labels,
+                        "count": value["count"],
+                        "sum": round(value["sum"], 4),
+                        "mean": round(value["sum"] / value["count"], 4) if value["count"] else 0.0
+                    })
+                else:
+                    values.append({"labels": labels, "value": value})
+            result[metric.name] = values
+        return result
+
+
+# ---------------------------------------------------------------------------
+# 단계 시간 측정
+# ---------------------------------------------------------------------------
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.register(Histogram(
+    "whisper_stage_seconds",
+    "Time spent per processing stage (upload, decode, vad, encoder, decoder, serialize, sections, total)",
+    ("stage",)
+))
+
+requests_total = registry.register(Counter(
+    "whisper_requests_total",
+    "Transcription requests by path and HTTP status",
+    ("path", "status")
+))
+
+_local = threading.local()
+
+
+@contextmanager
+def record_stages():
+    """
+    with 블록 동안 현재 스레드에서 측정된 단계 시간을 합산
+
+    Yields:
+        {단계: 누적 초} - 블록 종료 후 채워진 값 사용
+    """
+    previous = getattr(_local, "timings", None)
+    timings: Dict[str, float] = {}
+    _local.timings = timings
+    try:
+        yield timings
+    finally:
+        _local.timings = previous
+        if previous is not None:
+            merge_timings(previous, timings)
+
+
+def add_stage_time(name: str, seconds: float):
+    """단계 시간 기록 (히스토그램 + 현재 스레드의 요청 합계)"""
+    stage_seconds.observe(seconds, stage=name)
+    timings = getattr(_local, "timings", None)
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name: str):
+    """with 블록 소요 시간을 단계 시간으로 기록"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_stage_time(name, time.perf_counter() - started)
+
+
+def merge_timings(target: Dict[str, float], source: Dict[str, float], scale: float = 1.0) -> Dict[str, float]:
+    """단계 시간 합산 (scale로 배치 공유분 배분)"""
+    for key, value in source.items():
+        target[key] = target.get(key, 0.0) + value * scale
+    return target
+
+
+def round_timings(timings: Dict[str, float]) -> Dict[str, float]:
+    """응답용 단계 시간 (초, 소수 3자리)"""
+    return {key: round(value, 3) for key, value in timings.items()}
+
+
+def call_with_stages(fn, *args, **kwargs):
+    """fn 실행 결과와 그동안 측정된 단계 시간을 함께 반환 (다른 워커 스레드 실행분 수집용)"""
+    with record_stages() as timings:
+        result = fn(*args, **kwargs)
+    return result, timings
+
+
+_instrumented = False
+
+
+def instrument_faster_whisper():
+    """
+    faster-whisper 내부 단계(VAD, 인코더, 디코더)에 시간 측정 래퍼 설치 (한 번만)
+
+    - vad: faster_whisper.transcribe 모듈이 사용하는 get_speech_timestamps
+    - encoder: WhisperModel.encode (30초 창 단위, 언어 감지 포함)
+    - decoder: WhisperModel.generate_with_fallback (순차 경로),
+               BatchedInferencePipeline.generate_segment_batched에서 인코더 시간을 뺀 값 (배치 경로)
+    """
+    global _instrumented
+    if _instrumented:
+        return
+    _instrumented = True
+
+    import faster_whisper.transcribe as fw
+
+    original_vad = fw.get_speech_timestamps
+    original_encode = fw.WhisperModel.encode
+    original_generate = fw.WhisperModel.generate_with_fallback
+    original_batched = fw.BatchedInferencePipeline.generate_segment_batched
+
+    def timed_vad(*args, **kwargs):
+        with stage("vad"):
+            return original_vad(*args, **kwargs)
+
+    def timed_encode(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return original_encode(self, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            _local.encode_seconds = getattr(_local, "encode_seconds", 0.0) + elapsed
+            add_stage_time("encoder", elapsed)
+
+    def timed_generate(self, *args, **kwargs):
+        with stage("decoder"):
+            return original_generate(self, *args, **kwargs)
+
+    def timed_batched(self, *args, **kwargs):
+        encode_before = getattr(_local, "encode_seconds", 0.0)
+        started = time.perf_counter()
+        try:
+            return original_batched(self, *args, **kwargs)
+        finally:
+            encode = getattr(_local, "encode_seconds", 0.0) - encode_before
+            add_stage_time("decoder", max(0.0, time.perf_counter() - started - encode))
+
+    fw.get_speech_timestamps = timed_vad
+    fw.WhisperModel.encode = timed_encode
+    fw.WhisperModel.generate_with_fallback = timed_generate
+    fw.BatchedInferencePipeline.generate_segment_batched = timed_batched
+
+
+class StageTimingMiddleware:
+    """
+    ASGI 미들웨어: 요청 본문 수신 시간(upload, 스풀 파일 쓰기 포함)과 전체 처리 시간(total),
+    경로/상태 코드별 요청 수 기록
+
+    total은 응답 본문 전송이 끝날 때까지 (스트리밍 응답 포함)이다.
+    """
+
+    def __init__(self, app, paths: Tuple[str, ...]):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        upload_done = False
+        status = 500
+
+        async def timed_receive():
+            nonlocal upload_done
+            message = await receive()
+            if not upload_done and message["type"] == "http.request" and not message.get("more_body", False):
+                upload_done = True
+                add_stage_time("upload", time.perf_counter() - started)
+            return message
+
+        async def tracked_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, timed_receive, tracked_send)
+        finally:
+            add_stage_time("total", time.perf_counter() - started)
+            requests_total.inc(path=scope["path"], status=str(status))
@@ -0,0 +1,381 @@
+"""
+Whisper 모델 레지스트리
+- 모델 크기 × compute type 조합을 요청 시점에 지연 로드
+- 메모리 예산(MB)을 넘으면 사용 중이 아닌 모델을 가장 오래 사용하지 않은 순(LRU)으로 해제
+- 기본 모델은 재시작 없이 교체 가능 (hot swap)
+- 로컬 캐시(download_root)에서 먼저 로드하고, 없을 때만 Hugging Face에서 다운로드
+- 로드 직후 내장 오디오로 예열 추론 (첫 요청의 1회성 초기화 비용 제거)
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import numpy as np
+
+from whisper_resources import current_rss
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+
+logger = logging.getLogger(__name__)
+
+# 요청으로 선택 가능한 모델 크기
+ALLOWED_MODELS = [
+    name.strip()
+    for name in os.getenv("WHISPER_MODELS", "tiny,base,small,medium,large-v3").split(",")
+    if name.strip()
+]
+
+COMPUTE_TYPES = {"int8", "int8_float32", "int8_float16", "int16", "float16", "float32"}
+
+# int8 기준 모델별 예상 메모리 (MB) - 실제 로드 후 RSS 증가량이 더 크면 그 값을 사용
+MODEL_MEMORY_MB = {
+    "tiny": 80,
+    "base": 150,
+    "small": 500,
+    "medium": 1500,
+    "large-v1": 3200,
+    "large-v2": 3200,
+    "large-v3": 3200,
+    "large-v3-turbo": 1700,
+    "distil-large-v3": 1600,
+}
+
+# compute type별 int8 대비 배율
+COMPUTE_MEMORY_FACTOR = {
+    "int8": 1.0,
+    "int8_float32": 1.0,
+    "int8_float16": 1.0,
+    "int16": 2.0,
+    "float16": 2.0,
+    "float32": 4.0,
+}
+
+# 모델 로드 재시도
+LOAD_RETRIES = 3
+LOAD_RETRY_DELAY_S = 5
+
+# 로드 직후 예열 추론 (0이면 생략)
+WARMUP = os.getenv("WHISPER_WARMUP", "1") != "0"
+
+# 예열용 내장 오디오: 0.5초 무음 + 0.5초 440Hz 저음량 톤 (16kHz mono float32)
+_WARMUP_RATE = 16000
+WARMUP_AUDIO = np.concatenate([
+    np.zeros(_WARMUP_RATE // 2, dtype=np.float32),
+    (0.1 * np.sin(2 * np.pi * 440 * np.arange(_WARMUP_RATE // 2) / _WARMUP_RATE)).astype(np.float32)
+])
+
+
+class UnknownModelError(ValueError):
+    """허용되지 않은 모델 크기 또는 compute type (HTTP 400)"""
+
+
+class ModelBudgetError(Exception):
+    """메모리 예산 안에 모델을 올릴 수 없음 (HTTP 503)"""
+
+
+def model_name(size: str, compute_type: str) -> str:
+    """'small', 'int8' → 'small/int8'"""
+    return f"{size}/{compute_type}"
+
+
+def estimate_memory_mb(size: str, compute_type: str) -> int:
+    """모델 로드 시 예상 메모리 사용량 (MB)"""
+    base = MODEL_MEMORY_MB.get(size, MODEL_MEMORY_MB["large-v3"])
+    return int(base * COMPUTE_MEMORY_FACTOR.get(compute_type, 1.0))
+
+
+@dataclass
+class LoadedModel:
+    """레지스트리에 올라간 모델"""
+    size: str
+    compute_type: str
+    model: "WhisperModel"
+    memory_mb: int
+    load_seconds: float
+    warmup_seconds: float = 0.0
+    source: str = "cache"  # cache | download
+    last_used: float = field(default_factory=time.monotonic)
+    in_use: int = 0  # 현재 이 모델로 전사 중인 요청 수 (0일 때만 해제 대상)
+
+    @property
+    def name(self) -> str:
+        return model_name(self.size, self.compute_type)
+
+
+class ModelRegistry:
+    """
+    모델 지연 로드 + LRU 해제 (스레드 안전)
+
+    checkout()으로 빌린 모델은 release()까지 해제되지 않는다.
+    모든 모델이 하나의 프로세스 안에서 CTranslate2 런타임을 공유한다.
+    """
+
+    def __init__(self, default_size: str, default_compute_type: str, budget_mb: int,
+                 device: str, cpu_threads: int, num_workers: int, download_root: str,
+                 warmup: bool = WARMUP):
+        self.budget_mb = budget_mb
+        self.device = device
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+        self.download_root = download_root
+        self.warmup = warmup
+        self._default = (default_size, default_compute_type)
+        self._default = self.resolve()  # 기본값 검증
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._entries: "OrderedDict[Tuple[str, str], LoadedModel]" = OrderedDict()  # 오래 사용하지 않은 순
+        self._reserved_mb = 0  # 로드 중인 모델의 예상 메모리 (다른 모델의 동시 로드도 예산 안에서만)
+        self.loads = 0
+        self.evictions = 0
+
+    @property
+    def default(self) -> Tuple[str, str]:
+        return self._default
+
+    @property
+    def default_name(self) -> str:
+        return model_name(*self._default)
+
+    @property
+    def ready(self) -> bool:
+        """기본 모델이 로드되어 있는지"""
+        return self._default in self._entries
+
+    def resolve(self, size: Optional[str] = None, compute_type: Optional[str] = None) -> Tuple[str, str]:
+        """
+        요청 파라미터 → (모델 크기, compute type), 생략 시 기본 모델 기준
+
+        Raises:
+            UnknownModelError: 허용되지 않은 값
+        """
+        size = (size or self._default[0]).strip()
+        compute_type = (compute_type or self._default[1]).strip().lower()
+        if size not in ALLOWED_MODELS:
+            raise UnknownModelError(
+                f"Unknown model: {size} (available: {', '.join(ALLOWED_MODELS)})"
+            )
+        if compute_type not in COMPUTE_TYPES:
+            raise UnknownModelError(
+                f"Unknown compute type: {compute_type} (available: {', '.join(sorted(COMPUTE_TYPES))})"
+            )
+        return size, compute_type
+
+    def checkout(self, size: Optional[str] = None, compute_type: Optional[str] = None) -> LoadedModel:
+        """
+        모델을 빌려옴 (필요하면 로드 - 동기, 스레드 풀에서 호출)
+
+        Raises:
+            UnknownModelError: 허용되지 않은 값
+            ModelBudgetError: 사용 중인 모델 때문에 예산 안에 올릴 수 없음
+        """
+        key = self.resolve(size, compute_type)
+        entry = self._borrow(key)
+        if entry is not None:
+            return entry
+
+        # 같은 모델을 동시에 요청해도 한 번만 로드
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            entry = self._borrow(key)
+            if entry is not None:
+                return entry
+            estimate = self._reserve(key)
+            try:
+                entry = self._load(key, estimate)
+            except BaseException:
+                with self._lock:
+                    self._reserved_mb -= estimate
+                raise
+            with self._lock:
+                self._reserved_mb -= estimate
+                entry.in_use += 1
+                self._entries[key] = entry
+                self._evict()
+            return entry
+
+    def release(self, entry: LoadedModel):
+        """checkout()으로 빌린 모델 반환"""
+        with self._lock:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+            self._evict()
+
+    def load_default(self) -> LoadedModel:
+        """기본 모델 로드 (서버 시작 시)"""
+        entry = self.checkout()
+        self.release(entry)
+        return entry
+
+    def set_default(self, size: str, compute_type: Optional[str] = None) -> LoadedModel:
+        """
+        기본 모델 교체 (hot swap)
+
+        새 모델을 먼저 로드한 뒤 전환하므로 교체 중에도 요청은 이전 기본 모델로 처리된다.
+        이전 기본 모델은 일반 LRU 해제 대상이 된다.
+        """
+        key = self.resolve(size, compute_type or self._default[1])
+        entry = self.checkout(*key)
+        try:
+            previous = self.default_name
+            with self._lock:
+                self._default = key
+            logger.info(f"Default model switched: {previous} -> {entry.name}")
+        finally:
+            self.release(entry)
+        return entry
+
+    def _borrow(self, key: Tuple[str, str]) -> Optional[LoadedModel]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.in_use += 1
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(key)
+            return entry
+
+    def _reserve(self, key: Tuple[str, str]) -> int:
+        """
+        로드할 모델의 예상 메모리를 예산에서 예약 (필요하면 LRU 해제) - 예약한 MB 반환
+
+        예약은 로드가 끝나 모델이 등록되거나 로드가 실패할 때 checkout()에서 돌려준다.
+
+        Raises:
+            ModelBudgetError: 사용 중이거나 로드 중인 모델 때문에 예산 안에 올릴 수 없음
+        """
+        estimate = estimate_memory_mb(*key)
+        if estimate > self.budget_mb:
+            raise ModelBudgetError(
+                f"Model {model_name(*key)} (~{estimate}MB) exceeds memory budget ({self.budget_mb}MB)"
+            )
+        with self._lock:
+            self._evict(reserve_mb=estimate)
+            used = self._used_mb()
+            if used + estimate > self.budget_mb:
+                raise ModelBudgetError(
+                    f"Not enough model memory for {model_name(*key)} "
+                    f"(~{estimate}MB needed, {used}MB held by busy or loading models, budget {self.budget_mb}MB)"
+                )
+            self._reserved_mb += estimate
+        return estimate
+
+    def _load(self, key: Tuple[str, str], estimate: int) -> LoadedModel:
+        """모델 로드 (재시도 포함, 예산은 _reserve()로 미리 확보)"""
+        size, compute_type = key
+        logger.info(f"Loading Whisper model (size={size}, device={self.device.upper()}, compute={compute_type})")
+        rss_before = current_rss()
+        started = time.perf_counter()
+        source = "cache"
+        try:
+            # 로컬 캐시 우선 (Hugging Face 허브 조회 없음 - 오프라인에서도 즉시 로드)
+            model = self._create(size, compute_type, local_files_only=True)
+        except Exception as e:
+            logger.info(f"Model {model_name(*key)} not found in local cache ({type(e).__name__}), downloading")
+            source = "download"
+            model = self._download(key)
+        load_seconds = time.perf_counter() - started
+        measured = int((current_rss() - rss_before) / (1024 * 1024))
+
+        warmup_seconds = self._warm_up(model, key) if self.warmup else 0.0
+        self.loads += 1
+        logger.info(
+            f"Model loaded successfully: {model_name(*key)} "
+            f"({source}, {load_seconds:.1f}s, warm-up {warmup_seconds:.1f}s, ~{max(estimate, measured)}MB)"
+        )
+        return LoadedModel(size, compute_type, model, max(estimate, measured), load_seconds,
+                           warmup_seconds, source)
+
+    def _create(self, size: str, compute_type: str, local_files_only: bool) -> "WhisperModel":
+        from faster_whisper import WhisperModel  # ctranslate2, tokenizers 등 - 첫 모델 로드 시 import
+
+        return WhisperModel(
+            size,
+            device=self.device,
+            compute_type=compute_type,
+            cpu_threads=self.cpu_threads,
+            num_workers=self.num_workers,  # 스레드 풀에서 동시 호출 시 실제 병렬 실행
+            download_root=self.download_root,
+            local_files_only=local_files_only
+        )
+
+    def _download(self, key: Tuple[str, str]) -> "WhisperModel":
+        """캐시에 없는 모델 다운로드 후 로드 (재시도 포함)"""
+        for attempt in range(1, LOAD_RETRIES + 1):
+            try:
+                return self._create(*key, local_files_only=False)
+            except Exception as e:
+                logger.error(f"Failed to load model {model_name(*key)} (attempt {attempt}/{LOAD_RETRIES}): {e}")
+                if attempt == LOAD_RETRIES:
+                    logger.critical(f"Failed to load model after {LOAD_RETRIES} retries")
+                    raise
+                logger.info(f"Retrying in {LOAD_RETRY_DELAY_S} seconds...")
+                time.sleep(LOAD_RETRY_DELAY_S)
+
+    def _warm_up(self, model: "WhisperModel", key: Tuple[str, str]) -> float:
+        """
+        내장 오디오로 VAD + 인코더/디코더를 한 번씩 실행 (실패해도 로드는 유지)
+
+        VAD가 톤 구간을 버리지 않도록 전사는 vad_filter 없이 실행한다.
+        """
+        from faster_whisper.vad import get_speech_timestamps
+
+        started = time.perf_counter()
+        try:
+            get_speech_timestamps(WARMUP_AUDIO)
+            segments, _ = model.transcribe(
+                WARMUP_AUDIO, language="ko", beam_size=1, vad_filter=False,
+                condition_on_previous_text=False, without_timestamps=True
+            )
+            for _ in segments:
+                pass
+        except Exception as e:
+            logger.warning(f"Warm-up failed for {model_name(*key)}: {e}")
+        return time.perf_counter() - started
+
+    def _used_mb(self) -> int:
+        """로드된 모델 + 로드 중인 모델 예약 (락 보유 상태에서 호출)"""
+        return sum(entry.memory_mb for entry in self._entries.values()) + self._reserved_mb
+
+    def _evict(self, reserve_mb: int = 0):
+        """예산을 넘는 동안 사용 중이 아닌 비기본 모델을 LRU 순으로 해제 (락 보유 상태에서 호출)"""
+        for key in list(self._entries):
+            if self._used_mb() + reserve_mb <= self.budget_mb:
+                return
+            entry = self._entries[key]
+            if entry.in_use > 0 or key == self._default:
+                continue
+            del self._entries[key]
+            self.evictions += 1
+            logger.info(f"Model evicted: {entry.name} (freed ~{entry.memory_mb}MB)")
+
+    def stats(self) -> dict:
+        """헬스 체크용 레지스트리 상태"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "default": self.default_name,
+                "budget_mb": self.budget_mb,
+                "used_mb": self._used_mb(),
+                "loading_mb": self._reserved_mb,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "loaded": [
+                    {
+                        "name": entry.name,
+                        "memory_mb": entry.memory_mb,
+                        "load_seconds": round(entry.load_seconds, 2),
+                        "warmup_seconds": round(entry.warmup_seconds, 2),
+                        "source": entry.source,
+                        "in_use": entry.in_use,
+                        "idle_seconds": round(now - entry.last_used, 1)
+                    }
+                    for entry in reversed(self._entries.values())
+                ]
+            }
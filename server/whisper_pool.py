@@ -0,0 +1,177 @@
+"""
+Whisper 추론 워커 풀
+- 모델 추론을 이벤트 루프 밖(스레드 풀)에서 실행하여 헬스 체크 응답 유지
+- 동시 실행 수(workers) + 대기열 깊이(max_queue) 기반 입장 제어 (backpressure)
+"""
+
+import asyncio
+import functools
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+
+# 스트림 종료 표시
+_STREAM_END = object()
+
+
+class PoolSaturatedError(Exception):
+    """대기열이 가득 차 새 요청을 받을 수 없음 (HTTP 429)"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Inference queue is full (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+class PoolClosedError(Exception):
+    """풀이 종료되어 요청을 받을 수 없음 (HTTP 503)"""
+
+
+class InferencePool:
+    """
+    스레드 풀 기반 추론 실행기
+
+    CTranslate2는 추론 중 GIL을 해제하므로, 하나의 WhisperModel을
+    num_workers=workers 로 로드해 두면 스레드 수만큼 실제 병렬 전사가 가능하다.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="whisper-infer"
+        )
+        self._lock = threading.Lock()
+        self._admitted = 0      # 입장한 요청 수 (실행 중 + 대기 중)
+        self._running = 0       # 워커 스레드에서 실행 중인 작업 수
+        self._completed = 0
+        self._rejected = 0
+        self._avg_job_seconds = 0.0  # 작업 소요 시간 지수 이동 평균 (Retry-After 추정용)
+        self._closed = False
+
+    @property
+    def capacity(self) -> int:
+        """동시에 입장 가능한 최대 요청 수"""
+        return self.workers + self.max_queue
+
+    @property
+    def saturated(self) -> bool:
+        """실행 + 대기 슬롯이 모두 사용 중 (지금 입장하면 PoolSaturatedError)"""
+        return self._admitted >= self.capacity
+
+    def retry_after(self) -> int:
+        """대기열이 빠지기까지 예상 시간(초)"""
+        if self._avg_job_seconds <= 0:
+            return 5
+        waves = (self._admitted - self.workers + 1) / self.workers
+        return int(min(300, max(1, math.ceil(self._avg_job_seconds * max(waves, 1)))))
+
+    @asynccontextmanager
+    async def admission(self):
+        """
+        요청 단위 입장 제어
+
+        Raises:
+            PoolClosedError: 풀이 종료됨
+            PoolSaturatedError: 실행 + 대기 슬롯이 모두 사용 중
+        """
+        if self._closed:
+            raise PoolClosedError("Inference pool is shutting down")
+        if self.saturated:
+            self._rejected += 1
+            raise PoolSaturatedError(self.retry_after())
+
+        self._admitted += 1
+        try:
+            yield
+        finally:
+            self._admitted -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        """동기 함수를 워커 스레드에서 실행하고 결과를 기다림"""
+        if self._closed:
+            raise PoolClosedError("Inference pool is shutting down")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(self._call, fn, *args, **kwargs)
+        )
+
+    async def stream(self, fn, *args, **kwargs):
+        """
+        워커 스레드에서 생성되는 항목을 생성 즉시 비동기로 전달
+
+        fn(emit, should_stop, *args, **kwargs) 형태로 호출된다.
+        - emit(item): 항목을 이벤트 루프 쪽으로 전달
+        - should_stop(): 소비자가 중단(클라이언트 연결 종료 등)했으면 True
+          → fn은 항목 사이마다 확인하여 디코딩 루프를 멈춰야 한다.
+
+        fn에서 발생한 예외는 마지막 항목 이후 그대로 전파된다.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def emit(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                cancelled.set()  # 이벤트 루프 종료됨
+
+        def produce():
+            try:
+                return fn(emit, cancelled.is_set, *args, **kwargs)
+            finally:
+                emit(_STREAM_END)
+
+        task = asyncio.ensure_future(self.run(produce))
+        # 소비자가 먼저 중단한 경우에도 워커 예외가 '처리되지 않음' 경고로 남지 않도록 회수
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        try:
+            while True:
+                item = await queue.get()
+                if item is _STREAM_END:
+                    break
+                yield item
+            await task
+        finally:
+            cancelled.set()
+
+    def _call(self, fn, *args, **kwargs):
+        with self._lock:
+            self._running += 1
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                if self._avg_job_seconds <= 0:
+                    self._avg_job_seconds = elapsed
+                else:
+                    self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+
+    def stats(self) -> dict:
+        """헬스 체크용 상태 스냅샷"""
+        with self._lock:
+            running = self._running
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": running,
+            "queued": max(0, self._admitted - running),
+            "admitted": self._admitted,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_job_seconds": round(self._avg_job_seconds, 2)
+        }
+
+    def shutdown(self, wait: bool = False):
+        """새 요청 차단 후 워커 스레드 정리"""
+        self._closed = True
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,175 @@
+"""
+오디오 전처리 (인코더 입력 준비)
+- 업로드(영상 컨테이너 포함)를 PyAV로 한 번만 디코딩해 바로 16kHz mono float32로 변환
+  (Node 측 MP3 변환·분할 없이 원본 파일을 그대로 받음)
+- VAD로 앞뒤 침묵과 긴 내부 침묵을 잘라 낸 오디오만 인코더에 전달
+- 잘라 낸 위치는 침묵 맵(SilenceMap)에 기록해 세그먼트/단어 타임스탬프를 원본 기준으로 복원
+- 요청당 VAD는 여기서 한 번만 실행 (/transcribe/long 창 분할, 언어 감지, 배치 청크 분할이 결과를 재사용)
+"""
+
+import bisect
+import gc
+import os
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional, Tuple
+
+import numpy as np
+
+from whisper_ingest import SAMPLE_RATE
+
+TRIM_SILENCE = os.getenv("WHISPER_TRIM_SILENCE", "1") != "0"                   # 0이면 faster-whisper 내부 VAD 사용
+TRIM_MIN_SILENCE_MS = int(os.getenv("WHISPER_TRIM_MIN_SILENCE_MS", "500"))     # 잘라 낼 최소 침묵 길이
+TRIM_SPEECH_PAD_MS = int(os.getenv("WHISPER_TRIM_SPEECH_PAD_MS", "400"))       # 음성 구간 앞뒤로 남길 여유
+CHUNK_SECONDS = 30  # Whisper 디코딩 창 길이 (음성 구간 최대 길이, 배치 청크 상한)
+
+DECODE_GROUP_SAMPLES = 500000  # PyAV 프레임을 묶어 리샘플링하는 단위
+
+
+def decode_file(fileobj: BinaryIO) -> np.ndarray:
+    """
+    오디오/영상 파일의 첫 오디오 스트림을 16kHz mono float32로 디코딩 (동기 - 워커 스레드에서 호출)
+
+    faster_whisper.audio.decode_audio와 달리 s16을 거치지 않고 리샘플러가 바로 float32를 출력한다.
+    """
+    import av  # faster-whisper 의존성 - 첫 디코딩 시 로드
+
+    resampler = av.audio.resampler.AudioResampler(format="flt", layout="mono", rate=SAMPLE_RATE)
+    fifo = av.audio.fifo.AudioFifo()
+    blocks = []
+
+    def resample(frame):
+        blocks.extend(r.to_ndarray().reshape(-1) for r in resampler.resample(frame))
+
+    fileobj.seek(0)
+    with av.open(fileobj, mode="r", metadata_errors="ignore") as container:
+        # 작은 프레임을 묶어 리샘플링 호출 수를 줄임
+        for frame in container.decode(audio=0):
+            try:
+                fifo.write(frame)
+            except (av.error.InvalidDataError, ValueError):
+                continue  # 손상된 프레임 또는 중간에 형식이 바뀐 프레임은 건너뜀
+            if fifo.samples >= DECODE_GROUP_SAMPLES:
+                resample(fifo.read())
+        if fifo.samples:
+            resample(fifo.read())
+        resample(None)  # 리샘플러에 남은 샘플 flush
+
+    # PyAV 리샘플러 관련 객체가 GC 전까지 해제되지 않는 문제 (faster-whisper #390)
+    del resampler
+    gc.collect()
+    if not blocks:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(blocks).astype(np.float32, copy=False)
+
+
+class SilenceMap:
+    """
+    잘라 낸 오디오 시각 ↔ 원본 시각 변환
+
+    spans: 남긴 구간 [(원본 시작 샘플, 원본 끝 샘플), ...] - 잘라 낸 오디오에서는 빈틈 없이 이어 붙임
+    """
+
+    def __init__(self, spans: List[Tuple[int, int]], total_samples: int):
+        self.spans = spans
+        self.total_samples = total_samples
+        self._trimmed_starts = []  # 잘라 낸 오디오에서 각 구간의 시작 샘플
+        position = 0
+        for start, end in spans:
+            self._trimmed_starts.append(position)
+            position += end - start
+        self.kept_samples = position
+
+    def to_original(self, seconds: float, is_end: bool = False) -> float:
+        """
+        잘라 낸 오디오 기준 시각(초) → 원본 기준 시각(초)
+
+        구간 경계에 걸린 끝 시각(is_end)은 다음 구간 시작이 아닌 앞 구간 끝으로 변환한다.
+        """
+        if not self.spans:
+            return seconds
+        sample = int(round(seconds * SAMPLE_RATE))
+        find = bisect.bisect_left if is_end else bisect.bisect_right
+        index = max(0, min(find(self._trimmed_starts, sample) - 1, len(self.spans) - 1))
+        original = self.spans[index][0] + sample - self._trimmed_starts[index]
+        return original / SAMPLE_RATE
+
+    def cut_points(self) -> List[int]:
+        """잘라 낸 오디오에서 침묵을 제거한 이음매 위치 (샘플) - 창 분할 후보"""
+        return self._trimmed_starts[1:]
+
+    def clip_timestamps(self, max_seconds: float = CHUNK_SECONDS) -> List[dict]:
+        """배치 파이프라인 입력 청크 (이음매에서 나눈 max_seconds 이하 구간, 잘라 낸 오디오 기준 샘플)"""
+        limit = int(max_seconds * SAMPLE_RATE)
+        chunks = []
+        for (start, end), trimmed_start in zip(self.spans, self._trimmed_starts):
+            trimmed_end = trimmed_start + end - start
+            if chunks and trimmed_end - chunks[-1]["start"] <= limit:
+                chunks[-1]["end"] = trimmed_end
+                continue
+            # 구간 하나가 상한보다 길면 (VAD가 이미 max_seconds로 나누므로 드묾) 고정 길이로 자름
+            for piece in range(trimmed_start, trimmed_end, limit):
+                chunks.append({"start": piece, "end": min(piece + limit, trimmed_end)})
+        return chunks
+
+    def to_dict(self) -> dict:
+        return {
+            "duration": round(self.total_samples / SAMPLE_RATE, 2),
+            "speech_duration": round(self.kept_samples / SAMPLE_RATE, 2),
+            "trimmed_seconds": round((self.total_samples - self.kept_samples) / SAMPLE_RATE, 2),
+            "spans": len(self.spans)
+        }
+
+
+@dataclass
+class PreprocessedAudio:
+    """인코더에 전달할 오디오 (침묵 제거 시 silence_map으로 원본 시각 복원)"""
+    audio: np.ndarray
+    duration: float                        # 원본 길이 (초)
+    silence_map: Optional[SilenceMap] = None
+
+    @property
+    def trimmed(self) -> bool:
+        return self.silence_map is not None
+
+    def summary(self) -> dict:
+        """응답의 preprocess 항목"""
+        if self.silence_map is not None:
+            return {"trimmed": True, **self.silence_map.to_dict()}
+        duration = round(self.duration, 2)
+        return {"trimmed": False, "duration": duration, "speech_duration": duration, "trimmed_seconds": 0.0}
+
+
+def find_speech(audio: np.ndarray) -> List[Tuple[int, int]]:
+    """VAD 음성 구간 (원본 샘플, 앞뒤 여유 포함, 구간당 최대 CHUNK_SECONDS)"""
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    speech = get_speech_timestamps(audio, VadOptions(
+        min_silence_duration_ms=TRIM_MIN_SILENCE_MS,
+        speech_pad_ms=TRIM_SPEECH_PAD_MS,
+        max_speech_duration_s=CHUNK_SECONDS
+    ))
+    spans = []
+    for chunk in speech:
+        # 여유끼리 겹치면 앞 구간 끝에서 시작 (30초 분할 지점은 이음매로 유지)
+        start = max(chunk["start"], spans[-1][1] if spans else 0)
+        end = min(chunk["end"], len(audio))
+        if end > start:
+            spans.append((start, end))
+    return spans
+
+
+def trim_silence(audio: np.ndarray) -> PreprocessedAudio:
+    """
+    침묵을 잘라 낸 오디오와 침묵 맵 생성 (동기 - 워커 스레드에서 호출)
+
+    음성이 전혀 없으면 자르지 않는다 (faster-whisper 내부 VAD가 처리).
+    """
+    duration = len(audio) / SAMPLE_RATE
+    spans = find_speech(audio) if len(audio) else []
+    if not spans:
+        return PreprocessedAudio(audio, duration)
+    if len(spans) == 1 and spans[0] == (0, len(audio)):
+        trimmed = audio
+    else:
+        trimmed = np.concatenate([audio[start:end] for start, end in spans])
+    return PreprocessedAudio(trimmed, duration, SilenceMap(spans, len(audio)))
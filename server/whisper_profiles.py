@@ -0,0 +1,97 @@
+"""
+디코딩 프로파일
+- 요청별로 속도/정확도 절충을 선택 (fast / balanced / accurate)
+- word_timestamps는 호출자가 단어 단위 타임스탬프를 요청할 때만 켬
+  (정렬 패스 비용이 추가되므로 결과를 버릴 거라면 끄는 것이 이득)
+- 언어는 요청별로 지정 (auto면 디코딩 전에 감지해 고정, whisper_language.py)
+"""
+
+import os
+from dataclasses import dataclass, field, replace
+from typing import Optional
+
+from whisper_guards import COMPRESSION_RATIO_THRESHOLD, LOG_PROB_THRESHOLD, NO_SPEECH_THRESHOLD
+
+# 모든 프로파일 공통 옵션 (language는 요청별로 설정)
+COMMON_OPTIONS = {
+    "vad_filter": True,  # Voice Activity Detection (침묵 구간 제거)
+    "vad_parameters": {
+        "min_silence_duration_ms": 500  # 0.5초 이상 침묵 제거
+    },
+    # 온도 fallback 조건 (whisper_guards.py - 넘으면 다음 온도로 다시 디코딩)
+    "compression_ratio_threshold": COMPRESSION_RATIO_THRESHOLD,
+    "log_prob_threshold": LOG_PROB_THRESHOLD,
+    "no_speech_threshold": NO_SPEECH_THRESHOLD,
+}
+
+# 프로파일별 model.transcribe 옵션
+DECODE_PROFILES = {
+    # greedy 디코딩, 온도 fallback 축소 - 초안/짧은 클립용
+    "fast": {
+        "beam_size": 1,
+        "best_of": 1,
+        "temperature": [0.0, 0.4, 0.8],
+        "word_timestamps": False,
+    },
+    # 기존과 동일한 beam search, 사용하지 않는 단어 정렬 패스 제거
+    "balanced": {
+        "beam_size": 5,
+        "word_timestamps": False,
+    },
+    # 기존 설정 그대로 (beam 5 + 단어 타임스탬프)
+    "accurate": {
+        "beam_size": 5,
+        "word_timestamps": True,
+    },
+}
+
+DEFAULT_PROFILE = os.getenv("WHISPER_PROFILE", "balanced")
+
+
+class UnknownProfileError(ValueError):
+    """정의되지 않은 프로파일 이름 (HTTP 400)"""
+
+
+@dataclass
+class DecodeProfile:
+    """요청에 적용할 디코딩 설정"""
+    name: str
+    options: dict = field(default_factory=dict)  # model.transcribe 인자
+    return_words: bool = False                  # 응답에 단어 단위 타임스탬프 포함
+    language: str = "ko"                        # 언어 코드 또는 auto (options["language"]는 auto일 때 None)
+
+    def cache_params(self) -> dict:
+        """캐시 키에 포함할 파라미터"""
+        return {"profile": self.name, "words": self.return_words, **self.options, "language": self.language}
+
+    def with_language(self, language: str) -> "DecodeProfile":
+        """감지한 언어로 고정한 프로파일 (캐시 키는 요청한 language 그대로)"""
+        return replace(self, options={**self.options, "language": language})
+
+    def without_vad(self) -> "DecodeProfile":
+        """전처리에서 침묵을 이미 잘라 낸 오디오용 (faster-whisper 내부 VAD 생략)"""
+        options = {key: value for key, value in self.options.items() if key != "vad_parameters"}
+        return replace(self, options={**options, "vad_filter": False})
+
+    def with_prompt(self, prompt: str) -> "DecodeProfile":
+        """앞 문맥을 initial_prompt로 넘기는 프로파일 (체크포인트에서 이어서 디코딩할 때)"""
+        return replace(self, options={**self.options, "initial_prompt": prompt})
+
+
+def resolve_profile(name: Optional[str] = None, word_timestamps: bool = False,
+                    language: str = "ko") -> DecodeProfile:
+    """
+    프로파일 이름, 단어 타임스탬프 요청 여부, 언어(코드 또는 auto)로 디코딩 설정 생성
+
+    Raises:
+        UnknownProfileError: 정의되지 않은 프로파일
+    """
+    name = (name or DEFAULT_PROFILE).lower()
+    if name not in DECODE_PROFILES:
+        raise UnknownProfileError(
+            f"Unknown profile: {name} (available: {', '.join(DECODE_PROFILES)})"
+        )
+    options = {**COMMON_OPTIONS, **DECODE_PROFILES[name], "language": None if language == "auto" else language}
+    if word_timestamps:
+        options["word_timestamps"] = True
+    return DecodeProfile(name=name, options=options, return_words=word_timestamps, language=language)
@@ -0,0 +1,95 @@
+"""
+초안 → 보정 2단계 전사 (/transcribe/draft)
+- 1단계: 작은 모델(WHISPER_DRAFT_MODEL, 기본 tiny)로 전체 강의를 greedy 디코딩해 세그먼트를 바로 전송
+- 2단계: 초안 세그먼트 중 신뢰도가 낮은 것(avg_logprob가 낮거나, no_speech_prob·compression_ratio가 높음)만
+  요청한 모델·프로파일로 다시 디코딩해 해당 초안 세그먼트를 교체(patch)
+- 깨끗한 오디오에서는 보정 구간이 적어 전체 연산량이 정밀 모델 전체 디코딩보다 훨씬 작고,
+  첫 텍스트까지의 시간은 작은 모델의 첫 창 디코딩 시간 수준
+"""
+
+import os
+from dataclasses import dataclass, replace
+from typing import List, Tuple
+
+from whisper_guards import COMPRESSION_RATIO_THRESHOLD
+from whisper_ingest import SAMPLE_RATE
+from whisper_preprocess import CHUNK_SECONDS
+from whisper_profiles import DecodeProfile
+
+DRAFT_MODEL = os.getenv("WHISPER_DRAFT_MODEL", "tiny")  # 초안 모델 (compute type은 요청과 동일)
+REFINE_LOG_PROB = float(os.getenv("WHISPER_REFINE_LOG_PROB", "-0.5"))    # avg_logprob가 이보다 낮으면 보정
+REFINE_NO_SPEECH = float(os.getenv("WHISPER_REFINE_NO_SPEECH", "0.5"))   # no_speech_prob가 이보다 높으면 보정
+REFINE_PAD_SECONDS = 0.3  # 보정 구간 앞뒤 여유 (세그먼트 경계의 잘린 음절 보완)
+
+# greedy, 온도 fallback 없음 (초안은 속도 우선 - 품질은 보정 단계에서)
+DRAFT_OPTIONS = {
+    "beam_size": 1,
+    "best_of": 1,
+    "temperature": [0.0],
+    "word_timestamps": False,
+}
+
+
+def draft_profile(profile: DecodeProfile) -> DecodeProfile:
+    """요청 프로파일(언어, VAD 설정 유지)의 초안용 greedy 버전"""
+    return replace(profile, name="draft", options={**profile.options, **DRAFT_OPTIONS}, return_words=False)
+
+
+def needs_refine(segment) -> bool:
+    """초안 세그먼트(faster-whisper Segment)의 신뢰도가 낮아 정밀 모델로 다시 디코딩할지"""
+    return (
+        segment.avg_logprob < REFINE_LOG_PROB
+        or segment.no_speech_prob > REFINE_NO_SPEECH
+        or segment.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+    )
+
+
+@dataclass
+class DraftSegment:
+    """초안 세그먼트 (start/end: 인코더 입력 오디오 기준 초, segment: 응답 형식)"""
+    start: float
+    end: float
+    segment: dict
+    refine: bool
+
+
+@dataclass
+class RefineSpan:
+    """보정 구간 - 연속된 저신뢰 초안 세그먼트 [first, last]를 한 번에 다시 디코딩"""
+    first: int
+    last: int
+    start: int  # 인코더 입력 오디오 기준 샘플 (여유 포함)
+    end: int
+
+    @property
+    def seconds(self) -> float:
+        return (self.end - self.start) / SAMPLE_RATE
+
+
+def plan_refine_spans(drafts: List[DraftSegment], total_samples: int,
+                      max_seconds: float = CHUNK_SECONDS) -> List[RefineSpan]:
+    """
+    보정할 초안 세그먼트를 연속 구간으로 묶음 (구간당 max_seconds 이하 - Whisper 창 하나로 디코딩)
+
+    여유는 이웃 세그먼트 경계를 넘지 않는다 (보정하지 않는 이웃 세그먼트와 겹치지 않도록).
+    """
+    spans: List[Tuple[int, int]] = []  # [first, last] 초안 인덱스
+    for index, draft in enumerate(drafts):
+        if not draft.refine:
+            continue
+        if (spans and spans[-1][1] == index - 1
+                and draft.end - drafts[spans[-1][0]].start <= max_seconds):
+            spans[-1] = (spans[-1][0], index)
+        else:
+            spans.append((index, index))
+
+    planned = []
+    for first, last in spans:
+        lower = drafts[first - 1].end if first > 0 else 0.0
+        upper = drafts[last + 1].start if last + 1 < len(drafts) else total_samples / SAMPLE_RATE
+        start = max(lower, drafts[first].start - REFINE_PAD_SECONDS)
+        end = min(upper, drafts[last].end + REFINE_PAD_SECONDS)
+        planned.append(RefineSpan(
+            first, last, int(start * SAMPLE_RATE), min(total_samples, int(round(end * SAMPLE_RATE)))
+        ))
+    return planned
@@ -0,0 +1,146 @@
+"""
+프로세스 리소스 측정 유틸리티
+- 외부 의존성(psutil) 없이 현재 프로세스 RSS 조회 (Linux / Windows / 기타 POSIX)
+- 요청 구간 동안의 최대 RSS 샘플링
+- CPU 고정 (Linux sched_setaffinity / Windows SetProcessAffinityMask) - 여러 워커 프로세스가 코어를 나눠 쓸 때
+"""
+
+import os
+import sys
+import threading
+
+
+def _rss_linux() -> int:
+    with open("/proc/self/statm", "rb") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _rss_windows() -> int:
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+    ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb)
+    return int(counters.WorkingSetSize)
+
+
+def _rss_fallback() -> int:
+    # 현재 RSS를 얻을 수 없는 플랫폼: 프로세스 최대 RSS로 대체 (macOS는 bytes, 그 외 KB)
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+if sys.platform.startswith("linux"):
+    _rss_impl = _rss_linux
+elif sys.platform == "win32":
+    _rss_impl = _rss_windows
+else:
+    _rss_impl = _rss_fallback
+
+
+def current_rss() -> int:
+    """현재 프로세스 RSS (bytes), 조회 실패 시 0"""
+    try:
+        return _rss_impl()
+    except Exception:
+        return 0
+
+
+def parse_cpu_list(spec: str) -> list:
+    """"0-3,6" 형식 CPU 목록 → [0, 1, 2, 3, 6] (형식 오류 시 ValueError)"""
+    cpus = set()
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def set_cpu_affinity(cpus: list) -> bool:
+    """현재 프로세스를 주어진 CPU에만 스케줄링 - 지원하지 않는 플랫폼(macOS 등)이면 False"""
+    if not cpus:
+        return False
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+        return True
+    if sys.platform == "win32":
+        import ctypes
+        mask = sum(1 << cpu for cpu in cpus)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        return bool(ctypes.windll.kernel32.SetProcessAffinityMask(handle, ctypes.c_size_t(mask)))
+    return False
+
+
+def available_cpus() -> int:
+    """이 프로세스가 쓸 수 있는 CPU 수 (affinity 반영, 알 수 없으면 전체 코어 수)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class RssSampler:
+    """
+    with 블록 동안 프로세스 RSS를 주기적으로 샘플링하여 최대값 기록
+
+    동시 요청이 있으면 다른 요청의 메모리도 함께 측정되므로,
+    요청별 절감 효과는 단독 실행 시 값으로 비교해야 한다.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.start_rss = 0
+        self.peak_rss = 0
+        self.end_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start_rss = current_rss()
+        self.peak_rss = self.start_rss
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.end_rss = current_rss()
+        self.peak_rss = max(self.peak_rss, self.end_rss)
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = current_rss()
+            if rss > self.peak_rss:
+                self.peak_rss = rss
+
+    def summary(self) -> str:
+        """로그용 요약 문자열 (MB)"""
+        mb = 1024 * 1024
+        return (
+            f"rss_start={self.start_rss / mb:.1f}MB, "
+            f"rss_peak={self.peak_rss / mb:.1f}MB, "
+            f"rss_delta={(self.peak_rss - self.start_rss) / mb:+.1f}MB"
+        )
@@ -0,0 +1,395 @@
+"""
+강의 전사 검색 인덱스 (전문 검색 + 시각 탐색)
+- 완료된 전사의 세그먼트를 강의 ID 단위로 SQLite에 저장 (JSON 결과를 다시 읽지 않음)
+- 전문 검색: FTS5 (trigram 토크나이저 - 띄어쓰기·조사와 무관한 부분 문자열 검색, 한국어 강의용)
+  - SQLite 3.34 미만이라 trigram이 없으면 unicode61 (단어 단위 + 접두어 검색)
+  - trigram에서 3글자 미만 검색어는 인덱스를 쓸 수 없어 LIKE 조건으로 (다른 검색어가 있으면 그 결과 안에서만)
+  - 흔한 단어로 일치 세그먼트가 많으면 bm25 점수를 모두 매기지 않음 (RANK_CANDIDATES)
+  - 한 강의 안 검색은 그 강의 세그먼트(시간당 ~1000개)만 훑음
+- 시각 탐색: (lecture_id, start) B-tree 인덱스에서 start <= t인 마지막 세그먼트 (정렬된 타임스탬프 이분 탐색과 같음)
+- 같은 강의 ID로 다시 넣으면 교체 (재전사, Node가 조립한 최종 전사)
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+SEARCH_INDEX = os.getenv("WHISPER_SEARCH_INDEX", "1") != "0"
+TRIGRAM_MIN_CHARS = 3  # trigram 인덱스를 쓸 수 있는 최소 검색어 길이
+RANK_CANDIDATES = 5000  # 관련도(bm25) 점수를 매길 최대 일치 세그먼트 수 (넘으면 점수 없이 최근 강의부터)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lectures (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    source TEXT,
+    language TEXT,
+    duration REAL,
+    segments INTEGER NOT NULL DEFAULT 0,
+    indexed REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    lecture_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    text TEXT NOT NULL,
+    UNIQUE (lecture_id, seq)
+);
+CREATE INDEX IF NOT EXISTS segments_time ON segments (lecture_id, start);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, content='segments', content_rowid='id', tokenize='{tokenizer}'
+);
+CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts (segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_TIMESTAMP = re.compile(r"^(?:(\d+):)?(?:(\d+):)?(\d+(?:\.\d+)?)$")
+
+
+class InvalidQueryError(ValueError):
+    """빈 검색어, 잘못된 시각 또는 세그먼트 형식 (HTTP 400)"""
+
+
+class LectureNotFoundError(KeyError):
+    """인덱스에 없는 강의 ID (HTTP 404)"""
+
+
+def parse_timestamp(value: str) -> float:
+    """
+    시각 문자열 → 초 ("01:23:45", "83:45", "5025", "5025.5")
+
+    Raises:
+        InvalidQueryError: 형식 오류
+    """
+    match = _TIMESTAMP.match(value.strip())
+    if match is None:
+        raise InvalidQueryError(f"Invalid timestamp: {value} (expected HH:MM:SS, MM:SS or seconds)")
+    first, second, seconds = match.groups()
+    hours, minutes = (first, second) if second is not None else (None, first)
+    return int(hours or 0) * 3600 + int(minutes or 0) * 60 + float(seconds)
+
+
+def fts5_tokenizer() -> Optional[str]:
+    """사용할 FTS5 토크나이저 (trigram 우선, FTS5가 없는 SQLite 빌드면 None)"""
+    db = sqlite3.connect(":memory:")
+    try:
+        for tokenizer in ("trigram", "unicode61"):
+            try:
+                db.execute(f"CREATE VIRTUAL TABLE probe_{tokenizer} USING fts5(text, tokenize='{tokenizer}')")
+                return tokenizer
+            except sqlite3.OperationalError:
+                continue
+        return None
+    finally:
+        db.close()
+
+
+@dataclass
+class SearchHit:
+    """검색 결과 세그먼트 (highlights: text 안의 검색어 위치 [시작, 끝) 문자 오프셋)"""
+    lecture_id: str
+    title: Optional[str]
+    seq: int
+    start: float
+    end: float
+    text: str
+    highlights: List[Tuple[int, int]]
+
+    def to_dict(self) -> dict:
+        return {
+            "lecture_id": self.lecture_id,
+            "title": self.title,
+            "seq": self.seq,
+            "start": self.start,
+            "end": self.end,
+            "text": self.text,
+            "highlights": [list(span) for span in self.highlights]
+        }
+
+
+@dataclass
+class SearchResult:
+    """검색 결과 (has_more: 다음 페이지 여부, ranked: 관련도 순인지 - false면 강의·시각 또는 최근 인덱싱 순)"""
+    hits: List[SearchHit]
+    has_more: bool
+    ranked: bool
+
+
+def _highlights(text: str, terms: List[str]) -> List[Tuple[int, int]]:
+    """검색어 위치 (대소문자 무시, 겹치면 합침)"""
+    lowered = text.lower()
+    spans = []
+    for term in terms:
+        term = term.lower()
+        position = lowered.find(term)
+        while position >= 0:
+            spans.append((position, position + len(term)))
+            position = lowered.find(term, position + len(term))
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _segment_dict(row: sqlite3.Row) -> dict:
+    return {"seq": row["seq"], "start": row["start"], "end": row["end"], "text": row["text"]}
+
+
+class TranscriptIndex:
+    """SQLite 강의 전사 인덱스 (스레드 안전, 여러 워커 프로세스가 같은 파일을 공유)"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            str(self.directory / "transcripts.sqlite3"), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        row = self._db.execute("SELECT sql FROM sqlite_master WHERE name = 'segments_fts'").fetchone()
+        if row is not None:
+            # 기존 인덱스는 만들 때의 토크나이저 유지
+            self.tokenizer = "trigram" if "trigram" in row["sql"] else "unicode61"
+        else:
+            self.tokenizer = fts5_tokenizer()
+            if self.tokenizer is None:
+                self._db.close()
+                raise sqlite3.OperationalError("SQLite was built without FTS5")
+        self._db.executescript(_SCHEMA.format(tokenizer=self.tokenizer))
+        self.searches = 0
+        self.seeks = 0
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def put(self, lecture_id: str, segments: Iterable[dict], title: Optional[str] = None,
+            source: Optional[str] = None, language: Optional[str] = None,
+            duration: Optional[float] = None) -> int:
+        """
+        강의 전사 저장 (같은 ID가 있으면 교체)
+
+        Args:
+            segments: 응답 형식 세그먼트 ({"start", "end", "text"}, 원본 오디오 기준 초 - 빈 텍스트는 건너뜀)
+            source: 전사 경로 (long, job, client)
+
+        Returns:
+            저장한 세그먼트 수
+
+        Raises:
+            InvalidQueryError: start/end/text가 없는 세그먼트
+        """
+        rows = []
+        try:
+            for segment in segments:
+                text = str(segment["text"]).strip()
+                if text:
+                    rows.append((lecture_id, len(rows), float(segment["start"]), float(segment["end"]), text))
+        except (KeyError, TypeError, ValueError) as e:
+            raise InvalidQueryError(f"Segments must have numeric start/end and text: {e}")
+        if duration is None:
+            duration = rows[-1][3] if rows else 0.0
+        with self._transaction() as db:
+            db.execute("DELETE FROM segments WHERE lecture_id = ?", (lecture_id,))
+            db.executemany(
+                "INSERT INTO segments (lecture_id, seq, start, end, text) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            db.execute(
+                "INSERT OR REPLACE INTO lectures (id, title, source, language, duration, segments, indexed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (lecture_id, title, source, language, duration, len(rows), time.time())
+            )
+        return len(rows)
+
+    def delete(self, lecture_id: str):
+        """강의 삭제 (없으면 LectureNotFoundError)"""
+        with self._transaction() as db:
+            if db.execute("DELETE FROM lectures WHERE id = ?", (lecture_id,)).rowcount == 0:
+                raise LectureNotFoundError(lecture_id)
+            db.execute("DELETE FROM segments WHERE lecture_id = ?", (lecture_id,))
+
+    def lectures(self, limit: int = 100, offset: int = 0) -> List[dict]:
+        """강의 목록 (최근 인덱싱 순)"""
+        with self._lock:
+            return [dict(row) for row in self._db.execute(
+                "SELECT id, title, source, language, duration, segments, indexed FROM lectures "
+                "ORDER BY indexed DESC LIMIT ? OFFSET ?", (limit, offset)
+            )]
+
+    def lecture(self, lecture_id: str) -> dict:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, title, source, language, duration, segments, indexed FROM lectures WHERE id = ?",
+                (lecture_id,)
+            ).fetchone()
+        if row is None:
+            raise LectureNotFoundError(lecture_id)
+        return dict(row)
+
+    def segments(self, lecture_id: str) -> List[dict]:
+        """강의 전체 세그먼트 (시각 순, 없으면 LectureNotFoundError)"""
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM lectures WHERE id = ?", (lecture_id,)).fetchone() is None:
+                raise LectureNotFoundError(lecture_id)
+            return [_segment_dict(row) for row in self._db.execute(
+                "SELECT seq, start, end, text FROM segments WHERE lecture_id = ? ORDER BY seq", (lecture_id,)
+            )]
+
+    def _match_expression(self, terms: List[str]) -> Tuple[Optional[str], List[str]]:
+        """검색어 → (FTS5 MATCH 식, LIKE로 거를 짧은 검색어) - 검색어는 모두 포함해야 함 (AND)"""
+        if self.tokenizer == "trigram":
+            indexed = [term for term in terms if len(term) >= TRIGRAM_MIN_CHARS]
+            short = [term for term in terms if len(term) < TRIGRAM_MIN_CHARS]
+            phrases = ['"{}"'.format(term.replace('"', '""')) for term in indexed]
+        else:
+            short = []
+            phrases = ['"{}"*'.format(term.replace('"', '""')) for term in terms]
+        return (" ".join(phrases) or None), short
+
+    @staticmethod
+    def _like(terms: List[str], column: str = "s.text") -> Tuple[List[str], List[str]]:
+        conditions, params = [], []
+        for term in terms:
+            escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            conditions.append(f"{column} LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        return conditions, params
+
+    def search(self, query: str, lecture_id: Optional[str] = None, limit: int = 20,
+               offset: int = 0) -> SearchResult:
+        """
+        전체(또는 한 강의) 전사에서 검색어가 모두 들어 있는 세그먼트 검색
+
+        - 한 강의: 그 강의 세그먼트만 (lecture_id, start) 인덱스로 훑으며 부분 문자열 비교, 시각 순
+        - 전체: FTS5 인덱스, 일치 세그먼트가 RANK_CANDIDATES개 이하면 관련도(bm25) 순,
+          더 많으면(흔한 단어) 전부 점수를 매기지 않고 최근 인덱싱한 강의부터 (ranked=false)
+        - 전체 + trigram으로 찾을 수 없는 짧은 검색어만: 전체 LIKE 스캔 (강의·시각 순)
+
+        Raises:
+            InvalidQueryError: 빈 검색어
+        """
+        terms = query.split()
+        if not terms:
+            raise InvalidQueryError("Search query is empty")
+        select = "SELECT s.lecture_id, l.title, s.seq, s.start, s.end, s.text"
+        ranked = False
+        if lecture_id is not None:
+            conditions, params = self._like(terms)
+            sql = (
+                f"{select} FROM segments s JOIN lectures l ON l.id = s.lecture_id "
+                f"WHERE s.lecture_id = ? AND {' AND '.join(conditions)} ORDER BY s.start LIMIT ? OFFSET ?"
+            )
+            params = [lecture_id, *params]
+        else:
+            match, short = self._match_expression(terms)
+            conditions, params = self._like(short)
+            if match is None:
+                sql = (
+                    f"{select} FROM segments s JOIN lectures l ON l.id = s.lecture_id "
+                    f"WHERE {' AND '.join(conditions)} ORDER BY s.lecture_id, s.start LIMIT ? OFFSET ?"
+                )
+            else:
+                with self._lock:
+                    candidates = self._db.execute(
+                        "SELECT COUNT(*) FROM (SELECT rowid FROM segments_fts WHERE segments_fts MATCH ? LIMIT ?)",
+                        (match, RANK_CANDIDATES + 1)
+                    ).fetchone()[0]
+                ranked = candidates <= RANK_CANDIDATES
+                order = "segments_fts.rank" if ranked else "segments_fts.rowid DESC"
+                sql = (
+                    f"{select} FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid "
+                    f"JOIN lectures l ON l.id = s.lecture_id "
+                    f"WHERE {' AND '.join(['segments_fts MATCH ?', *conditions])} ORDER BY {order} LIMIT ? OFFSET ?"
+                )
+                params = [match, *params]
+
+        with self._lock:
+            rows = self._db.execute(sql, (*params, limit + 1, offset)).fetchall()
+            self.searches += 1
+        hits = [
+            SearchHit(row["lecture_id"], row["title"], row["seq"], row["start"], row["end"], row["text"],
+                      _highlights(row["text"], terms))
+            for row in rows[:limit]
+        ]
+        return SearchResult(hits, len(rows) > limit, ranked)
+
+    def at(self, lecture_id: str, seconds: float, context: int = 0) -> dict:
+        """
+        강의의 특정 시각에 말한 내용
+
+        Returns:
+            {"segment" (start <= t인 마지막 세그먼트, t가 첫 세그먼트보다 앞이면 첫 세그먼트),
+             "within" (t가 그 세그먼트 안인지 - false면 침묵 구간), "before", "after" (앞뒤 context개)}
+
+        Raises:
+            LectureNotFoundError: 인덱스에 없는 강의
+        """
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM lectures WHERE id = ?", (lecture_id,)).fetchone() is None:
+                raise LectureNotFoundError(lecture_id)
+            row = self._db.execute(
+                "SELECT seq, start, end, text FROM segments WHERE lecture_id = ? AND start <= ? "
+                "ORDER BY start DESC LIMIT 1", (lecture_id, seconds)
+            ).fetchone() or self._db.execute(
+                "SELECT seq, start, end, text FROM segments WHERE lecture_id = ? ORDER BY start LIMIT 1",
+                (lecture_id,)
+            ).fetchone()
+            neighbours = []
+            if row is not None and context > 0:
+                neighbours = self._db.execute(
+                    "SELECT seq, start, end, text FROM segments WHERE lecture_id = ? AND seq BETWEEN ? AND ? "
+                    "AND seq != ? ORDER BY seq",
+                    (lecture_id, row["seq"] - context, row["seq"] + context, row["seq"])
+                ).fetchall()
+            self.seeks += 1
+        if row is None:
+            return {"segment": None, "within": False, "before": [], "after": []}
+        return {
+            "segment": _segment_dict(row),
+            "within": row["start"] <= seconds <= row["end"],
+            "before": [_segment_dict(r) for r in neighbours if r["seq"] < row["seq"]],
+            "after": [_segment_dict(r) for r in neighbours if r["seq"] > row["seq"]]
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COUNT(*) AS lectures, COALESCE(SUM(segments), 0) AS segments, "
+                "COALESCE(SUM(duration), 0) AS duration FROM lectures"
+            ).fetchone()
+            return {
+                "tokenizer": self.tokenizer,
+                "lectures": row["lectures"],
+                "segments": row["segments"],
+                "hours": round(row["duration"] / 3600, 1),
+                "searches": self.searches,
+                "seeks": self.seeks
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
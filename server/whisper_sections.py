@@ -0,0 +1,160 @@
+"""
+토큰 예산 단위 전사 섹션 (GPT 요약 입력 준비)
+- 세그먼트 경계에서 끊어 섹션마다 max_tokens 이하가 되도록 묶음 (세그먼트 목록을 한 번만 훑는 greedy)
+- 예산의 SECTION_MIN_FILL 이상 찼고 다음 세그먼트까지 SECTION_PAUSE_SECONDS 이상 쉬면 미리 끊음 (말이 끊긴 곳 = 주제 전환 후보)
+- 토큰 수: tiktoken(WHISPER_SECTION_ENCODING, 기본 o200k_base - gpt-4o-mini)이 있으면 실제 토큰 수,
+  없거나 인코딩 파일을 받을 수 없으면(오프라인) 보수적 추정 (ASCII 4자당 1토큰, 그 외 문자당 1토큰 - 실제보다 크게)
+- 섹션 텍스트는 Node 타임라인 노트 프롬프트와 같은 "[HH:MM:SS] 텍스트" 줄 (timestamps=False면 텍스트만)
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # 선택 의존성 - 없으면 추정값
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+SECTION_ENCODING = os.getenv("WHISPER_SECTION_ENCODING", "o200k_base")
+SECTION_MIN_TOKENS = 64
+SECTION_MAX_TOKENS = 128000
+SECTION_MIN_FILL = 0.75      # 이만큼 찬 섹션은 긴 침묵에서 미리 끊음
+SECTION_PAUSE_SECONDS = 2.0  # 섹션을 미리 끊을 세그먼트 사이 침묵 길이
+ESTIMATE = "estimate"
+
+_encoding_lock = threading.Lock()
+_encoding = None
+_encoding_loaded = False
+
+
+class InvalidSectionRequestError(ValueError):
+    """범위를 벗어난 섹션 토큰 예산 또는 잘못된 세그먼트 형식 (HTTP 400)"""
+
+
+def get_encoding():
+    """tiktoken 인코딩 (처음 한 번만 로드, 설치되지 않았거나 로드에 실패하면 None - 이후 추정값)"""
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if not _encoding_loaded:
+            _encoding_loaded = True
+            if tiktoken is not None:
+                try:
+                    _encoding = tiktoken.get_encoding(SECTION_ENCODING)
+                except Exception as e:  # 인코딩 파일 다운로드 실패 (오프라인) 등
+                    logger.warning(f"tiktoken encoding {SECTION_ENCODING} unavailable, estimating tokens: {e}")
+        return _encoding
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 추정 (한글 등 BMP 비ASCII 문자는 UTF-8 3바이트 - 바이트 수와 글자 수 차이로 계산)"""
+    wide = (len(text.encode("utf-8")) - len(text)) // 2
+    return -(-(len(text) - wide) // 4) + wide
+
+
+def token_counter() -> Tuple[str, Callable[[List[str]], List[int]]]:
+    """(토크나이저 이름, 줄 목록 → 토큰 수 목록)"""
+    encoding = get_encoding()
+    if encoding is None:
+        return ESTIMATE, lambda lines: [estimate_tokens(line) for line in lines]
+    return SECTION_ENCODING, lambda lines: [len(tokens) for tokens in encoding.encode_ordinary_batch(lines)]
+
+
+def check_budget(max_tokens: Optional[int]) -> Optional[int]:
+    """섹션 토큰 예산 검증 (None이면 섹션 없음)"""
+    if max_tokens is None:
+        return None
+    if not SECTION_MIN_TOKENS <= max_tokens <= SECTION_MAX_TOKENS:
+        raise InvalidSectionRequestError(
+            f"section_tokens must be between {SECTION_MIN_TOKENS} and {SECTION_MAX_TOKENS}"
+        )
+    return max_tokens
+
+
+def format_time(seconds: float) -> str:
+    """HH:MM:SS (Node utils/formatters.js formatTime과 동일)"""
+    seconds = int(float(seconds))
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+@dataclass
+class Section:
+    """세그먼트 index first~last를 묶은 섹션 (start/end: 원본 오디오 기준 초)"""
+    first: int
+    last: int
+    start: float
+    end: float
+    tokens: int
+    text: str
+
+    def to_dict(self, index: int) -> dict:
+        return {
+            "index": index,
+            "first": self.first,
+            "last": self.last,
+            "start": self.start,
+            "end": self.end,
+            "tokens": self.tokens,
+            "text": self.text
+        }
+
+
+def group_sections(segments: Sequence[dict], max_tokens: int, timestamps: bool = True) -> dict:
+    """
+    세그먼트 → 토큰 예산 섹션 (세그먼트를 한 번 훑으며 greedy로 묶음)
+
+    세그먼트 하나가 예산보다 크면 그 세그먼트만으로 된 섹션 (oversized에 index).
+
+    Raises:
+        InvalidSectionRequestError: start/end/text가 없는 세그먼트
+
+    Returns:
+        {"tokenizer", "max_tokens", "total_tokens", "oversized", "items": [{"index", "first", "last", "start", "end",
+         "tokens", "text"}]}
+    """
+    try:
+        lines = [
+            f"[{format_time(segment['start'])}] {segment['text'].strip()}" if timestamps else segment["text"].strip()
+            for segment in segments
+        ]
+        gaps = [float(current["start"]) - float(previous["end"]) for previous, current in zip(segments, segments[1:])]
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise InvalidSectionRequestError(f"Segments must have numeric start/end and text: {e}")
+    tokenizer, count = token_counter()
+    counts = count(lines)
+    fill = max_tokens * SECTION_MIN_FILL
+
+    sections: List[Section] = []
+    oversized: List[int] = []
+    first, tokens = 0, 0
+    for index, line_tokens in enumerate(counts):
+        line_tokens += 1  # 줄바꿈
+        if index > first and (
+            tokens + line_tokens > max_tokens
+            or (tokens >= fill and gaps[index - 1] >= SECTION_PAUSE_SECONDS)
+        ):
+            sections.append(_section(segments, lines, first, index - 1, tokens))
+            first, tokens = index, 0
+        tokens += line_tokens
+        if line_tokens > max_tokens:
+            oversized.append(len(sections))
+    if first < len(lines):
+        sections.append(_section(segments, lines, first, len(lines) - 1, tokens))
+
+    return {
+        "tokenizer": tokenizer,
+        "max_tokens": max_tokens,
+        "total_tokens": sum(section.tokens for section in sections),
+        "oversized": oversized,
+        "items": [section.to_dict(index) for index, section in enumerate(sections)]
+    }
+
+
+def _section(segments: Sequence[dict], lines: List[str], first: int, last: int, tokens: int) -> Section:
+    return Section(
+        first, last, segments[first]["start"], segments[last]["end"], tokens, "\n".join(lines[first:last + 1])
+    )
@@ -6,21 +6,62 @@ Faster-Whisper 로컬 전사 서버
 - OpenAI Whisper API 호환 인터페이스
 """
 
+import time
+IMPORT_STARTED = time.perf_counter()  # 시작 단계(import) 측정 기준
+
 import os
 import sys
-import tempfile
 import logging
 import asyncio
+import json
+import math
+import functools
+import sqlite3
 from pathlib import Path
-from typing import Optional
-from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional, Tuple
+from contextlib import AsyncExitStack, asynccontextmanager
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import Body, FastAPI, File, Form, Header, UploadFile, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.cors import CORSMiddleware
-from faster_whisper import WhisperModel
+import numpy as np
 import uvicorn
 
+from whisper_pool import InferencePool, PoolSaturatedError, PoolClosedError
+from whisper_ingest import SAMPLE_RATE, AudioUpload, UnsupportedAudioError, inspect_upload, load_audio, hash_upload
+from whisper_batching import BATCH_SIZE, BATCH_WINDOW_MS, MicroBatcher, batch_key, decode_batch, prepare_audio
+from whisper_cache import TranscriptionCache, make_cache_key
+from whisper_models import LoadedModel, ModelBudgetError, ModelRegistry, UnknownModelError
+from whisper_profiles import DEFAULT_PROFILE, DecodeProfile, UnknownProfileError, resolve_profile
+from whisper_longform import plan_windows
+from whisper_metrics import (
+    Counter, Gauge, StageTimingMiddleware, call_with_stages, instrument_faster_whisper,
+    merge_timings, record_stages, registry as metrics, round_timings, stage
+)
+from whisper_resources import RssSampler, available_cpus, current_rss, parse_cpu_list, set_cpu_affinity
+from whisper_startup import LOADING, StartupState
+from whisper_language import (
+    AUTO, InvalidLanguageError, LanguageCache, LanguageDetection, normalize_language, normalize_lecture_id
+)
+from whisper_guards import DecodeGuards, InvalidBudgetError, make_guards, screen_segments, transcribe_guarded
+from whisper_preprocess import TRIM_SILENCE, PreprocessedAudio, SilenceMap, trim_silence
+from whisper_jobs import (
+    FINAL_STATES, JOB_POLL_SECONDS, JOB_WINDOW_SECONDS, Job, JobNotFoundError, JobQueue, JobQueueFullError,
+    JobStore, JobWindow, default_owner, job_view
+)
+from whisper_checkpoint import CHECKPOINTS, CheckpointStore
+from whisper_formats import MEDIA_TYPES, UnsupportedFormatError, negotiate, render
+from whisper_refine import DRAFT_MODEL, DraftSegment, draft_profile, needs_refine, plan_refine_spans
+from whisper_search import SEARCH_INDEX, InvalidQueryError, LectureNotFoundError, TranscriptIndex, parse_timestamp
+from whisper_sections import InvalidSectionRequestError, check_budget, group_sections
+
+# faster-whisper(ctranslate2, tokenizers, PyAV, onnxruntime)는 모델 로드 시점에 import
+# (모듈 import만으로는 로드하지 않으므로 /livez가 바로 응답)
+if TYPE_CHECKING:
+    from faster_whisper.transcribe import TranscriptionInfo
+
 # Windows 콘솔 인코딩 설정 (한글 깨짐 방지)
 if sys.platform == 'win32':
     import io
@@ -38,9 +79,11 @@ logger = logging.getLogger(__name__)
 # Uvicorn access log에서 health check 요청 필터링
 class HealthCheckFilter(logging.Filter):
     def filter(self, record):
-        # "GET / HTTP" 또는 "GET /health" 요청은 로그에서 제외
+        # "GET / HTTP", "GET /health", "GET /metrics", "GET /livez", "GET /readyz" 요청은 로그에서 제외
         message = record.getMessage()
-        if '"GET / HTTP' in message or '"GET /health HTTP' in message:
+        if '"GET / HTTP' in message or '"GET /health HTTP' in message or '"GET /metrics' in message:
+            return False
+        if '"GET /livez' in message or '"GET /readyz' in message:
             return False
         return True
 
@@ -63,13 +106,54 @@ logging.getLogger("uvicorn.access").addFilter(HealthCheckFilter())
 # asyncio 에러 로거에 ConnectionError 필터 적용
 logging.getLogger("asyncio").addFilter(ConnectionErrorFilter())
 
-# 전역 모델 (서버 시작 시 한 번만 로드)
-model: Optional[WhisperModel] = None
+# 시작 상태 (import → 기본 모델 로드 → 예열, /readyz)
+startup = StartupState(started=IMPORT_STARTED)
+startup.record("import", time.perf_counter() - IMPORT_STARTED)
+
+# 전역 모델 레지스트리 (lifespan 이후 백그라운드에서 기본 모델 로드, 나머지는 요청 시 지연 로드)
+models: Optional[ModelRegistry] = None
+
+# 전역 추론 워커 풀 (lifespan에서 생성)
+pool: Optional[InferencePool] = None
+
+# 전역 마이크로 배처 (lifespan에서 생성, 비활성화 시 None)
+batcher: Optional[MicroBatcher] = None
+
+# 전역 전사 결과 캐시 (lifespan에서 생성, 비활성화 시 None)
+result_cache: Optional[TranscriptionCache] = None
+
+# 전역 비동기 작업 큐 (POST /jobs, lifespan에서 생성)
+jobs: Optional[JobQueue] = None
+
+# 전역 전사 체크포인트 (장시간 전사 이어서 하기, lifespan에서 생성, 비활성화 시 None)
+checkpoints: Optional[CheckpointStore] = None
+
+# 전역 강의 전사 검색 인덱스 (전문 검색 + 시각 탐색, lifespan에서 생성, 비활성화 시 None)
+transcripts: Optional[TranscriptIndex] = None
+
+# 강의별 언어 감지 결과 (language=auto + X-Lecture-Id)
+languages = LanguageCache()
 
 # 설정 (환경 변수로 오버라이드 가능)
 MODEL_SIZE = os.getenv("WHISPER_MODEL", "base")  # tiny, base, small, medium, large-v3
 DEVICE = os.getenv("WHISPER_DEVICE", "cpu")      # cpu (로컬 완전 실행을 위해 기본값 변경)
 COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE", "int8")  # int8 (CPU 최적화)
+MODEL_MEMORY_MB = int(os.getenv("WHISPER_MODEL_MEMORY_MB", "4096"))  # 동시에 올려 둘 모델 메모리 예산
+
+# 워커 프로세스 설정 (트레이가 여러 프로세스를 실행할 때 포트와 CPU 집합을 지정, whisper_dispatcher.py)
+PORT = int(os.getenv("WHISPER_PORT", "5001"))
+CPU_AFFINITY = os.getenv("WHISPER_CPU_AFFINITY", "")  # 예: "0-3" - 모델 로드(연산 스레드 생성) 전에 적용
+if CPU_AFFINITY:
+    if set_cpu_affinity(parse_cpu_list(CPU_AFFINITY)):
+        logger.info(f"CPU affinity: {CPU_AFFINITY}")
+    else:
+        logger.warning(f"CPU affinity not supported on {sys.platform}, ignoring WHISPER_CPU_AFFINITY={CPU_AFFINITY}")
+
+# 동시 전사 설정 (코어 수 = CPU_THREADS × WORKERS 가 되도록 기본값 계산, 고정된 CPU 집합 기준)
+CPU_COUNT = available_cpus()
+CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", str(min(4, CPU_COUNT))))  # 전사 1건당 연산 스레드
+WORKERS = int(os.getenv("WHISPER_WORKERS", str(max(1, CPU_COUNT // max(1, CPU_THREADS)))))  # 동시 전사 수
+MAX_QUEUE = int(os.getenv("WHISPER_MAX_QUEUE", str(WORKERS * 2)))  # 실행 대기열 깊이 (초과 시 429)
 
 # 포터블 환경 모델 캐시 경로 설정
 def get_model_cache_dir():
@@ -86,43 +170,209 @@ def get_model_cache_dir():
 
 MODEL_CACHE_DIR = os.getenv("WHISPER_CACHE", get_model_cache_dir())
 
+# 전사 결과 캐시 (동일 오디오 재요청 시 재전사 생략, 0이면 비활성화)
+RESULT_CACHE_DIR = os.getenv(
+    "WHISPER_RESULT_CACHE",
+    str(Path(__file__).parent.parent / '.cache' / 'transcripts')
+)
+RESULT_CACHE_MB = int(os.getenv("WHISPER_RESULT_CACHE_MB", "512"))
+
+# 비동기 작업 저장소 (SQLite + 업로드 사본, 워커 프로세스들이 공유)
+JOBS_DIR = os.getenv(
+    "WHISPER_JOBS_DIR",
+    str(Path(__file__).parent.parent / '.cache' / 'jobs')
+)
+
+# 장시간 전사 체크포인트 저장소 (세그먼트 단위 기록, 워커 프로세스들이 공유)
+CHECKPOINT_DIR = os.getenv(
+    "WHISPER_CHECKPOINT_DIR",
+    str(Path(__file__).parent.parent / '.cache' / 'checkpoints')
+)
+
+# 강의 전사 검색 인덱스 (SQLite FTS5, 워커 프로세스들이 공유)
+SEARCH_DIR = os.getenv(
+    "WHISPER_SEARCH_DIR",
+    str(Path(__file__).parent.parent / '.cache' / 'search')
+)
+
+# /metrics 수집 항목 (수집 시점에 전역 상태에서 계산)
+PROCESS_START_TIME = time.time()
+
+audio_seconds_total = metrics.register(Counter(
+    "whisper_audio_seconds_total", "Seconds of audio transcribed (cache hits excluded)", ("endpoint",)
+))
+trimmed_seconds_total = metrics.register(Counter(
+    "whisper_trimmed_audio_seconds_total", "Seconds of silence removed before the encoder"
+))
+metrics.register(Gauge(
+    "whisper_queue_depth", "Admitted requests waiting for an inference worker",
+    collect=lambda: pool.stats()["queued"] if pool is not None else None
+))
+metrics.register(Gauge(
+    "whisper_inflight_requests", "Admitted requests (running + queued)",
+    collect=lambda: pool.stats()["admitted"] if pool is not None else None
+))
+metrics.register(Gauge(
+    "whisper_running_jobs", "Jobs currently executing on inference workers",
+    collect=lambda: pool.stats()["running"] if pool is not None else None
+))
+metrics.register(Counter(
+    "whisper_rejected_requests_total", "Requests rejected with 429 because the queue was full",
+    collect=lambda: pool.stats()["rejected"] if pool is not None else None
+))
+metrics.register(Gauge(
+    "whisper_model_load_seconds", "Load time of each loaded model", ("model",),
+    collect=lambda: {m["name"]: m["load_seconds"] for m in models.stats()["loaded"]} if models is not None else None
+))
+metrics.register(Gauge(
+    "whisper_model_memory_mb", "Estimated memory held by loaded models",
+    collect=lambda: models.stats()["used_mb"] if models is not None else None
+))
+metrics.register(Counter(
+    "whisper_cache_hits_total", "Result cache hits",
+    collect=lambda: result_cache.stats()["hits"] if result_cache is not None else None
+))
+metrics.register(Counter(
+    "whisper_cache_misses_total", "Result cache misses",
+    collect=lambda: result_cache.stats()["misses"] if result_cache is not None else None
+))
+metrics.register(Counter(
+    "whisper_language_detections_total", "Language detections run for language=auto requests",
+    collect=lambda: languages.stats()["detections"]
+))
+metrics.register(Counter(
+    "whisper_language_cache_hits_total", "language=auto requests that reused their lecture's detected language",
+    collect=lambda: languages.stats()["hits"]
+))
+checkpoint_resumed_seconds_total = metrics.register(Counter(
+    "whisper_checkpoint_resumed_seconds_total", "Seconds of audio not decoded again thanks to checkpoints"
+))
+metrics.register(Counter(
+    "whisper_checkpoint_segments_total", "Segments committed to the checkpoint store",
+    collect=lambda: checkpoints.stats()["commits"] if checkpoints is not None else None
+))
+refined_seconds_total = metrics.register(Counter(
+    "whisper_refined_audio_seconds_total", "Seconds of low-confidence draft audio decoded again with the requested model"
+))
+metrics.register(Gauge(
+    "whisper_search_segments", "Transcript segments in the search index",
+    collect=lambda: transcripts.stats()["segments"] if transcripts is not None else None
+))
+metrics.register(Counter(
+    "whisper_search_queries_total", "Queries answered by the transcript index", ("kind",),
+    collect=lambda: (
+        {"text": transcripts.searches, "seek": transcripts.seeks} if transcripts is not None else None
+    )
+))
+decode_guards_total = metrics.register(Counter(
+    "whisper_decode_guards_total",
+    "Decode guard activations (rtf, repetition, compression_ratio, log_prob, fallback, timeout)", ("guard",)
+))
+metrics.register(Gauge(
+    "whisper_jobs", "Jobs in the shared job store by status", ("status",),
+    collect=lambda: jobs.store.counts() if jobs is not None else None
+))
+metrics.register(Gauge(
+    "whisper_startup_phase_seconds", "Duration of each startup phase (import, model_load, warmup)", ("phase",),
+    collect=lambda: dict(startup.phases)
+))
+metrics.register(Gauge(
+    "whisper_ready", "1 once the default model is loaded and warmed up",
+    collect=lambda: 1 if startup.ready else 0
+))
+metrics.register(Gauge(
+    "process_resident_memory_bytes", "Resident memory size in bytes", collect=current_rss
+))
+metrics.register(Counter(
+    "process_cpu_seconds_total", "Total user and system CPU time spent in seconds", collect=time.process_time
+))
+metrics.register(Gauge(
+    "process_start_time_seconds", "Start time of the process since unix epoch in seconds",
+    collect=lambda: PROCESS_START_TIME
+))
+
+def load_default_model():
+    """기본 모델 로드 + 예열 (동기 - 백그라운드 스레드에서 실행, 결과는 startup에 기록)"""
+    startup.set_status(LOADING)
+    try:
+        instrument_faster_whisper()
+        entry = models.load_default()
+    except Exception as e:
+        startup.mark_failed(e)
+        return
+    startup.record("model_load", entry.load_seconds)
+    startup.record("warmup", entry.warmup_seconds)
+    startup.mark_ready()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """서버 라이프사이클 관리 - 안정적 모델 로드"""
-    global model
+    """
+    서버 라이프사이클 관리
+
+    기본 모델은 백그라운드에서 로드하므로 /livez는 바로 응답하고,
+    /readyz와 전사 엔드포인트는 로드·예열이 끝날 때까지 503을 돌려준다.
+    """
+    global models, pool, batcher, result_cache, jobs, checkpoints, transcripts
     
-    logger.info(f"Loading Whisper model (size={MODEL_SIZE}, device=CPU, compute={COMPUTE_TYPE})")
     logger.info(f"Model cache directory: {MODEL_CACHE_DIR}")
+    logger.info(f"Inference pool: workers={WORKERS}, cpu_threads={CPU_THREADS}, max_queue={MAX_QUEUE}")
+    logger.info(f"Default decode profile: {DEFAULT_PROFILE}")
+    
+    models = ModelRegistry(
+        MODEL_SIZE, COMPUTE_TYPE, MODEL_MEMORY_MB,
+        device=DEVICE,
+        cpu_threads=CPU_THREADS,
+        num_workers=WORKERS,
+        download_root=MODEL_CACHE_DIR
+    )
+    logger.info(f"Model memory budget: {MODEL_MEMORY_MB}MB")
+    
+    pool = InferencePool(workers=WORKERS, max_queue=MAX_QUEUE)
     
-    max_retries = 3
-    retry_count = 0
+    if BATCH_WINDOW_MS > 0:
+        batcher = MicroBatcher(pool, batch_size=BATCH_SIZE, window_ms=BATCH_WINDOW_MS)
+        logger.info(f"Micro-batching: window={BATCH_WINDOW_MS}ms, batch_size={BATCH_SIZE}")
     
-    while retry_count < max_retries:
+    if RESULT_CACHE_MB > 0:
+        result_cache = TranscriptionCache(RESULT_CACHE_DIR, RESULT_CACHE_MB * 1024 * 1024)
+        logger.info(f"Result cache: {RESULT_CACHE_DIR} ({result_cache.stats()['entries']} entries, max {RESULT_CACHE_MB}MB)")
+    
+    if CHECKPOINTS:
+        checkpoints = CheckpointStore(CHECKPOINT_DIR)
+        pruned = checkpoints.prune()
+        stats = checkpoints.stats()
+        logger.info(
+            f"Checkpoint store: {CHECKPOINT_DIR} ({stats['audios']} audios, {stats['segments']} segments, "
+            f"{pruned} expired removed)"
+        )
+    
+    if SEARCH_INDEX:
         try:
-            model = WhisperModel(
-                MODEL_SIZE,
-                device=DEVICE,
-                compute_type=COMPUTE_TYPE,
-                download_root=MODEL_CACHE_DIR,
-                local_files_only=False  # 첫 실행 시 다운로드 허용
+            transcripts = TranscriptIndex(SEARCH_DIR)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Transcript search index disabled: {e}")
+        else:
+            stats = transcripts.stats()
+            logger.info(
+                f"Search index: {SEARCH_DIR} ({stats['lectures']} lectures, {stats['segments']} segments, "
+                f"tokenizer={stats['tokenizer']})"
             )
-            logger.info(f"Model loaded successfully (CPU mode)")
-            break
-        except Exception as e:
-            retry_count += 1
-            logger.error(f"Failed to load model (attempt {retry_count}/{max_retries}): {e}")
-            if retry_count < max_retries:
-                logger.info(f"Retrying in 5 seconds...")
-                await asyncio.sleep(5)
-            else:
-                logger.critical(f"Failed to load model after {max_retries} retries")
-                raise
+    
+    # 중단된 작업은 기본 모델 준비 후 이어서 실행
+    jobs = JobQueue(JobStore(JOBS_DIR), run_job, default_owner(PORT), ready=lambda: startup.ready)
+    await jobs.start()
+    logger.info(f"Job store: {JOBS_DIR}")
+    
+    # 기본 모델 로드는 요청 처리와 별도 스레드에서 (완료 전에도 /livez, /readyz 응답)
+    asyncio.get_running_loop().run_in_executor(None, load_default_model)
     
     yield
     
-    # 종료 시 정리
+    # 종료 시 정리 (실행 중인 작업은 기록된 창까지 남기고 다음 실행에서 이어서)
     logger.info("Server shutting down...")
+    await jobs.shutdown()
+    pool.shutdown(wait=False)
 
 
 # FastAPI 앱 초기화 (lifespan 적용)
@@ -137,92 +387,632 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 전사 요청의 업로드 수신 시간 / 전체 처리 시간 측정
+app.add_middleware(StageTimingMiddleware, paths=("/transcribe",))
+
 
 @app.get("/")
 async def health_check():
     """헬스 체크 엔드포인트"""
     return {
         "status": "running",
-        "model": MODEL_SIZE,
+        "model": models.default_name if models is not None else MODEL_SIZE,
         "device": "cpu",
-        "ready": model is not None
+        "ready": startup.ready,
+        "startup": startup.to_dict(),
+        "pool": pool.stats() if pool is not None else None,
+        "models": models.stats() if models is not None else None,
+        "batching": batcher.stats() if batcher is not None else None,
+        "cache": result_cache.stats() if result_cache is not None else None,
+        "languages": languages.stats(),
+        "jobs": jobs.stats() if jobs is not None else None,
+        "checkpoints": checkpoints.stats() if checkpoints is not None else None,
+        "search": transcripts.stats() if transcripts is not None else None,
+        "rss_mb": round(current_rss() / (1024 * 1024), 1)
     }
 
 
-@app.post("/transcribe")
-async def transcribe_audio(file: UploadFile = File(...)):
+@app.get("/livez")
+async def liveness():
+    """생존 확인 - 프로세스가 요청을 받을 수 있으면 항상 200 (모델 로드 여부 무관)"""
+    return {"status": "alive"}
+
+
+@app.get("/readyz")
+async def readiness():
+    """준비 확인 - 기본 모델 로드와 예열이 끝나야 200, 그 전(또는 실패 시)에는 503 + 시작 단계"""
+    body = startup.to_dict()
+    if not startup.ready:
+        return JSONResponse(status_code=503, content=body, headers={"Retry-After": "1"})
+    return body
+
+
+def original_time(seconds: float, silence_map: Optional[SilenceMap] = None, is_end: bool = False) -> float:
+    """인코더에 넣은 오디오 기준 시각 → 원본 기준 시각 (침묵을 잘라 내지 않았으면 그대로)"""
+    if silence_map is None:
+        return round(seconds, 2)
+    return round(silence_map.to_original(seconds, is_end), 2)
+
+
+def segment_to_dict(segment, time_offset: float = 0.0, words: bool = False,
+                    silence_map: Optional[SilenceMap] = None) -> dict:
     """
-    오디오 파일 전사
+    faster-whisper Segment → 응답용 dict (words=True면 단어 타임스탬프 포함)
+
+    타임스탬프는 time_offset을 더한 뒤 침묵 맵으로 원본 오디오 기준으로 복원한다.
+    """
+    result = {
+        "start": original_time(segment.start + time_offset, silence_map),
+        "end": original_time(segment.end + time_offset, silence_map, is_end=True),
+        "text": segment.text.strip()
+    }
+    if words and segment.words is not None:
+        result["words"] = [
+            {
+                "start": original_time(w.start + time_offset, silence_map),
+                "end": original_time(w.end + time_offset, silence_map, is_end=True),
+                "word": w.word,
+                "probability": round(w.probability, 3)
+            }
+            for w in segment.words
+        ]
+    return result
+
+
+def run_model(whisper: LoadedModel, audio: np.ndarray, profile: DecodeProfile, guards: DecodeGuards,
+              time_offset: float = 0.0, silence_map: Optional[SilenceMap] = None) -> Tuple[List[dict], "TranscriptionInfo"]:
+    """
+    16kHz mono 오디오 배열 전사 (동기 - 추론 워커 스레드에서 실행)
     
     Args:
-        file: MP3/WAV/M4A 등 오디오 파일
+        whisper: 레지스트리에서 빌린 모델
+        audio: float32 오디오 배열 (전처리에서 침묵을 잘라 냈으면 잘라 낸 배열)
+        profile: 디코딩 프로파일
+        guards: 요청의 디코딩 예산 (마감이 지나면 그때까지의 세그먼트만 반환)
+        time_offset: 세그먼트 타임스탬프에 더할 오프셋(초) - 긴 오디오의 창 전사용
+        silence_map: 잘라 낸 침묵 맵 (타임스탬프를 원본 기준으로 복원)
     
     Returns:
-        {"text": "전사된 텍스트"}
+        (세그먼트 목록, TranscriptionInfo)
+    """
+    segs, info = transcribe_guarded(whisper.model, audio, profile.options, guards)
+    return [
+        segment_to_dict(segment, time_offset + offset, profile.return_words, silence_map) for segment, offset in segs
+    ], info
+
+
+def run_window(whisper: LoadedModel, audio: np.ndarray, start: int, end: int, profile: DecodeProfile,
+               guards: DecodeGuards, silence_map: Optional[SilenceMap] = None,
+               checkpoint_key: Optional[str] = None) -> Tuple[List[dict], float]:
     """
-    global model
+    긴 오디오의 창 하나 전사 (동기 - 추론 워커 스레드에서 실행)
     
-    if model is None:
+    checkpoint_key가 있으면 세그먼트를 생성되는 대로 체크포인트에 기록하고, 이전 실행이 기록한 위치부터
+    이어서 디코딩한다 (기록된 텍스트를 initial_prompt로 넘겨 문맥 유지). 이 창의 생성기가 마감·취소·재시작
+    한도로 멈추지 않고 끝까지 디코딩했으면 완료로 표시해 다음 요청에서 디코딩 없이 재사용한다
+    (요청 전체의 partial과 무관 - 다른 창이 먼저 멈췄어도 이 창은 완료일 수 있음).
+    
+    Args:
+        start, end: 창 범위 (인코더 입력 오디오 기준 샘플)
+    
+    Returns:
+        (창 세그먼트 - 끝은 창 끝으로 제한, 체크포인트 덕분에 다시 디코딩하지 않은 오디오 길이(초))
+    """
+    if checkpoint_key is None:
+        segments, _ = run_model(whisper, audio[start:end], profile, guards, start / SAMPLE_RATE, silence_map)
+        return clip_to_window(segments, end, silence_map), 0.0
+    
+    checkpoint = checkpoints.window(checkpoint_key, start, end)
+    resume = checkpoint.committed
+    resumed_seconds = (resume - start) / SAMPLE_RATE
+    if resumed_seconds > 0:
+        checkpoint_resumed_seconds_total.inc(resumed_seconds)
+    if checkpoint.done:
+        return clip_to_window(checkpoint.segments, end, silence_map), resumed_seconds
+    
+    prompt = checkpoint.prompt() if checkpoint.resumed else None
+    if prompt is not None and profile.options.get("condition_on_previous_text", True):
+        profile = profile.with_prompt(prompt)
+    segs, _ = transcribe_guarded(whisper.model, audio[resume:end], profile.options, guards)
+    for segment, offset in segs:
+        checkpoint.commit(
+            segment_to_dict(segment, resume / SAMPLE_RATE + offset, profile.return_words, silence_map),
+            resume + int(round((offset + segment.end) * SAMPLE_RATE))
+        )
+    if segs.completed:
+        checkpoint.finish()
+    return clip_to_window(checkpoint.segments, end, silence_map), resumed_seconds
+
+
+def build_response(segments: List[dict], language: str, duration: float, model_name: str,
+                   profile: DecodeProfile, processing_time: float,
+                   detection: Optional[LanguageDetection] = None,
+                   guards: Optional[DecodeGuards] = None) -> dict:
+    """전사 결과 응답 본문 생성 (사용한 모델/프로파일, 실시간 배율(RTF), 언어 결정 방식·감지 비용, 가드 발동 포함)"""
+    return {
+        "text": " ".join(seg["text"] for seg in segments),
+        "segments": segments,
+        "language": language,
+        "language_detection": detection.to_dict() if detection is not None else None,
+        "duration": round(duration, 2),
+        "model": model_name,
+        "profile": profile.name,
+        "processing_time": round(processing_time, 2),
+        "rtf": round(processing_time / duration, 3) if duration > 0 else 0.0,
+        "partial": guards.partial if guards is not None else False,
+        "guards": guards.to_dict() if guards is not None else None
+    }
+
+
+def record_guards(guards: DecodeGuards) -> str:
+    """가드 발동 횟수를 메트릭에 반영하고 로그용 요약 반환 (발동 없으면 빈 문자열)"""
+    fired = guards.to_dict()["fired"]
+    for guard, count in fired.items():
+        decode_guards_total.inc(count, guard=guard)
+    if not fired:
+        return ""
+    summary = ",".join(f"{guard}:{count}" for guard, count in sorted(fired.items()))
+    return f", guards={summary}{', partial' if guards.partial else ''}"
+
+
+def get_guards(timeout: Optional[float]) -> DecodeGuards:
+    """요청 timeout(초)으로 디코딩 예산 생성 (음수는 400)"""
+    try:
+        return make_guards(timeout)
+    except InvalidBudgetError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def get_profile(profile: Optional[str], word_timestamps: bool, language: Optional[str] = None) -> DecodeProfile:
+    """요청 파라미터로 디코딩 프로파일 결정 (알 수 없는 이름·언어는 400)"""
+    try:
+        return resolve_profile(profile, word_timestamps, normalize_language(language))
+    except (UnknownProfileError, InvalidLanguageError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def get_lecture_id(lecture_id: Optional[str]) -> Optional[str]:
+    """X-Lecture-Id 헤더 검증 (형식 오류는 400)"""
+    try:
+        return normalize_lecture_id(lecture_id)
+    except InvalidLanguageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def apply_language(whisper: LoadedModel, source: PreprocessedAudio, profile: DecodeProfile,
+                   lecture_id: Optional[str] = None) -> Tuple[DecodeProfile, LanguageDetection]:
+    """
+    language=auto면 언어를 감지(강의별 한 번)해 고정한 프로파일 반환 (동기 - 추론 워커 스레드에서 실행)
+    
+    언어를 지정한 요청은 그대로 사용한다. 전처리에서 침묵을 잘라 냈으면
+    감지와 디코딩 모두 faster-whisper 내부 VAD를 생략한다.
+    """
+    if source.trimmed:
+        profile = profile.without_vad()
+    if profile.language != AUTO:
+        return profile, LanguageDetection(profile.language, "fixed", lecture_id=lecture_id)
+    detection = languages.resolve(whisper.model, source.audio, lecture_id, vad_filter=not source.trimmed)
+    return profile.with_language(detection.language), detection
+
+
+def get_model_key(model: Optional[str], compute_type: Optional[str]) -> Tuple[str, str]:
+    """요청 파라미터로 (모델 크기, compute type) 결정 (허용되지 않은 값은 400)"""
+    if models is None:
         raise HTTPException(status_code=503, detail="Model not loaded yet")
+    try:
+        return models.resolve(model, compute_type)
+    except UnknownModelError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@asynccontextmanager
+async def checkout_model(model_key: Tuple[str, str]):
+    """레지스트리에서 모델을 빌려 요청이 끝날 때까지 유지 (필요 시 로드)"""
+    try:
+        whisper = await run_in_threadpool(models.checkout, *model_key)
+    except ModelBudgetError as e:
+        logger.warning(f"Model checkout rejected: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except Exception as e:
+        logger.error(f"Model load failed: {e}")
+        raise HTTPException(status_code=503, detail=f"Model load failed: {e}")
+    try:
+        yield whisper
+    finally:
+        models.release(whisper)
+
+
+def decode_upload(upload: AudioUpload) -> PreprocessedAudio:
+    """
+    업로드 디코딩 + 침묵 제거 (동기 - 추론 워커 스레드에서 실행, decode/vad 단계 시간 기록)
+    
+    WHISPER_TRIM_SILENCE=0이면 자르지 않고 faster-whisper 내부 VAD에 맡긴다.
+    """
+    with stage("decode"):
+        audio = load_audio(upload)
+    if not TRIM_SILENCE:
+        return PreprocessedAudio(audio, len(audio) / SAMPLE_RATE)
+    with stage("vad"):
+        source = trim_silence(audio)
+    if source.trimmed:
+        trimmed_seconds_total.inc(source.duration - len(source.audio) / SAMPLE_RATE)
+    return source
+
+
+def plan_audio_windows(source: PreprocessedAudio, workers: int):
+    """
+    침묵 경계 분할 계획 (동기 - 추론 워커 스레드에서 실행)
+    
+    침묵을 잘라 낸 오디오는 이음매에서 나누고, 아니면 분할용 VAD를 실행해 vad 단계로 기록한다.
+    """
+    if source.trimmed:
+        return plan_windows(source.audio, workers, source.silence_map.cut_points())
+    with stage("vad"):
+        return plan_windows(source.audio, workers)
+
+
+def clip_to_window(segments: List[dict], end: int, silence_map: Optional[SilenceMap] = None) -> List[dict]:
+    """창 세그먼트의 끝을 창 끝(원본 기준)으로 제한 (창 경계는 침묵 구간이므로 창끼리 겹치지 않음)"""
+    window_end = original_time(end / SAMPLE_RATE, silence_map, is_end=True)
+    for seg in segments:
+        seg["end"] = min(seg["end"], window_end)
+    return segments
+
+
+def window_ranges(windows: List[Tuple[int, int]], silence_map: Optional[SilenceMap] = None) -> List[dict]:
+    """응답의 windows (원본 오디오 기준 초, 잘라 낸 침묵은 창 사이 또는 창 안에 포함)"""
+    return [
+        {
+            "start": original_time(start / SAMPLE_RATE, silence_map),
+            "end": original_time(end / SAMPLE_RATE, silence_map, is_end=True)
+        }
+        for start, end in windows
+    ]
+
+
+def transcribe_upload(upload: AudioUpload, whisper: LoadedModel, profile: DecodeProfile,
+                      guards: DecodeGuards, lecture_id: Optional[str] = None) -> dict:
+    """
+    업로드 오디오 전사 (동기 - 추론 워커 스레드에서 실행)
+    
+    업로드 파일 객체를 바로 디코딩하여 numpy 배열로 모델에 전달한다.
+    (전체 업로드 메모리 복사 및 임시 파일 재작성 없음)
+    
+    Args:
+        upload: inspect_upload()로 검증된 업로드
+        whisper: 레지스트리에서 빌린 모델
+        profile: 디코딩 프로파일
+        guards: 디코딩 예산 (창별 RTF, 반복, 마감)
+        lecture_id: language=auto일 때 감지 결과를 공유할 강의 ID
+    
+    Returns:
+        {"text", "segments", "language", "language_detection", "duration", "model", "profile",
+         "processing_time", "rtf", "partial", "guards", "preprocess", "timings"}
+    """
+    with RssSampler() as rss, record_stages() as timings:
+        decode_start = time.perf_counter()
+        source = decode_upload(upload)
+        decode_time = time.perf_counter() - decode_start
+        profile, detection = apply_language(whisper, source, profile, lecture_id)
+        segments, info = run_model(whisper, source.audio, profile, guards, silence_map=source.silence_map)
+    
+    result = build_response(
+        segments, info.language, source.duration, whisper.name, profile,
+        time.perf_counter() - decode_start, detection, guards
+    )
+    result["preprocess"] = source.summary()
+    result["timings"] = round_timings(timings)
+    logger.info(
+        f"Transcription completed: {upload.filename} "
+        f"(lang={info.language}/{detection.source}, detect={detection.seconds:.2f}s, "
+        f"segments={len(segments)}, chars={len(result['text'])}, "
+        f"model={whisper.name}, profile={profile.name}, rtf={result['rtf']}, "
+        f"decode={decode_time:.2f}s, speech={len(source.audio) / SAMPLE_RATE:.1f}/{source.duration:.1f}s, "
+        f"{rss.summary()}{record_guards(guards)})"
+    )
+    return result
+
+
+def prepare_upload(upload: AudioUpload, whisper: LoadedModel, profile: DecodeProfile,
+                   lecture_id: Optional[str] = None):
+    """
+    업로드 디코딩 + 언어 결정 + 배치 디코딩 입력 준비 (동기 - 추론 워커 스레드에서 실행)
+    
+    침묵을 잘라 낸 오디오는 이음매에서 나눈 30초 이하 청크를 그대로 배치 입력으로 사용한다 (VAD 재실행 없음).
+    """
+    source = decode_upload(upload)
+    profile, detection = apply_language(whisper, source, profile, lecture_id)
+    options = profile.options
+    if source.trimmed:
+        options = {**options, "clip_timestamps": source.silence_map.clip_timestamps()}
+    prepared = prepare_audio(whisper.model, source.audio, options)
+    prepared.detection = detection
+    prepared.source = source
+    return prepared
+
+
+def decode_batch_timed(model, tokenizer, options, items) -> list:
+    """배치 디코딩 + 배치 단계 시간을 청크 수로 나눈 몫을 청크별 결과에 첨부"""
+    outputs, timings = call_with_stages(decode_batch, model, tokenizer, options, items)
+    share = {key: value / len(items) for key, value in timings.items()}
+    return [(output, share) for output in outputs]
+
+
+async def transcribe_batched(upload: AudioUpload, whisper: LoadedModel, profile: DecodeProfile,
+                             guards: DecodeGuards, lecture_id: Optional[str] = None) -> dict:
+    """
+    업로드 오디오 전사 (마이크로 배칭 경로)
     
-    # 파일 확장자 검증
-    allowed_extensions = {'.mp3', '.wav', '.m4a', '.flac', '.ogg', '.opus'}
-    file_ext = Path(file.filename).suffix.lower()
+    VAD 청크를 동시에 들어온 다른 요청의 청크와 함께 배치 디코딩한다.
+    같은 모델/언어/디코딩 옵션 요청끼리만 묶인다 (batch_key).
+    배치 경로는 온도 fallback이 없으므로 반복/압축률 가드만 적용한다 (세그먼트 제외).
+    rtf 가드가 발동했을 때의 동작(첫 온도로만 디코딩)이 이 경로의 기본이고,
+    배치 디코딩은 중간에 멈출 수 없으므로 마감(timeout)이 있는 요청은 이 경로로 오지 않는다.
+    """
+    started = time.perf_counter()
+    prepared, timings = await pool.run(call_with_stages, prepare_upload, upload, whisper, profile, lecture_id)
+    info = prepared.info
+    source = prepared.source
+    key = batch_key(whisper.name, prepared.tokenizer, prepared.options)
+    runner = functools.partial(decode_batch_timed, whisper.model, prepared.tokenizer, prepared.options)
+    chunk_results = await batcher.submit(key, runner, list(zip(prepared.features, prepared.chunks_metadata)))
     
-    if file_ext not in allowed_extensions:
+    decoded = []
+    for chunk_segments, share in chunk_results:
+        merge_timings(timings, share)
+        decoded.extend(chunk_segments)
+    segments = [
+        segment_to_dict(segment, words=profile.return_words, silence_map=source.silence_map)
+        for segment in screen_segments(decoded, guards)
+    ]
+    result = build_response(
+        segments, info.language, source.duration, whisper.name, profile,
+        time.perf_counter() - started, prepared.detection, guards
+    )
+    result["preprocess"] = source.summary()
+    result["timings"] = round_timings(timings)
+    logger.info(
+        f"Transcription completed: {upload.filename} "
+        f"(lang={info.language}/{prepared.detection.source}, detect={prepared.detection.seconds:.2f}s, "
+        f"segments={len(segments)}, chars={len(result['text'])}, "
+        f"model={whisper.name}, profile={profile.name}, rtf={result['rtf']}, "
+        f"batched_chunks={len(prepared.features)}{record_guards(guards)})"
+    )
+    return result
+
+
+def get_format(accept: Optional[str], format: Optional[str]) -> str:
+    """응답 형식 협상 (알 수 없는 형식 400, msgpack 미설치 406)"""
+    try:
+        return negotiate(accept, format)
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+
+def serialize(payload: dict, response_format: str) -> bytes:
+    """응답 본문 직렬화 (동기 - 스레드 풀에서 실행, serialize 단계 시간 기록)"""
+    with stage("serialize"):
+        return render(payload, response_format)
+
+
+async def result_response(payload: dict, response_format: str, status_code: int = 200,
+                          headers: Optional[dict] = None) -> Response:
+    """협상한 형식의 응답 (긴 강의의 큰 결과도 이벤트 루프를 막지 않도록 스레드 풀에서 직렬화)"""
+    body = await run_in_threadpool(serialize, payload, response_format)
+    return Response(
+        content=body, status_code=status_code, media_type=MEDIA_TYPES[response_format],
+        headers={**(headers or {}), "Vary": "Accept"}
+    )
+
+
+def get_section_budget(section_tokens: Optional[int]) -> Optional[int]:
+    """섹션 토큰 예산 검증 (범위 밖은 400)"""
+    try:
+        return check_budget(section_tokens)
+    except InvalidSectionRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def sectionize(segments: List[dict], max_tokens: int, timestamps: bool = True) -> dict:
+    """토큰 예산 섹션 묶기 (동기 - 스레드 풀에서 실행, sections 단계 시간 기록)"""
+    with stage("sections"):
+        return group_sections(segments, max_tokens, timestamps)
+
+
+async def with_sections(result: dict, section_tokens: Optional[int]) -> dict:
+    """section_tokens를 요청했으면 응답에 sections 추가 (캐시된 결과는 그대로 두고 사본에)"""
+    if section_tokens is None:
+        return result
+    return {**result, "sections": await run_in_threadpool(sectionize, result["segments"], section_tokens)}
+
+
+def decode_params(mode: str, model_key: Tuple[str, str], profile: DecodeProfile) -> dict:
+    """같은 오디오의 결과가 같아지는 파라미터 (결과 캐시·체크포인트 키)"""
+    return {
+        "mode": mode,
+        "model": model_key[0],
+        "compute_type": model_key[1],
+        "trim_silence": TRIM_SILENCE,
+        **profile.cache_params()
+    }
+
+
+async def lookup_cache(upload: AudioUpload, mode: str, model_key: Tuple[str, str],
+                       profile: DecodeProfile,
+                       cache_control: Optional[str] = None) -> Tuple[Optional[str], Optional[dict]]:
+    """
+    업로드 해시로 캐시 조회 (추론 풀 대기열을 거치지 않음)
+    
+    Cache-Control: no-cache 요청은 조회를 건너뛰고 새로 전사한다 (결과는 저장, 벤치마크용).
+    
+    Returns:
+        (캐시 키, 캐시된 결과) - 캐시 비활성화 시 (None, None)
+    """
+    if result_cache is None:
+        return None, None
+    digest = await run_in_threadpool(hash_upload, upload)
+    key = make_cache_key(digest, decode_params(mode, model_key, profile))
+    if cache_control is not None and "no-cache" in cache_control.lower():
+        return key, None
+    return key, await run_in_threadpool(result_cache.get, key)
+
+
+async def get_checkpoint_key(upload: AudioUpload, model_key: Tuple[str, str],
+                             profile: DecodeProfile) -> Optional[str]:
+    """장시간 전사 체크포인트 키 (업로드 해시 + 디코딩 파라미터, 체크포인트 비활성화 시 None)"""
+    if checkpoints is None:
+        return None
+    digest = await run_in_threadpool(hash_upload, upload)
+    return make_cache_key(digest, decode_params("checkpoint", model_key, profile))
+
+
+async def discard_checkpoint(key: Optional[str], result: dict):
+    """전체 결과가 만들어진 오디오의 체크포인트 삭제 (마감으로 잘린 partial 결과면 남겨 재시도 시 이어서)"""
+    if key is not None and not result.get("partial"):
+        await run_in_threadpool(checkpoints.discard, key)
+
+
+async def store_cache(key: Optional[str], result: dict):
+    """전사 결과 캐시 저장 (마감으로 잘린 partial 결과는 저장하지 않음)"""
+    if result_cache is not None and key is not None and not result.get("partial"):
+        await run_in_threadpool(result_cache.put, key, result)
+
+
+async def index_transcript(lecture_id: str, result: dict, title: Optional[str], source: str):
+    """
+    완료된 전체 강의 전사를 검색 인덱스에 저장 (partial 결과는 제외, 실패해도 전사 응답에는 영향 없음)
+    """
+    if transcripts is None or result.get("partial"):
+        return
+    try:
+        count = await run_in_threadpool(
+            transcripts.put, lecture_id, result["segments"], title, source, result.get("language"), result.get("duration")
+        )
+    except Exception as e:
+        logger.warning(f"Transcript indexing failed: {lecture_id} ({e})")
+        return
+    logger.info(f"Transcript indexed: {lecture_id} ({count} segments, source={source})")
+
+
+@asynccontextmanager
+async def admit_request():
+    """추론 풀 입장 제어 - 포화 시 429, 종료 중이면 503"""
+    if models is None or pool is None or not startup.ready:
+        raise HTTPException(status_code=503, detail="Model not loaded yet", headers={"Retry-After": "5"})
+    try:
+        async with pool.admission():
+            yield
+    except PoolSaturatedError as e:
+        logger.warning(f"Request rejected: {e}")
         raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file format: {file_ext}"
+            status_code=429,
+            detail="Transcription queue is full",
+            headers={"Retry-After": str(e.retry_after)}
         )
+    except PoolClosedError:
+        raise HTTPException(status_code=503, detail="Server is shutting down")
+
+
+@asynccontextmanager
+async def admit_job(guards: DecodeGuards):
+    """
+    작업 입장 제어 - 요청과 같은 풀 입장 슬롯을 쓰되, 포화 시 거절하지 않고 슬롯이 날 때까지 대기
     
-    # 임시 파일로 저장
-    temp_file = None
+    Yields:
+        입장했으면 True, 기다리는 동안 취소(작업 취소, 서버 종료)되면 False
+    
+    Raises:
+        PoolClosedError: 풀이 종료됨
+    """
+    while pool.saturated:
+        if guards.expired():
+            yield False
+            return
+        await asyncio.sleep(min(pool.retry_after(), JOB_POLL_SECONDS))
+    async with pool.admission():
+        yield True
+
+
+@app.post("/transcribe")
+async def transcribe_audio(
+    file: UploadFile = File(...),
+    model: Optional[str] = Form(None),
+    compute_type: Optional[str] = Form(None),
+    profile: Optional[str] = Form(None),
+    word_timestamps: bool = Form(False),
+    language: Optional[str] = Form(None),
+    timeout: Optional[float] = Form(None),
+    section_tokens: Optional[int] = Form(None),
+    cache_control: Optional[str] = Header(None),
+    x_lecture_id: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    format: Optional[str] = Query(None, description="json | msgpack | columnar | columnar-msgpack (기본: Accept 헤더)")
+):
+    """
+    오디오 파일 전사
+    
+    Args:
+        file: MP3/WAV/M4A 등 오디오 파일,
+              또는 Raw PCM (Content-Type: audio/L16; rate=16000; channels=1)
+        model: 모델 크기 (tiny | base | small | ..., 기본: 현재 기본 모델) - 필요 시 지연 로드
+        compute_type: int8 | float32 등 (기본: 현재 기본 모델의 compute type)
+        profile: 디코딩 프로파일 (fast | balanced | accurate, 기본: WHISPER_PROFILE)
+        word_timestamps: True면 세그먼트별 단어 타임스탬프(words) 포함
+        language: 언어 코드 (ko, en, ...) 또는 auto (기본: WHISPER_LANGUAGE)
+        timeout: 디코딩 마감(초, 기본: WHISPER_DECODE_TIMEOUT) - 지나면 그때까지의 세그먼트를 partial=true로 반환
+        section_tokens: 지정하면 세그먼트를 이 토큰 수 이하의 섹션으로 묶어 sections로 반환 (GPT 요약 입력, whisper_sections.py)
+        X-Lecture-Id 헤더: language=auto일 때 같은 강의의 청크는 첫 청크에서 감지한 언어를 재사용
+        format 쿼리 / Accept 헤더: 응답 형식 (json, msgpack, columnar - whisper_formats.py)
+    
+    Returns:
+        {"text", "segments", "language", "language_detection", "duration", "model", "profile",
+         "processing_time", "rtf", "partial", "guards", "preprocess", "timings"}
+        language_detection: {"language", "source": fixed | detected | cache, "probability", "seconds", "lecture_id"}
+        guards: {"fired": {가드: 발동 횟수}, "partial", "timeout", "max_rtf"}
+        preprocess: {"trimmed", "duration", "speech_duration", "trimmed_seconds", "spans"} - 인코더에 넣기 전 잘라 낸 침묵
+        sections (section_tokens 지정 시): {"tokenizer", "max_tokens", "total_tokens", "oversized",
+                  "items": [{"index", "first", "last", "start", "end", "tokens", "text"}]}
+        (세그먼트 타임스탬프는 항상 원본 오디오 기준)
+    
+    Raises:
+        429: 추론 대기열 포화 (Retry-After 헤더 참고)
+        503: 모델 로딩 중, 모델 메모리 예산 부족 또는 서버 종료 중
+    """
+    # 포맷 검증 (업로드 데이터는 Starlette가 블록 단위로 스풀링해 둔 상태)
     try:
-        # 임시 파일 생성 (자동 삭제 방지)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
-            # 업로드된 파일 내용을 임시 파일에 쓰기
-            content = await file.read()
-            temp_file.write(content)
-            temp_path = temp_file.name
-        
-        logger.info(f"Transcription started: {file.filename} ({len(content)} bytes, type={file.content_type})")
-
-        def do_transcribe():
-            segs, info = model.transcribe(
-                temp_path,
-                language="ko",  # 한국어 명시 (정확도 향상)
-                beam_size=5,
-                vad_filter=True,  # Voice Activity Detection (침묵 구간 제거)
-                vad_parameters=dict(
-                    min_silence_duration_ms=500  # 0.5초 이상 침묵 제거
-                ),
-                word_timestamps=True  # 단어별 타임스탬프 활성화
-            )
-            segments_with_time = []
-            full_text_parts = []
-            for segment in segs:
-                segments_with_time.append({
-                    "start": round(segment.start, 2),
-                    "end": round(segment.end, 2),
-                    "text": segment.text.strip()
-                })
-                full_text_parts.append(segment.text)
-            full_text = " ".join(full_text_parts)
-            logger.info(
-                f"Transcription completed: {file.filename} "
-                f"(lang={info.language}, prob={info.language_probability:.2%}, "
-                f"segments={len(segments_with_time)}, chars={len(full_text)})"
-            )
-            return {
-                "text": full_text,
-                "segments": segments_with_time,
-                "language": info.language,
-                "duration": round(info.duration, 2)
-            }
+        upload = inspect_upload(file.file, file.filename, file.content_type)
+    except UnsupportedAudioError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    response_format = get_format(accept, format)
+    model_key = get_model_key(model, compute_type)
+    decode_profile = get_profile(profile, word_timestamps, language)
+    lecture_id = get_lecture_id(x_lecture_id)
+    guards = get_guards(timeout)
+    section_tokens = get_section_budget(section_tokens)
+    cache_key, cached = await lookup_cache(upload, "transcribe", model_key, decode_profile, cache_control)
+    if cached is not None:
+        logger.info(f"Cache hit: {upload.filename} ({upload.size} bytes)")
+        cached = await with_sections(cached, section_tokens)
+        return await result_response(cached, response_format, headers={"X-Cache": "HIT"})
+    
+    async with admit_request(), checkout_model(model_key) as whisper:
+        logger.info(
+            f"Transcription started: {upload.filename} "
+            f"({upload.size} bytes, type={upload.content_type}, ingest={upload.kind})"
+        )
 
-        # 1차 시도 (CPU 모드)
+        # 디코딩 + 추론은 워커 스레드에서 실행 (이벤트 루프 블로킹 방지), 마감은 입장 시점부터
+        # 마감이 있는 요청은 세그먼트마다 마감을 확인하는 순차 경로로 (배치 디코딩은 중간에 멈출 수 없음)
+        guards.begin()
         try:
-            return JSONResponse(content=do_transcribe())
+            if batcher is not None and guards.timeout is None:
+                result = await transcribe_batched(upload, whisper, decode_profile, guards, lecture_id)
+            else:
+                result = await pool.run(transcribe_upload, upload, whisper, decode_profile, guards, lecture_id)
+            audio_seconds_total.inc(result["duration"], endpoint="/transcribe")
+        except PoolClosedError:
+            raise HTTPException(status_code=503, detail="Server is shutting down")
         except Exception as e1:
             msg = str(e1)
             logger.error(f"Transcription failed: {msg}")
@@ -230,14 +1020,1014 @@ async def transcribe_audio(file: UploadFile = File(...)):
                 "error": "Transcription failed",
                 "message": msg
             })
+    
+    await store_cache(cache_key, result)
+    result = await with_sections(result, section_tokens)
+    return await result_response(result, response_format, headers={"X-Cache": "MISS"})
+
+
+@app.post("/transcribe/long")
+async def transcribe_long_audio(
+    file: UploadFile = File(...),
+    model: Optional[str] = Form(None),
+    compute_type: Optional[str] = Form(None),
+    profile: Optional[str] = Form(None),
+    word_timestamps: bool = Form(False),
+    language: Optional[str] = Form(None),
+    timeout: Optional[float] = Form(None),
+    section_tokens: Optional[int] = Form(None),
+    cache_control: Optional[str] = Header(None),
+    x_lecture_id: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    format: Optional[str] = Query(None, description="json | msgpack | columnar | columnar-msgpack (기본: Accept 헤더)")
+):
+    """
+    장시간 강의 오디오 전사 (서버 측 분할 + 병렬 전사)
+    
+    오디오를 VAD 침묵 구간 경계에서 창 단위로 나누고, 추론 워커 풀에서
+    병렬 전사한 뒤 전역 타임스탬프로 이어 붙인 하나의 세그먼트 목록을 반환한다.
+    
+    Args:
+        file: 강의 전체 오디오 파일 (/transcribe와 동일한 형식)
+        model, compute_type, profile, word_timestamps, language, timeout, section_tokens, X-Lecture-Id, format:
+              /transcribe와 동일
+              (language=auto면 창마다 감지하지 않고 전체 오디오 앞부분에서 한 번 감지,
+               마감이 지나면 진행 중인 창은 그때까지의 세그먼트, 시작하지 않은 창은 빈 결과)
+    
+    Returns:
+        {"text", "segments", "language", "language_detection", "duration", "model", "profile",
+         "processing_time", "rtf", "partial", "guards", "preprocess", "timings", "windows", "resumed_seconds"}
+        windows: 창 범위 (원본 오디오 기준 초, 잘라 낸 침묵은 창 사이 또는 창 안에 포함)
+        resumed_seconds: 이전 요청의 체크포인트에서 가져와 다시 디코딩하지 않은 오디오 길이
+                         (마감으로 잘린 partial 응답을 같은 파라미터로 재시도하면 기록된 위치부터 이어서)
+    """
+    try:
+        upload = inspect_upload(file.file, file.filename, file.content_type)
+    except UnsupportedAudioError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    response_format = get_format(accept, format)
+    model_key = get_model_key(model, compute_type)
+    decode_profile = get_profile(profile, word_timestamps, language)
+    lecture_id = get_lecture_id(x_lecture_id)
+    guards = get_guards(timeout)
+    section_tokens = get_section_budget(section_tokens)
+    cache_key, cached = await lookup_cache(upload, "long", model_key, decode_profile, cache_control)
+    if cached is not None:
+        logger.info(f"Cache hit: {upload.filename} ({upload.size} bytes, long)")
+        cached = await with_sections(cached, section_tokens)
+        return await result_response(cached, response_format, headers={"X-Cache": "HIT"})
+    checkpoint_key = await get_checkpoint_key(upload, model_key, decode_profile)
+    
+    async with admit_request(), checkout_model(model_key) as whisper:
+        started = time.perf_counter()
+        guards.begin()
+        try:
+            source, timings = await pool.run(call_with_stages, decode_upload, upload)
+            audio, silence_map = source.audio, source.silence_map
+            windows, plan_timings = await pool.run(call_with_stages, plan_audio_windows, source, pool.workers)
+            merge_timings(timings, plan_timings)
+            (window_profile, detection), detect_timings = await pool.run(
+                call_with_stages, apply_language, whisper, source, decode_profile, lecture_id
+            )
+            merge_timings(timings, detect_timings)
+            logger.info(
+                f"Long transcription started: {upload.filename} "
+                f"(duration={source.duration:.1f}s, speech={len(audio) / SAMPLE_RATE:.1f}s, windows={len(windows)})"
+            )
+            
+            # 한 요청이 풀을 독점하지 않도록 동시에 제출하는 창 수를 워커 수로 제한
+            limiter = asyncio.Semaphore(pool.workers)
+            
+            async def transcribe_window(start: int, end: int):
+                async with limiter:
+                    if guards.expired():
+                        return ([], 0.0), {}
+                    return await pool.run(
+                        call_with_stages, run_window, whisper, audio, start, end, window_profile, guards,
+                        silence_map, checkpoint_key
+                    )
+            
+            results = await asyncio.gather(*(transcribe_window(s, e) for s, e in windows))
+        except PoolClosedError:
+            raise HTTPException(status_code=503, detail="Server is shutting down")
+        except Exception as e1:
+            msg = str(e1)
+            logger.error(f"Long transcription failed: {msg}")
+            raise HTTPException(status_code=500, detail={
+                "error": "Transcription failed",
+                "message": msg
+            })
         
-    finally:
-        # 임시 파일 정리
-        if temp_file is not None:
-            try:
-                os.unlink(temp_path)
-            except Exception as e:
-                logger.warning(f"Failed to delete temp file: {temp_path} - {e}")
+        # 창 순서대로 이어 붙이기
+        segments = []
+        resumed_seconds = 0.0
+        for (window_segments, window_resumed), window_timings in results:
+            merge_timings(timings, window_timings)
+            segments.extend(window_segments)
+            resumed_seconds += window_resumed
+        
+        result = build_response(
+            segments, detection.language, source.duration, whisper.name, decode_profile,
+            time.perf_counter() - started, detection, guards
+        )
+        result["preprocess"] = source.summary()
+        result["timings"] = round_timings(timings)
+        audio_seconds_total.inc(result["duration"], endpoint="/transcribe/long")
+        result["windows"] = window_ranges(windows, silence_map)
+        result["resumed_seconds"] = round(resumed_seconds, 2)
+        logger.info(
+            f"Long transcription completed: {upload.filename} "
+            f"(windows={len(windows)}, segments={len(segments)}, resumed={resumed_seconds:.1f}s, "
+            f"lang={detection.language}/{detection.source}, detect={detection.seconds:.2f}s, "
+            f"model={whisper.name}, profile={decode_profile.name}, rtf={result['rtf']}, "
+            f"elapsed={time.perf_counter() - started:.1f}s{record_guards(guards)})"
+        )
+    
+    await store_cache(cache_key, result)
+    await discard_checkpoint(checkpoint_key, result)
+    if lecture_id is None:
+        lecture_id = f"audio-{(await run_in_threadpool(hash_upload, upload))[:16]}"
+    await index_transcript(lecture_id, result, upload.filename, "long")
+    result = await with_sections(result, section_tokens)
+    return await result_response(result, response_format, headers={"X-Cache": "MISS"})
+
+
+async def run_job(job: Job, store: JobStore, guards: DecodeGuards) -> dict:
+    """작업 실행기 (JobQueue) - 요청과 같은 풀 입장 제어를 거쳐 전사 (포화 시 거절 대신 대기)"""
+    async with admit_job(guards) as admitted:
+        if not admitted:
+            return {}
+        return await transcribe_job(job, store, guards)
+
+
+async def transcribe_job(job: Job, store: JobStore, guards: DecodeGuards) -> dict:
+    """
+    작업 하나 전사 (/transcribe/long과 같은 침묵 경계 분할 + 병렬 전사)
+    
+    창 길이는 기록·재개 단위가 되도록 WHISPER_JOB_WINDOW 안팎으로 나누고, 창마다 결과를 작업 저장소에 기록한다.
+    재개된 작업은 저장된 분할 계획과 언어를 그대로 쓰고 기록되지 않은 창만 전사한다.
+    창 안에서는 세그먼트마다 체크포인트에 기록하므로, 재개되거나 같은 오디오로 다시 등록된 작업은
+    진행 중이던 창도 마지막으로 기록된 위치부터 이어서 디코딩한다.
+    취소(guards.cancel)되면 진행 중인 창은 세그먼트 사이에서 멈추고 작업 창으로는 기록하지 않는다.
+    """
+    params = job.params
+    model_key = (params["model"], params["compute_type"])
+    decode_profile = resolve_profile(params["profile"], params["word_timestamps"], params["language"])
+    started = time.perf_counter()
+    
+    with open(job.upload_path, "rb") as fileobj:
+        upload = inspect_upload(fileobj, job.filename, job.content_type)
+        checkpoint_key = await get_checkpoint_key(upload, model_key, decode_profile)
+        source, timings = await pool.run(call_with_stages, decode_upload, upload)
+    audio, silence_map = source.audio, source.silence_map
+    
+    plan = await run_in_threadpool(store.windows, job.id)
+    if plan and job.speech_samples != len(audio):
+        logger.warning(f"Job {job.id}: decoded audio differs from the saved plan, transcribing from the start")
+        plan = []
+    if not plan:
+        workers = max(pool.workers, math.ceil(len(audio) / SAMPLE_RATE / JOB_WINDOW_SECONDS))
+        windows, plan_timings = await pool.run(call_with_stages, plan_audio_windows, source, workers)
+        merge_timings(timings, plan_timings)
+        await run_in_threadpool(store.save_plan, job.id, source.duration, len(audio), windows)
+        plan = [JobWindow(index, start, end) for index, (start, end) in enumerate(windows)]
+    pending = [window for window in plan if window.segments is None]
+    
+    async with checkout_model(model_key) as whisper:
+        if job.detection is not None:
+            detection = LanguageDetection(**job.detection)
+            window_profile = (decode_profile.without_vad() if source.trimmed else decode_profile)
+            window_profile = window_profile.with_language(detection.language)
+        else:
+            (window_profile, detection), detect_timings = await pool.run(
+                call_with_stages, apply_language, whisper, source, decode_profile, params.get("lecture_id")
+            )
+            merge_timings(timings, detect_timings)
+            await run_in_threadpool(store.save_detection, job.id, detection.to_dict())
+        logger.info(
+            f"Job transcription started: {job.id} "
+            f"(duration={source.duration:.1f}s, speech={len(audio) / SAMPLE_RATE:.1f}s, "
+            f"windows={len(pending)}/{len(plan)} remaining, lang={detection.language}/{detection.source})"
+        )
+        
+        limiter = asyncio.Semaphore(pool.workers)
+        resumed_seconds = 0.0
+        
+        async def transcribe_window(window: JobWindow):
+            nonlocal resumed_seconds
+            async with limiter:
+                if guards.expired():
+                    return
+                (window_segments, window_resumed), window_timings = await pool.run(
+                    call_with_stages, run_window, whisper, audio, window.start, window.end, window_profile, guards,
+                    silence_map, checkpoint_key
+                )
+                if guards.cancelled:
+                    return  # 중간에 멈춘 창은 체크포인트에만 남음 (재개 시 기록된 위치부터)
+                merge_timings(timings, window_timings)
+                window.segments = window_segments
+                resumed_seconds += window_resumed
+                await run_in_threadpool(store.commit_window, job.id, window.index, window.segments)
+                bounds = window_ranges([(window.start, window.end)], silence_map)[0]
+                audio_seconds_total.inc(bounds["end"] - bounds["start"], endpoint="/jobs")
+        
+        await asyncio.gather(*(transcribe_window(window) for window in pending))
+        if guards.cancelled:
+            return {}
+        
+        segments = [segment for window in plan for segment in window.segments]
+        result = build_response(
+            segments, detection.language, source.duration, whisper.name, decode_profile,
+            time.perf_counter() - started, detection, guards
+        )
+        result["preprocess"] = source.summary()
+        result["timings"] = round_timings(timings)
+        result["windows"] = window_ranges([(window.start, window.end) for window in plan], silence_map)
+        result["job"] = {
+            "id": job.id,
+            "attempts": job.attempts,
+            "resumed_windows": len(plan) - len(pending),
+            "resumed_seconds": round(resumed_seconds, 2)
+        }
+        logger.info(
+            f"Job transcription completed: {job.id} "
+            f"(windows={len(plan)}, resumed={len(plan) - len(pending)}, "
+            f"checkpoint_resumed={resumed_seconds:.1f}s, segments={len(segments)}, "
+            f"model={whisper.name}, profile={decode_profile.name}, "
+            f"elapsed={time.perf_counter() - started:.1f}s{record_guards(guards)})"
+        )
+    await discard_checkpoint(checkpoint_key, result)
+    await index_transcript(params.get("lecture_id") or f"job-{job.id}", result, job.filename, "job")
+    return result
+
+
+def stream_audio(emit: Callable[[dict], None], should_stop: Callable[[], bool],
+                 whisper: LoadedModel, source: PreprocessedAudio, filename: str, profile: DecodeProfile,
+                 guards: DecodeGuards, lecture_id: Optional[str] = None):
+    """
+    세그먼트 단위 스트리밍 전사 (동기 - InferencePool.stream에서 실행)
+    
+    faster-whisper의 지연 생성(lazy) 세그먼트 제너레이터가 내놓는 즉시 emit하고,
+    세그먼트 사이마다 should_stop()을 확인하여 클라이언트가 끊기면 디코딩을 중단한다.
+    마감(guards)이 지나면 그때까지의 세그먼트로 summary(partial=true)를 보낸다.
+    """
+    started = time.perf_counter()
+    with record_stages() as timings:
+        profile, detection = apply_language(whisper, source, profile, lecture_id)
+        segs, info = transcribe_guarded(whisper.model, source.audio, profile.options, guards)
+    duration = source.duration
+    emit({
+        "type": "info",
+        "model": whisper.name,
+        "profile": profile.name,
+        "language": info.language,
+        "language_probability": round(info.language_probability, 4),
+        "language_detection": detection.to_dict(),
+        "duration": round(duration, 2),
+        "preprocess": source.summary()
+    })
+    
+    count = 0
+    with record_stages() as decode_timings:
+        for segment, offset in segs:
+            if should_stop():
+                logger.info(f"Stream cancelled by client: {filename} (after {count} segments)")
+                return
+            emit({
+                "type": "segment", "index": count,
+                **segment_to_dict(segment, offset, profile.return_words, source.silence_map)
+            })
+            count += 1
+    merge_timings(timings, decode_timings)
+    audio_seconds_total.inc(duration, endpoint="/transcribe/stream")
+    
+    emit({
+        "type": "summary",
+        "language": info.language,
+        "language_probability": round(info.language_probability, 4),
+        "language_detection": detection.to_dict(),
+        "duration": round(duration, 2),
+        "segments": count,
+        "model": whisper.name,
+        "profile": profile.name,
+        "processing_time": round(time.perf_counter() - started, 2),
+        "rtf": round((time.perf_counter() - started) / duration, 3) if duration > 0 else 0.0,
+        "partial": guards.partial,
+        "guards": guards.to_dict(),
+        "timings": round_timings(timings)
+    })
+    logger.info(
+        f"Stream completed: {filename} "
+        f"(segments={count}, elapsed={time.perf_counter() - started:.1f}s{record_guards(guards)})"
+    )
+
+
+def stream_draft(emit: Callable[[dict], None], should_stop: Callable[[], bool],
+                 whisper: LoadedModel, drafter: LoadedModel, source: PreprocessedAudio, filename: str,
+                 profile: DecodeProfile, guards: DecodeGuards, lecture_id: Optional[str] = None):
+    """
+    초안 → 보정 2단계 스트리밍 전사 (동기 - InferencePool.stream에서 실행)
+    
+    초안 모델(drafter)의 greedy 세그먼트를 디코딩되는 즉시 emit하고, 초안이 끝나면 신뢰도가 낮은
+    구간만 요청 모델(whisper)로 다시 디코딩해 patch로 교체한다. 세그먼트·구간 사이마다 should_stop()을 확인하고,
+    마감이 지나면 보정하지 못한 구간은 초안 그대로 summary(partial=true)를 보낸다.
+    """
+    started = time.perf_counter()
+    with record_stages() as timings:
+        profile, detection = apply_language(drafter, source, profile, lecture_id)
+        segs, info = transcribe_guarded(drafter.model, source.audio, draft_profile(profile).options, guards)
+    duration = source.duration
+    emit({
+        "type": "info",
+        "model": whisper.name,
+        "draft_model": drafter.name,
+        "profile": profile.name,
+        "language": info.language,
+        "language_probability": round(info.language_probability, 4),
+        "language_detection": detection.to_dict(),
+        "duration": round(duration, 2),
+        "preprocess": source.summary()
+    })
+    
+    drafts: List[DraftSegment] = []
+    first_segment = None
+    with record_stages() as draft_timings:
+        for segment, offset in segs:
+            if should_stop():
+                logger.info(f"Draft stream cancelled by client: {filename} (after {len(drafts)} draft segments)")
+                return
+            if first_segment is None:
+                first_segment = time.perf_counter() - started
+            draft = DraftSegment(
+                offset + segment.start, offset + segment.end,
+                segment_to_dict(segment, offset, silence_map=source.silence_map), needs_refine(segment)
+            )
+            emit({"type": "segment", "index": len(drafts), **draft.segment, "refine": draft.refine})
+            drafts.append(draft)
+    merge_timings(timings, draft_timings)
+    draft_seconds = time.perf_counter() - started
+    
+    # 초안 인덱스별 최종 세그먼트 (patch된 구간은 첫 인덱스에 보정 결과, 나머지는 빈 목록)
+    spans = plan_refine_spans(drafts, len(source.audio)) if not guards.expired() else []
+    refined_seconds = 0.0
+    patches = 0
+    with record_stages() as refine_timings:
+        for span in spans:
+            if should_stop():
+                logger.info(f"Draft stream cancelled by client: {filename} (after {patches} patches)")
+                return
+            if guards.expired():
+                break
+            # 앞 초안 텍스트를 문맥으로 (보정 구간은 창 하나 이하라 이전 창 문맥이 없음)
+            context = " ".join(d.segment["text"] for d in drafts[max(0, span.first - 4):span.first]).strip()
+            span_profile = profile.with_prompt(context) if context else profile
+            segs, _ = transcribe_guarded(whisper.model, source.audio[span.start:span.end], span_profile.options, guards)
+            refined = [
+                segment_to_dict(segment, span.start / SAMPLE_RATE + offset, profile.return_words, source.silence_map)
+                for segment, offset in segs
+            ]
+            if guards.expired():
+                break  # 마감으로 중간에 멈춘 구간은 초안 유지
+            emit({"type": "patch", "first": span.first, "last": span.last, "segments": refined})
+            refined_seconds += span.seconds
+            patches += 1
+    merge_timings(timings, refine_timings)
+    refined_seconds_total.inc(refined_seconds)
+    audio_seconds_total.inc(duration, endpoint="/transcribe/draft")
+    
+    elapsed = time.perf_counter() - started
+    speech_seconds = len(source.audio) / SAMPLE_RATE
+    emit({
+        "type": "summary",
+        "language": info.language,
+        "language_probability": round(info.language_probability, 4),
+        "language_detection": detection.to_dict(),
+        "duration": round(duration, 2),
+        "draft_segments": len(drafts),
+        "model": whisper.name,
+        "draft_model": drafter.name,
+        "profile": profile.name,
+        "first_segment_seconds": round(first_segment, 3) if first_segment is not None else None,
+        "draft_seconds": round(draft_seconds, 2),
+        "refine_seconds": round(elapsed - draft_seconds, 2),
+        "refined_spans": patches,
+        "skipped_spans": len(spans) - patches,
+        "refined_seconds": round(refined_seconds, 2),
+        "refined_ratio": round(refined_seconds / speech_seconds, 3) if speech_seconds > 0 else 0.0,
+        "processing_time": round(elapsed, 2),
+        "rtf": round(elapsed / duration, 3) if duration > 0 else 0.0,
+        "partial": guards.partial,
+        "guards": guards.to_dict(),
+        "timings": round_timings(timings)
+    })
+    logger.info(
+        f"Draft stream completed: {filename} "
+        f"(drafts={len(drafts)}, first={first_segment or 0:.2f}s, draft={draft_seconds:.1f}s, "
+        f"refined={patches}/{len(spans)} spans ({refined_seconds:.1f}s of {speech_seconds:.1f}s), "
+        f"elapsed={elapsed:.1f}s{record_guards(guards)})"
+    )
+
+
+def apply_patch(slots: List[List[dict]], record: dict):
+    """draft 스트림의 patch 레코드를 초안 인덱스별 세그먼트 목록에 적용"""
+    slots[record["first"]] = record["segments"]
+    for index in range(record["first"] + 1, record["last"] + 1):
+        slots[index] = []
+
+
+def replay_cached(result: dict) -> Iterator[dict]:
+    """캐시된 전사 결과를 스트림 레코드 형식으로 변환"""
+    yield {
+        "type": "info",
+        "model": result.get("model"),
+        "profile": result.get("profile"),
+        "language": result["language"],
+        "language_detection": result.get("language_detection"),
+        "duration": result["duration"],
+        "preprocess": result.get("preprocess")
+    }
+    for index, seg in enumerate(result["segments"]):
+        yield {"type": "segment", "index": index, **seg}
+    yield {
+        "type": "summary",
+        "language": result["language"],
+        "duration": result["duration"],
+        "segments": len(result["segments"]),
+        "model": result.get("model"),
+        "profile": result.get("profile"),
+        "cached": True
+    }
+
+
+def encode_record(record: dict, sse: bool) -> str:
+    """스트림 레코드 직렬화 (NDJSON 한 줄 또는 SSE 이벤트)"""
+    data = json.dumps(record, ensure_ascii=False)
+    if sse:
+        return f"event: {record['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+def stream_format(request: Request, format: Optional[str]) -> Tuple[bool, str]:
+    """스트림 형식 (format 쿼리, 없으면 Accept 헤더) → (SSE 여부, media type)"""
+    sse = format == "sse" or (format is None and "text/event-stream" in request.headers.get("accept", ""))
+    return sse, "text/event-stream" if sse else "application/x-ndjson"
+
+
+async def open_stream(upload: AudioUpload,
+                      *model_keys: Tuple[str, str]) -> Tuple[AsyncExitStack, List[LoadedModel], PreprocessedAudio]:
+    """
+    스트리밍 전사 준비 - 입장 + 모델 대여 + 업로드 디코딩
+    
+    입장 슬롯과 모델은 스트림이 끝날 때까지 유지하므로 반환한 스택은 응답 종료 후 background에서 닫는다.
+    업로드 파일은 응답 본문 전송 전에 닫히므로 디코딩은 미리 수행한다.
+    """
+    admission = AsyncExitStack()
+    await admission.enter_async_context(admit_request())
+    try:
+        loaded = [await admission.enter_async_context(checkout_model(key)) for key in model_keys]
+        source = await pool.run(decode_upload, upload)
+    except BaseException as e:
+        await admission.aclose()
+        if isinstance(e, HTTPException):
+            raise
+        if isinstance(e, PoolClosedError):
+            raise HTTPException(status_code=503, detail="Server is shutting down")
+        if isinstance(e, Exception):
+            logger.error(f"Audio decode failed: {e}")
+            raise HTTPException(status_code=400, detail=f"Audio decode failed: {e}")
+        raise
+    return admission, loaded, source
+
+
+@app.post("/transcribe/stream")
+async def transcribe_stream(
+    request: Request,
+    file: UploadFile = File(...),
+    model: Optional[str] = Form(None),
+    compute_type: Optional[str] = Form(None),
+    profile: Optional[str] = Form(None),
+    word_timestamps: bool = Form(False),
+    language: Optional[str] = Form(None),
+    timeout: Optional[float] = Form(None),
+    cache_control: Optional[str] = Header(None),
+    x_lecture_id: Optional[str] = Header(None),
+    format: Optional[str] = Query(None, description="ndjson | sse (기본: Accept 헤더로 결정)")
+):
+    """
+    세그먼트 단위 스트리밍 전사
+    
+    세그먼트가 디코딩되는 즉시 한 건씩 전송하여 첫 텍스트까지의 시간을
+    전체 작업 시간에서 수 초 수준으로 줄인다.
+    
+    레코드 (NDJSON 또는 Server-Sent Events):
+        {"type": "info", "model", "profile", "language", "language_probability", "language_detection", "duration",
+         "preprocess"}
+        {"type": "segment", "index", "start", "end", "text"}   (세그먼트마다)
+        {"type": "summary", "language", "language_probability", "language_detection", "duration", "segments",
+         "model", "profile", "processing_time", "rtf", "partial", "guards", "timings"}
+        {"type": "error", "message"}   (실패 시 마지막 레코드)
+    """
+    try:
+        upload = inspect_upload(file.file, file.filename, file.content_type)
+    except UnsupportedAudioError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    sse, media_type = stream_format(request, format)
+    
+    model_key = get_model_key(model, compute_type)
+    decode_profile = get_profile(profile, word_timestamps, language)
+    lecture_id = get_lecture_id(x_lecture_id)
+    guards = get_guards(timeout)
+    cache_key, cached = await lookup_cache(upload, "transcribe", model_key, decode_profile, cache_control)
+    if cached is not None:
+        logger.info(f"Cache hit: {upload.filename} ({upload.size} bytes, stream)")
+        return StreamingResponse(
+            (encode_record(r, sse) for r in replay_cached(cached)),
+            media_type=media_type,
+            headers={"X-Cache": "HIT"}
+        )
+    
+    admission, (whisper,), source = await open_stream(upload, model_key)
+    logger.info(
+        f"Stream started: {upload.filename} "
+        f"({upload.size} bytes, duration={source.duration:.1f}s, speech={len(source.audio) / SAMPLE_RATE:.1f}s, "
+        f"format={'sse' if sse else 'ndjson'})"
+    )
+    
+    async def records():
+        segments = []
+        summary = None
+        try:
+            guards.begin()
+            async for record in pool.stream(
+                stream_audio, whisper, source, upload.filename, decode_profile, guards, lecture_id
+            ):
+                if record["type"] == "segment":
+                    segments.append({k: v for k, v in record.items() if k not in ("type", "index")})
+                elif record["type"] == "summary":
+                    summary = record
+                yield encode_record(record, sse)
+        except Exception as e:
+            logger.error(f"Stream transcription failed: {e}")
+            yield encode_record({"type": "error", "message": str(e)}, sse)
+            return
+        
+        # 완료된 스트림만 캐시 (중간에 끊긴 경우 제외, 마감으로 잘린 경우는 store_cache에서 제외)
+        if summary is not None:
+            response = build_response(
+                segments, summary["language"], summary["duration"],
+                whisper.name, decode_profile, summary["processing_time"], guards=guards
+            )
+            response["language_detection"] = summary["language_detection"]
+            response["preprocess"] = source.summary()
+            await store_cache(cache_key, response)
+    
+    return StreamingResponse(
+        records(),
+        media_type=media_type,
+        headers={"X-Cache": "MISS", "Cache-Control": "no-cache"},
+        background=BackgroundTask(admission.aclose)
+    )
+
+
+@app.post("/transcribe/draft")
+async def transcribe_draft(
+    request: Request,
+    file: UploadFile = File(...),
+    model: Optional[str] = Form(None),
+    compute_type: Optional[str] = Form(None),
+    profile: Optional[str] = Form(None),
+    language: Optional[str] = Form(None),
+    timeout: Optional[float] = Form(None),
+    cache_control: Optional[str] = Header(None),
+    x_lecture_id: Optional[str] = Header(None),
+    format: Optional[str] = Query(None, description="ndjson | sse (기본: Accept 헤더로 결정)")
+):
+    """
+    초안 → 보정 2단계 스트리밍 전사
+    
+    작은 모델(WHISPER_DRAFT_MODEL)의 greedy 초안을 디코딩되는 즉시 보내 바로 읽을 수 있게 하고,
+    이어서 신뢰도가 낮은 초안 세그먼트만 요청 모델·프로파일로 다시 디코딩해 patch로 교체한다.
+    
+    레코드 (NDJSON 또는 Server-Sent Events, /transcribe/stream과 같은 형식에 patch 추가):
+        {"type": "info", "model", "draft_model", "profile", "language", "language_probability",
+         "language_detection", "duration", "preprocess"}
+        {"type": "segment", "index", "start", "end", "text", "refine"}   (초안 세그먼트, refine: 보정 예정)
+        {"type": "patch", "first", "last", "segments"}   (초안 index first~last를 segments로 교체, 빈 목록이면 삭제)
+        {"type": "summary", ..., "draft_segments", "first_segment_seconds", "draft_seconds", "refine_seconds",
+         "refined_spans", "skipped_spans", "refined_seconds", "refined_ratio", "partial", "guards", "timings"}
+        {"type": "error", "message"}   (실패 시 마지막 레코드)
+    
+    refined_ratio: 다시 디코딩한 오디오 / 인코더 입력 오디오 (정밀 모델 연산량의 비율)
+    """
+    try:
+        upload = inspect_upload(file.file, file.filename, file.content_type)
+    except UnsupportedAudioError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    sse, media_type = stream_format(request, format)
+    
+    model_key = get_model_key(model, compute_type)
+    draft_key = get_model_key(DRAFT_MODEL, model_key[1])
+    decode_profile = get_profile(profile, False, language)
+    lecture_id = get_lecture_id(x_lecture_id)
+    guards = get_guards(timeout)
+    cache_key, cached = await lookup_cache(upload, f"draft:{draft_key[0]}", model_key, decode_profile, cache_control)
+    if cached is not None:
+        logger.info(f"Cache hit: {upload.filename} ({upload.size} bytes, draft)")
+        return StreamingResponse(
+            (encode_record(r, sse) for r in replay_cached(cached)),
+            media_type=media_type,
+            headers={"X-Cache": "HIT"}
+        )
+    
+    admission, (whisper, drafter), source = await open_stream(upload, model_key, draft_key)
+    logger.info(
+        f"Draft stream started: {upload.filename} "
+        f"({upload.size} bytes, duration={source.duration:.1f}s, speech={len(source.audio) / SAMPLE_RATE:.1f}s, "
+        f"draft={drafter.name}, model={whisper.name}, format={'sse' if sse else 'ndjson'})"
+    )
+    
+    async def records():
+        slots: List[List[dict]] = []
+        summary = None
+        try:
+            guards.begin()
+            async for record in pool.stream(
+                stream_draft, whisper, drafter, source, upload.filename, decode_profile, guards, lecture_id
+            ):
+                if record["type"] == "segment":
+                    slots.append([{k: v for k, v in record.items() if k not in ("type", "index", "refine")}])
+                elif record["type"] == "patch":
+                    apply_patch(slots, record)
+                elif record["type"] == "summary":
+                    summary = record
+                yield encode_record(record, sse)
+        except Exception as e:
+            logger.error(f"Draft transcription failed: {e}")
+            yield encode_record({"type": "error", "message": str(e)}, sse)
+            return
+        
+        # 보정까지 끝난 스트림만 캐시 (보정 결과를 적용한 세그먼트, 마감으로 잘린 경우 제외)
+        if summary is not None:
+            response = build_response(
+                [segment for slot in slots for segment in slot], summary["language"], summary["duration"],
+                whisper.name, decode_profile, summary["processing_time"], guards=guards
+            )
+            response["language_detection"] = summary["language_detection"]
+            response["preprocess"] = source.summary()
+            await store_cache(cache_key, response)
+    
+    return StreamingResponse(
+        records(),
+        media_type=media_type,
+        headers={"X-Cache": "MISS", "Cache-Control": "no-cache"},
+        background=BackgroundTask(admission.aclose)
+    )
+
+
+def get_jobs() -> JobQueue:
+    if jobs is None:
+        raise HTTPException(status_code=503, detail="Job queue not started")
+    return jobs
+
+
+async def load_job(job_id: str) -> Job:
+    """작업 조회 (없으면 404)"""
+    try:
+        return await run_in_threadpool(get_jobs().store.get, job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+    file: UploadFile = File(...),
+    model: Optional[str] = Form(None),
+    compute_type: Optional[str] = Form(None),
+    profile: Optional[str] = Form(None),
+    word_timestamps: bool = Form(False),
+    language: Optional[str] = Form(None),
+    x_lecture_id: Optional[str] = Header(None)
+):
+    """
+    비동기 전사 작업 등록 (장시간 강의용 - 업로드를 저장하고 작업 ID를 바로 반환)
+    
+    전사는 백그라운드에서 /transcribe/long과 같은 방식으로 진행되고, 창마다 결과를 저장하므로
+    서버가 재시작되어도 남은 창부터 이어서 처리한다. 진행 상황은 GET /jobs/{id}로 조회한다.
+    
+    Args:
+        file, model, compute_type, profile, word_timestamps, language, X-Lecture-Id: /transcribe/long과 동일
+    
+    Returns:
+        202 + GET /jobs/{id}와 같은 본문 (Location 헤더: /jobs/{id})
+    
+    Raises:
+        429: 대기 작업 수가 WHISPER_JOB_MAX_PENDING에 도달
+    """
+    try:
+        upload = inspect_upload(file.file, file.filename, file.content_type)
+    except UnsupportedAudioError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    queue = get_jobs()
+    model_key = get_model_key(model, compute_type)
+    decode_profile = get_profile(profile, word_timestamps, language)
+    params = {
+        "model": model_key[0],
+        "compute_type": model_key[1],
+        "profile": decode_profile.name,
+        "word_timestamps": word_timestamps,
+        "language": decode_profile.language,
+        "lecture_id": get_lecture_id(x_lecture_id)
+    }
+    try:
+        job = await queue.submit(upload.fileobj, upload.filename, upload.content_type, params)
+    except JobQueueFullError as e:
+        logger.warning(f"Job rejected: {e}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "60"})
+    view = await run_in_threadpool(job_view, queue.store, job)
+    return JSONResponse(status_code=202, content=view, headers={"Location": f"/jobs/{job.id}"})
+
+
+@app.get("/jobs")
+async def list_jobs(limit: int = Query(50, ge=1, le=500)):
+    """최근 작업 목록 (세그먼트·결과 제외)"""
+    queue = get_jobs()
+    
+    def views():
+        return [job_view(queue.store, job, segments=False, result=False) for job in queue.store.list(limit)]
+    
+    return {"jobs": await run_in_threadpool(views)}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    segments: bool = Query(True, description="false면 진행 중 세그먼트 생략 (폴링용)"),
+    section_tokens: Optional[int] = Query(None, description="완료된 결과를 이 토큰 수 이하의 섹션으로 묶어 result.sections로"),
+    accept: Optional[str] = Header(None),
+    format: Optional[str] = Query(None, description="json | msgpack | columnar | columnar-msgpack (기본: Accept 헤더)")
+):
+    """
+    작업 상태 조회
+    
+    Returns:
+        {"id", "status", "filename", "params", "created", "started", "finished", "attempts", "error",
+         "language_detection", "progress", "segments" (완료 전, 기록된 창까지), "result" (완료 시)}
+        status: queued | running | cancelling | completed | failed | cancelled
+        progress: {"windows_done", "windows_total", "audio_seconds_done", "audio_seconds_total", "duration", "percent"}
+        result: /transcribe/long 응답과 같은 형식 + job: {"id", "attempts", "resumed_windows", "resumed_seconds"}
+        (format/Accept가 columnar면 segments와 result.segments를 열 단위로)
+    """
+    response_format = get_format(accept, format)
+    section_tokens = get_section_budget(section_tokens)
+    job = await load_job(job_id)
+    view = await run_in_threadpool(job_view, get_jobs().store, job, segments)
+    if view.get("result"):
+        view["result"] = await with_sections(view["result"], section_tokens)
+    return await result_response(view, response_format)
+
+
+@app.delete("/jobs/{job_id}")
+async def delete_job(job_id: str):
+    """
+    작업 취소 또는 삭제
+    
+    대기 중이면 바로 cancelled, 실행 중이면 cancelling → 디코딩 루프가 다음 세그먼트 전에 멈춘 뒤 cancelled
+    (다른 워커 프로세스에서 실행 중이어도 1초 안에 전달). 이미 끝난 작업은 기록과 함께 삭제한다.
+    """
+    job = await load_job(job_id)
+    queue = get_jobs()
+    if job.status in FINAL_STATES:
+        await run_in_threadpool(queue.store.delete, job_id)
+        logger.info(f"Job deleted: {job_id}")
+        return {"id": job_id, "status": "deleted"}
+    status = await queue.cancel(job_id)
+    logger.info(f"Job cancel requested: {job_id} ({job.status} -> {status})")
+    job = await load_job(job_id)
+    return await run_in_threadpool(job_view, queue.store, job, False)
+
+
+def get_index() -> TranscriptIndex:
+    if transcripts is None:
+        raise HTTPException(status_code=503, detail="Transcript search index is disabled")
+    return transcripts
+
+
+def get_indexed_lecture_id(lecture_id: str) -> str:
+    """경로의 강의 ID 검증 (X-Lecture-Id와 같은 형식, 오류는 400)"""
+    lecture_id = get_lecture_id(lecture_id)
+    if lecture_id is None:
+        raise HTTPException(status_code=400, detail="Lecture ID is empty")
+    return lecture_id
+
+
+@app.get("/search")
+async def search_transcripts(
+    q: str = Query(..., description="검색어 (공백으로 나눈 단어를 모두 포함하는 세그먼트)"),
+    lecture_id: Optional[str] = Query(None, description="이 강의 안에서만 검색 (시각 순)"),
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0)
+):
+    """
+    인덱싱된 모든 강의 전사에서 검색 ("이 말을 어느 강의 몇 분에 했는지")
+    
+    Returns:
+        {"query", "hits", "has_more", "ranked", "took_ms"}
+        hits: [{"lecture_id", "title", "seq", "start", "end", "text", "highlights": [[시작, 끝), ...]}]
+        ranked: 관련도(bm25) 순인지 - 한 강의 안 검색, 흔한 단어, 3글자 미만 검색어만 있을 때는 false (강의·시각 순)
+    """
+    index = get_index()
+    if lecture_id is not None:
+        lecture_id = get_indexed_lecture_id(lecture_id)
+    started = time.perf_counter()
+    try:
+        result = await run_in_threadpool(index.search, q, lecture_id, limit, offset)
+    except InvalidQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "query": q,
+        "hits": [hit.to_dict() for hit in result.hits],
+        "has_more": result.has_more,
+        "ranked": result.ranked,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+@app.get("/lectures")
+async def list_lectures(limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    """인덱싱된 강의 목록 (최근 순)"""
+    return {"lectures": await run_in_threadpool(get_index().lectures, limit, offset)}
+
+
+@app.get("/lectures/{lecture_id}/at")
+async def lecture_at(
+    lecture_id: str,
+    t: str = Query(..., description="시각 (HH:MM:SS, MM:SS 또는 초)"),
+    context: int = Query(0, ge=0, le=50, description="앞뒤로 함께 반환할 세그먼트 수")
+):
+    """
+    강의의 특정 시각에 말한 내용 ("01:23:45에 뭐라고 했는지")
+    
+    Returns:
+        {"lecture_id", "t", "segment", "within", "before", "after", "took_ms"}
+        segment: start <= t인 마지막 세그먼트 (within=false면 t는 그 세그먼트 뒤의 침묵 구간)
+    """
+    index = get_index()
+    lecture_id = get_indexed_lecture_id(lecture_id)
+    try:
+        seconds = parse_timestamp(t)
+    except InvalidQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    started = time.perf_counter()
+    try:
+        found = await run_in_threadpool(index.at, lecture_id, seconds, context)
+    except LectureNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Lecture not indexed: {lecture_id}")
+    return {
+        "lecture_id": lecture_id,
+        "t": seconds,
+        **found,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+@app.get("/lectures/{lecture_id}/sections")
+async def lecture_sections(
+    lecture_id: str,
+    max_tokens: int = Query(..., description="섹션당 최대 토큰 수"),
+    timestamps: bool = Query(True, description="false면 섹션 텍스트에 [HH:MM:SS] 생략")
+):
+    """인덱싱된 강의 전사를 토큰 예산 섹션으로 (POST /sections와 같은 응답, 세그먼트를 다시 보내지 않음)"""
+    index = get_index()
+    lecture_id = get_indexed_lecture_id(lecture_id)
+    max_tokens = get_section_budget(max_tokens)
+    try:
+        segments = await run_in_threadpool(index.segments, lecture_id)
+    except LectureNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Lecture not indexed: {lecture_id}")
+    return await run_in_threadpool(sectionize, segments, max_tokens, timestamps)
+
+
+@app.get("/lectures/{lecture_id}")
+async def get_lecture(lecture_id: str):
+    """인덱싱된 강의 정보 (제목, 언어, 길이, 세그먼트 수)"""
+    lecture_id = get_indexed_lecture_id(lecture_id)
+    try:
+        return await run_in_threadpool(get_index().lecture, lecture_id)
+    except LectureNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Lecture not indexed: {lecture_id}")
+
+
+@app.put("/lectures/{lecture_id}/transcript")
+async def put_lecture_transcript(lecture_id: str, body: dict = Body(...)):
+    """
+    클라이언트가 조립한 강의 전사 인덱싱 (청크 모드 - /transcribe 응답은 청크 기준 시각이라 서버가 인덱싱하지 않음)
+    
+    /transcribe/long과 /jobs의 완료 결과는 서버가 X-Lecture-Id(없으면 audio-/job- ID)로 직접 인덱싱한다.
+    같은 ID로 다시 보내면 교체한다.
+    
+    Args:
+        body: {"segments": [{"start", "end", "text"}], "title", "language", "duration"} (segments 외 선택)
+    """
+    index = get_index()
+    lecture_id = get_indexed_lecture_id(lecture_id)
+    segments = body.get("segments")
+    if not isinstance(segments, list):
+        raise HTTPException(status_code=400, detail="segments must be a list")
+    try:
+        count = await run_in_threadpool(
+            index.put, lecture_id, segments, body.get("title"), "client", body.get("language"), body.get("duration")
+        )
+    except InvalidQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"Transcript indexed: {lecture_id} ({count} segments, source=client)")
+    return {"lecture_id": lecture_id, "segments": count}
+
+
+@app.delete("/lectures/{lecture_id}")
+async def delete_lecture(lecture_id: str):
+    """인덱스에서 강의 삭제"""
+    lecture_id = get_indexed_lecture_id(lecture_id)
+    try:
+        await run_in_threadpool(get_index().delete, lecture_id)
+    except LectureNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Lecture not indexed: {lecture_id}")
+    logger.info(f"Lecture removed from index: {lecture_id}")
+    return {"lecture_id": lecture_id, "status": "deleted"}
+
+
+@app.post("/sections")
+async def create_sections(body: dict = Body(...)):
+    """
+    세그먼트를 토큰 예산 섹션으로 묶기 (클라이언트가 조립하거나 교정한 전사용 - 전사 요청의 section_tokens와 같은 결과)
+    
+    세그먼트 경계에서만 끊고, 섹션마다 max_tokens 이하 (세그먼트 하나가 더 크면 그것만으로 된 섹션, oversized에 index).
+    섹션별로 GPT 요약을 병렬 호출할 수 있도록 섹션 시간 범위와 프롬프트용 텍스트("[HH:MM:SS] 텍스트" 줄)를 함께 반환한다.
+    
+    Args:
+        body: {"segments": [{"start", "end", "text"}], "max_tokens", "timestamps" (기본 true)}
+    
+    Returns:
+        {"tokenizer" (o200k_base 등 또는 estimate), "max_tokens", "total_tokens", "oversized",
+         "items": [{"index", "first", "last", "start", "end", "tokens", "text"}]}
+    """
+    segments = body.get("segments")
+    if not isinstance(segments, list):
+        raise HTTPException(status_code=400, detail="segments must be a list")
+    max_tokens = body.get("max_tokens")
+    if not isinstance(max_tokens, int) or isinstance(max_tokens, bool):
+        raise HTTPException(status_code=400, detail="max_tokens must be an integer")
+    max_tokens = get_section_budget(max_tokens)
+    try:
+        return await run_in_threadpool(sectionize, segments, max_tokens, bool(body.get("timestamps", True)))
+    except InvalidSectionRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/models")
+async def list_models():
+    """모델 레지스트리 상태 (기본 모델, 메모리 예산, 로드된 모델 목록)"""
+    if models is None:
+        raise HTTPException(status_code=503, detail="Model not loaded yet")
+    return models.stats()
+
+
+@app.post("/models/default")
+async def switch_default_model(
+    model: str = Query(..., description="모델 크기 (tiny | base | small | ...)"),
+    compute_type: Optional[str] = Query(None, description="int8 | float32 등 (기본: 현재 값 유지)")
+):
+    """
+    기본 모델 교체 (재시작 없이 hot swap)
+    
+    새 모델 로드가 끝난 뒤 전환되므로 진행 중이거나 교체 중에 들어온 요청은
+    이전 기본 모델로 처리된다. 이전 모델은 메모리 예산 초과 시 LRU 순서로 해제된다.
+    """
+    model_key = get_model_key(model, compute_type)
+    try:
+        await run_in_threadpool(models.set_default, *model_key)
+    except ModelBudgetError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except Exception as e:
+        logger.error(f"Model switch failed: {e}")
+        raise HTTPException(status_code=503, detail=f"Model load failed: {e}")
+    return models.stats()
+
+
+@app.get("/metrics")
+async def metrics_endpoint(format: Optional[str] = Query(None, description="json이면 대시보드용 JSON")):
+    """
+    Prometheus 메트릭
+    
+    단계별 소요 시간 히스토그램 (whisper_stage_seconds{stage=upload|decode|vad|encoder|decoder|total}),
+    대기열 깊이, 처리 중 요청 수, 모델 로드 시간, 전사한 오디오 길이, 프로세스 RSS/CPU 시간
+    """
+    if format == "json":
+        return metrics.to_dict()
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 if __name__ == "__main__":
@@ -245,6 +2035,6 @@ if __name__ == "__main__":
     uvicorn.run(
         app,
         host="127.0.0.1",
-        port=5001,
+        port=PORT,
         log_level="info"
     )
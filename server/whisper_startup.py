@@ -0,0 +1,67 @@
+"""
+서버 시작 상태 / 단계별 소요 시간
+- 단계: import(모듈 로드), model_load(기본 모델 로드), warmup(예열 추론)
+- 준비 상태: starting → loading → ready (실패 시 failed) - /readyz 응답에 사용
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+STARTING = "starting"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class StartupState:
+    """시작 단계 기록 (스레드 안전 - 백그라운드 로드 스레드에서 갱신)"""
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = started if started is not None else time.perf_counter()  # perf_counter 기준
+        self.status = STARTING
+        self.error: Optional[str] = None
+        self.phases: Dict[str, float] = {}
+        self.ready_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == READY
+
+    def record(self, phase: str, seconds: float):
+        """단계 소요 시간 기록 (초)"""
+        with self._lock:
+            self.phases[phase] = seconds
+
+    def set_status(self, status: str):
+        with self._lock:
+            self.status = status
+
+    def mark_ready(self):
+        """준비 완료 - 단계별 시간 요약 로그"""
+        with self._lock:
+            self.status = READY
+            self.ready_seconds = time.perf_counter() - self.started
+            summary = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in self.phases.items())
+        logger.info(f"Startup complete in {self.ready_seconds:.2f}s ({summary})")
+
+    def mark_failed(self, error: Exception):
+        with self._lock:
+            self.status = FAILED
+            self.error = str(error)
+        logger.critical(f"Startup failed: {error}")
+
+    def to_dict(self) -> dict:
+        """헬스 체크 / /readyz 응답용"""
+        with self._lock:
+            return {
+                "status": self.status,
+                "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+                "ready_seconds": round(self.ready_seconds, 3) if self.ready_seconds is not None else None,
+                "uptime_seconds": round(time.perf_counter() - self.started, 1),
+                "error": self.error
+            }
@@ -0,0 +1,191 @@
+"""
+서버 상태 모니터 (트레이 앱)
+- 연결을 재사용하는 requests.Session 하나로 Whisper(/readyz)와 Node.js(/health) 확인
+- 최근 상태를 확인 시각과 함께 캐시 → 메뉴 동작은 네트워크 요청 없이 캐시를 읽음
+- 적응형 주기: 시작 중이거나 상태가 바뀐 직후에는 0.5초, 안정되면 두 배씩 늘려 최대 10초
+- poke()로 즉시 재확인 (서버가 준비 완료 줄을 출력했을 때 등)
+"""
+
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Optional
+
+DOWN = 'down'          # 연결 불가
+STARTING = 'starting'  # 프로세스는 응답하지만 준비 전 (모델 로드·예열 중)
+READY = 'ready'
+FAILED = 'failed'      # 시작 실패 (모델 로드 실패 등)
+
+FAST_INTERVAL = 0.5     # 시작 중 / 상태 변화 직후 확인 주기 (초)
+STEADY_INTERVAL = 10.0  # 안정 상태 최대 확인 주기 (초)
+PROBE_TIMEOUT = (0.5, 2.0)  # (연결, 읽기) 타임아웃 - 로컬 서버이므로 연결은 짧게
+
+SERVERS = {
+    'whisper': 'http://127.0.0.1:5001/readyz',
+    'nodejs': 'http://127.0.0.1:3000/health',
+}
+
+
+@dataclass
+class ServerStatus:
+    """서버 하나의 최근 확인 결과"""
+    name: str
+    state: str = DOWN
+    checked_at: float = 0.0            # time.time(), 0이면 아직 확인 전
+    latency_ms: Optional[float] = None
+    detail: str = ''
+
+    @property
+    def age(self) -> Optional[float]:
+        """확인 후 지난 시간 (초)"""
+        return time.time() - self.checked_at if self.checked_at else None
+
+
+class HealthMonitor:
+    """
+    서버 상태를 백그라운드 스레드에서 주기적으로 확인하고 캐시
+
+    on_change(snapshot)은 어느 서버든 상태(state)가 바뀌면 모니터 스레드에서 호출된다.
+    """
+
+    def __init__(self, servers: Dict[str, str] = SERVERS,
+                 on_change: Optional[Callable[[Dict[str, ServerStatus]], None]] = None):
+        self.servers = dict(servers)
+        self.on_change = on_change
+        self._status = {name: ServerStatus(name) for name in self.servers}
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._fast_until = 0.0
+        self._interval = FAST_INTERVAL
+        self._session = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # 캐시 조회 (네트워크 요청 없음)
+    # ------------------------------------------------------------------
+
+    def status(self, name: str) -> ServerStatus:
+        with self._cond:
+            return replace(self._status[name])
+
+    def snapshot(self) -> Dict[str, ServerStatus]:
+        with self._cond:
+            return {name: replace(status) for name, status in self._status.items()}
+
+    @property
+    def all_ready(self) -> bool:
+        with self._cond:
+            return all(status.state == READY for status in self._status.values())
+
+    @property
+    def any_up(self) -> bool:
+        """응답하는 서버가 하나라도 있는지 (시작 중 포함)"""
+        with self._cond:
+            return any(status.state != DOWN for status in self._status.values())
+
+    # ------------------------------------------------------------------
+    # 제어
+    # ------------------------------------------------------------------
+
+    def start(self) -> "HealthMonitor":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='health-monitor', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=3)
+        if self._session is not None:
+            self._session.close()
+
+    def poke(self, *_):
+        """다음 확인을 즉시 실행 (출력 펌프의 준비 완료 콜백으로도 사용)"""
+        self._wake.set()
+
+    def expect(self, seconds: float = 60.0):
+        """서버 시작/중지 직후: seconds 동안 빠른 주기로 확인"""
+        self._fast_until = time.monotonic() + seconds
+        self.poke()
+
+    def wait_ready(self, name: str, timeout: float, process=None) -> ServerStatus:
+        """
+        서버가 READY 또는 FAILED가 될 때까지 대기 (확인 결과가 갱신될 때마다 깨어남)
+
+        호출 이후에 확인된 결과만 사용하며, process를 주면 프로세스가 먼저 종료된 경우 바로 반환한다.
+
+        Returns:
+            마지막 상태 (시간 초과 시 READY가 아닌 상태)
+        """
+        since = time.time()  # 이전 서버의 캐시된 상태는 무시
+        self.expect(timeout)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                status = self._status[name]
+                if status.state in (READY, FAILED) and status.checked_at >= since:
+                    return replace(status)
+                if process is not None and process.poll() is not None:
+                    return replace(status, state=FAILED, detail=f'process exited ({process.returncode})')
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return replace(status)
+                self._cond.wait(min(remaining, FAST_INTERVAL))
+
+    # ------------------------------------------------------------------
+    # 확인 루프
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while not self._stopped.is_set():
+            changed = self.probe_all()
+            with self._cond:
+                starting = any(status.state == STARTING for status in self._status.values())
+            if changed or starting or time.monotonic() < self._fast_until:
+                self._interval = FAST_INTERVAL
+            else:
+                self._interval = min(self._interval * 2, STEADY_INTERVAL)
+            self._wake.wait(self._interval)
+            self._wake.clear()
+
+    def probe_all(self) -> bool:
+        """모든 서버 확인 후 캐시 갱신 - 상태가 바뀐 서버가 있으면 True"""
+        results = {name: self._probe(name, url) for name, url in self.servers.items()}
+        with self._cond:
+            changed = any(self._status[name].state != status.state for name, status in results.items())
+            self._status.update(results)
+            self._cond.notify_all()
+        if changed and self.on_change is not None:
+            try:
+                self.on_change(self.snapshot())
+            except Exception as e:
+                print(f"Health monitor callback error: {e}")
+        return changed
+
+    def _probe(self, name: str, url: str) -> ServerStatus:
+        import requests
+
+        if self._session is None:
+            self._session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=len(self.servers), pool_maxsize=1)
+            self._session.mount('http://', adapter)
+
+        started = time.perf_counter()
+        try:
+            response = self._session.get(url, timeout=PROBE_TIMEOUT)
+        except requests.RequestException as e:
+            return ServerStatus(name, DOWN, time.time(), None, type(e).__name__)
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        if response.ok:
+            return ServerStatus(name, READY, time.time(), latency_ms)
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if body.get('status') == FAILED:
+            return ServerStatus(name, FAILED, time.time(), latency_ms, body.get('error') or '')
+        return ServerStatus(name, STARTING, time.time(), latency_ms, body.get('status') or str(response.status_code))
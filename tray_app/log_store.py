@@ -0,0 +1,216 @@
+"""
+서버 로그 저장소 (트레이 앱)
+- 로그 이름(whisper, whisper_error, nodejs, ...)마다 최근 N줄 링 버퍼 + 크기 제한 순환 파일
+- 출력 펌프는 링 버퍼에 넣고 큐에 넘기기만 함 → 파일 쓰기는 기록 스레드 하나가 모아서 처리 (디스크가 느려도 파이프를 막지 않음)
+- 파일이 상한을 넘으면 name.log → name.log.1 → ... → name.log.<backups> 순으로 밀어내고 가장 오래된 파일 삭제
+- 서버를 새로 시작할 때도 이전 실행 로그를 지우지 않고 순환 (재시작은 이어 쓰기)
+- 조회는 링 버퍼에서: tail(최근 n줄) 또는 offset(이후 새 줄만) → 파일 크기와 무관하게 O(요청 줄 수)
+"""
+
+import os
+import queue
+import threading
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Optional
+
+LOG_MAX_BYTES = int(os.getenv('TRAY_LOG_MAX_MB', '10')) * 1024 * 1024  # 파일 하나 최대 크기
+LOG_BACKUPS = int(os.getenv('TRAY_LOG_BACKUPS', '3'))                   # 보관할 이전 파일 수
+LOG_BUFFER_LINES = int(os.getenv('TRAY_LOG_BUFFER_LINES', '2000'))      # 로그별 메모리 링 버퍼 줄 수
+MAX_QUERY_LINES = 5000
+
+_ROTATE = object()  # 큐 표시: 새 실행 시작 → 파일 순환
+
+
+class LogChannel:
+    """로그 하나: 링 버퍼(조회) + 순환 파일(보관, 기록 스레드에서만 접근)"""
+
+    def __init__(self, name: str, path: Path, max_bytes: int = LOG_MAX_BYTES,
+                 backups: int = LOG_BACKUPS, buffer_lines: int = LOG_BUFFER_LINES):
+        self.name = name
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lines: deque = deque(maxlen=buffer_lines)
+        self._next = 0            # 다음 줄 번호 (트레이 실행 동안 단조 증가 = offset)
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+
+    # ------------------------------------------------------------------
+    # 조회 (링 버퍼)
+    # ------------------------------------------------------------------
+
+    def add(self, line: str):
+        with self._lock:
+            self._lines.append(line)
+            self._next += 1
+
+    def tail(self, lines: int) -> dict:
+        """최근 lines줄"""
+        with self._lock:
+            count = min(max(0, lines), len(self._lines), MAX_QUERY_LINES)
+            selected = list(islice(self._lines, len(self._lines) - count, None))
+            return self._result(selected, self._next - count, dropped=0)
+
+    def read(self, offset: int, limit: int = 1000) -> dict:
+        """offset 번째 줄부터 최대 limit줄 - 다음 조회는 결과의 next_offset부터"""
+        with self._lock:
+            first = self._next - len(self._lines)
+            start = max(offset, first)
+            skip = start - first
+            selected = list(islice(self._lines, skip, skip + min(max(0, limit), MAX_QUERY_LINES)))
+            # 링 버퍼에서 이미 밀려난 줄 수 (조회가 너무 늦은 경우)
+            return self._result(selected, start, dropped=max(0, first - offset))
+
+    def _result(self, lines, start: int, dropped: int) -> dict:
+        return {
+            'name': self.name,
+            'filename': self.path.name,
+            'lines': [line.rstrip('\r\n') for line in lines],
+            'offset': start,
+            'next_offset': start + len(lines),
+            'first_offset': self._next - len(self._lines),
+            'total_lines': self._next,
+            'dropped': dropped
+        }
+
+    # ------------------------------------------------------------------
+    # 파일 (기록 스레드 전용)
+    # ------------------------------------------------------------------
+
+    def write(self, text: str):
+        if self._file is None:
+            self._open()
+        data = text.encode('utf-8', errors='replace')
+        if self._size and self._size + len(data) > self.max_bytes:
+            rotated = self.rotate()
+            self._open()
+            if not rotated:
+                self._size = 0  # 순환 실패 시 max_bytes만큼 더 쓴 뒤 다시 시도
+        self._file.write(data)
+        self._size += len(data)
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def rotate(self) -> bool:
+        """name.log → name.log.1 → ... (가장 오래된 파일 삭제), 파일이 열려 있으면 닫음"""
+        self.close()
+        try:
+            if not self.path.exists() or self.path.stat().st_size == 0:
+                return True
+            for index in range(self.backups - 1, 0, -1):
+                older = self.path.with_name(f'{self.path.name}.{index}')
+                if older.exists():
+                    os.replace(older, self.path.with_name(f'{self.path.name}.{index + 1}'))
+            if self.backups > 0:
+                os.replace(self.path, self.path.with_name(f'{self.path.name}.1'))
+            else:
+                self.path.unlink()
+            return True
+        except OSError as e:
+            # Windows에서 다른 프로세스가 파일을 열고 있으면 실패 → 이어 쓰고 나중에 재시도
+            print(f"Log rotation failed for {self.path.name}: {e}")
+            return False
+
+    def _open(self):
+        self._file = open(self.path, 'ab')
+        self._size = self._file.tell()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class LogStore:
+    """
+    로그 채널 모음 + 파일 기록 스레드
+
+    출력 펌프(스레드마다 파이프 하나)는 append()만 호출하고, 파일 쓰기·순환은 기록 스레드가
+    큐를 비울 때마다 모아서 처리한 뒤 한 번 flush한다.
+    """
+
+    def __init__(self, logs_path: Path):
+        self.logs_path = logs_path
+        self._channels: Dict[str, LogChannel] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def channel(self, name: str, fresh: bool = False) -> LogChannel:
+        """
+        로그 채널 (없으면 생성)
+
+        fresh=True이면 새 실행: 기존 파일을 순환해 이전 실행 로그를 name.log.1로 보관
+        """
+        with self._lock:
+            channel = self._channels.get(name)
+            if channel is None:
+                channel = self._channels[name] = LogChannel(name, self.logs_path / f'{name}.log')
+        if fresh:
+            self._queue.put((channel, _ROTATE))
+        return channel
+
+    def get(self, name: str) -> Optional[LogChannel]:
+        with self._lock:
+            return self._channels.get(name)
+
+    def names(self):
+        with self._lock:
+            return sorted(self._channels)
+
+    def append(self, channel: LogChannel, line: str):
+        """펌프 스레드에서 호출 - 링 버퍼에 바로 반영, 파일 쓰기는 기록 스레드로"""
+        channel.add(line)
+        self._queue.put((channel, line))
+
+    def query(self, params: Dict[str, str]) -> dict:
+        """상태 엔드포인트 /logs: ?name=whisper&tail=200 또는 ?name=whisper&offset=1234&limit=500"""
+        name = params.get('name', '')
+        channel = self.get(name)
+        if channel is None:
+            raise ValueError(f"unknown log: {name} (available: {', '.join(self.names())})")
+        if 'offset' in params:
+            return channel.read(int(params['offset']), int(params.get('limit', '1000')))
+        return channel.tail(int(params.get('tail', '500')))
+
+    def flush(self, timeout: float = 2.0):
+        """지금까지 받은 줄을 파일에 기록할 때까지 대기 (트레이 종료 시)"""
+        done = threading.Event()
+        self._queue.put((None, done))
+        done.wait(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # 쌓인 줄은 한 번에 기록하고 flush 한 번
+            try:
+                while len(batch) < 10000:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            touched, waiters = set(), []
+            for channel, item in batch:
+                if channel is None:
+                    waiters.append(item)
+                    continue
+                try:
+                    if item is _ROTATE:
+                        channel.rotate()
+                    else:
+                        channel.write(item)
+                        touched.add(channel)
+                except OSError as e:
+                    print(f"Log write failed for {channel.name}: {e}")
+            for channel in touched:
+                try:
+                    channel.flush()
+                except OSError:
+                    pass
+            for done in waiters:
+                done.set()
@@ -0,0 +1,57 @@
+"""
+서버 프로세스 출력 펌프
+- 자식 프로세스의 stdout/stderr 파이프를 전용 스레드가 줄 단위로 읽어 로그 저장소(링 버퍼 + 순환 파일)로 전달
+  (파일 쓰기는 저장소의 기록 스레드가 처리 → 디스크가 느려도 파이프가 차서 서버가 멈추지 않음)
+- 준비 완료 줄(예: "Startup complete")이 나오면 이벤트를 세워 시작 대기를 즉시 끝냄
+"""
+
+import threading
+from typing import Callable, Iterable, Optional
+
+from log_store import LogChannel, LogStore
+
+MAX_LINE_BYTES = 64 * 1024  # 줄바꿈 없는 긴 출력은 이 크기로 나눠 기록
+
+
+class OutputPump:
+    """파이프 한 개를 로그 채널로 옮기는 백그라운드 스레드"""
+
+    def __init__(self, stream, store: LogStore, channel: LogChannel, name: str,
+                 ready_markers: Iterable[str] = (), failure_markers: Iterable[str] = (),
+                 on_ready: Optional[Callable[[str], None]] = None):
+        self.stream = stream
+        self.store = store
+        self.channel = channel
+        self.name = name
+        self.ready_markers = tuple(ready_markers)
+        self.failure_markers = tuple(failure_markers)
+        self.on_ready = on_ready
+        self.ready = threading.Event()   # 준비 완료 또는 실패 줄을 읽으면 set
+        self.failed_line: Optional[str] = None
+        self._thread = threading.Thread(target=self._run, name=f"pump-{name}", daemon=True)
+
+    def start(self) -> "OutputPump":
+        self._thread.start()
+        return self
+
+    def join(self, timeout: Optional[float] = None):
+        self._thread.join(timeout)
+
+    def _run(self):
+        for raw in iter(lambda: self.stream.readline(MAX_LINE_BYTES), b''):
+            line = raw.decode('utf-8', errors='replace')
+            self.store.append(self.channel, line)
+            if not self.ready.is_set():
+                self._check(line.rstrip())
+        self.stream.close()
+
+    def _check(self, line: str):
+        if any(marker in line for marker in self.failure_markers):
+            self.failed_line = line
+            self.ready.set()
+        elif any(marker in line for marker in self.ready_markers):
+            self.ready.set()
+        else:
+            return
+        if self.on_ready is not None:
+            self.on_ready(self.name)
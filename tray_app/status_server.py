@@ -0,0 +1,68 @@
+"""
+트레이 상태 HTTP 엔드포인트 (127.0.0.1 전용)
+- Node.js 대시보드가 트레이 앱이 관리하는 프로세스 상태(재시작 횟수, 가동 시간 등)를 조회
+- 표준 라이브러리 http.server만 사용 (트레이 시작 비용 최소화)
+"""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict
+from urllib.parse import parse_qs, urlparse
+
+TRAY_STATUS_PORT = int(os.getenv('TRAY_STATUS_PORT', '5002'))
+
+# 경로 → (쿼리 파라미터 dict) -> JSON 직렬화 가능한 값
+Route = Callable[[Dict[str, str]], object]
+
+
+class StatusServer:
+    """GET 전용 JSON 엔드포인트를 데몬 스레드에서 제공"""
+
+    def __init__(self, routes: Dict[str, Route], port: int = TRAY_STATUS_PORT, host: str = '127.0.0.1'):
+        self.routes = routes
+        self.address = (host, port)
+        self._server = None
+
+    def start(self) -> "StatusServer":
+        routes = self.routes
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                route = routes.get(url.path)
+                if route is None:
+                    return self._send(404, {'error': 'not found'})
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                try:
+                    return self._send(200, route(query))
+                except ValueError as e:
+                    return self._send(400, {'error': str(e)})
+                except Exception as e:
+                    return self._send(500, {'error': str(e)})
+
+            def _send(self, status, body):
+                data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # 대시보드 폴링 요청은 기록하지 않음
+
+        try:
+            self._server = ThreadingHTTPServer(self.address, Handler)
+        except OSError as e:
+            print(f"Tray status endpoint unavailable on port {self.address[1]}: {e}")
+            return self
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='tray-status', daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
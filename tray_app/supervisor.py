@@ -0,0 +1,420 @@
+"""
+서버 프로세스 감시 (트레이 앱)
+- 프로세스마다 감시 스레드가 종료 코드를 직접 기다림 (HTTP 폴링 없이 즉시 감지)
+- 예기치 않은 종료 시 지수 backoff 후 재시작, 짧은 시간에 반복 종료되면 crash loop로 판단해 중단
+- 프로세스별 메모리/CPU 제한: Linux는 cgroup v2 (쓰기 가능하고 컨트롤러를 위임할 수 있을 때) 또는 rlimit,
+  그 외 POSIX는 rlimit (rlimit으로는 CPU 사용량을 제한할 수 없어 우선순위만 낮춤 - stats의 cpu_enforced=False)
+- 포트를 점유한 프로세스 종료 (Linux /proc, macOS lsof)
+- 여러 워커 프로세스에 CPU를 나눠 배정 (plan_cpu_sets)
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+RESTART_BASE_DELAY = 1.0    # 첫 재시작 대기 (초), 연속 실패마다 두 배
+RESTART_MAX_DELAY = 60.0
+STABLE_UPTIME = 60.0        # 이 시간 이상 실행되면 연속 실패 횟수 초기화
+CRASH_LOOP_RESTARTS = 5     # CRASH_LOOP_WINDOW 안에 이만큼 종료되면 재시작 중단
+CRASH_LOOP_WINDOW = 300.0
+STOP_TIMEOUT = 5.0          # terminate 후 kill까지 대기
+
+RUNNING = 'running'
+BACKOFF = 'backoff'         # 재시작 대기 중
+CRASH_LOOP = 'crashloop'    # 반복 종료로 재시작 중단
+STOPPED = 'stopped'
+
+CGROUP_ROOT = Path('/sys/fs/cgroup')
+CGROUP_NAME = 'lecture-summarizer'
+
+
+@dataclass
+class ResourceLimits:
+    """프로세스 자원 제한 (0이면 제한 없음)"""
+    memory_mb: int = 0
+    cpu_percent: int = 0    # 코어 1개 = 100 (cgroup cpu.max, cgroup을 쓸 수 없으면 우선순위만 낮춤)
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "ResourceLimits":
+        """<prefix>_MEMORY_LIMIT_MB, <prefix>_CPU_LIMIT_PERCENT 환경 변수"""
+        return cls(
+            memory_mb=int(os.getenv(f'{prefix}_MEMORY_LIMIT_MB', '0')),
+            cpu_percent=int(os.getenv(f'{prefix}_CPU_LIMIT_PERCENT', '0'))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory_mb > 0 or self.cpu_percent > 0
+
+
+def plan_cpu_sets(processes: int, cpu_count: int) -> List[List[int]]:
+    """
+    CPU 0..cpu_count-1을 processes개의 연속 구간으로 나눔 (나머지 코어는 앞 프로세스부터 하나씩)
+
+    예: plan_cpu_sets(3, 8) → [[0, 1, 2], [3, 4, 5], [6, 7]]
+    """
+    processes = max(1, min(processes, cpu_count))
+    size, extra = divmod(cpu_count, processes)
+    sets, start = [], 0
+    for index in range(processes):
+        end = start + size + (1 if index < extra else 0)
+        sets.append(list(range(start, end)))
+        start = end
+    return sets
+
+
+def format_cpu_list(cpus: List[int]) -> str:
+    """[0, 1, 2, 5] → "0-2,5" (WHISPER_CPU_AFFINITY 형식)"""
+    parts, start = [], None
+    for index, cpu in enumerate(cpus):
+        if start is None:
+            start = cpu
+        if index + 1 == len(cpus) or cpus[index + 1] != cpu + 1:
+            parts.append(str(cpu) if cpu == start else f'{start}-{cpu}')
+            start = None
+    return ','.join(parts)
+
+
+def _limit_controllers(limits: ResourceLimits) -> List[str]:
+    """제한에 필요한 cgroup 컨트롤러"""
+    return [name for name, needed in (('memory', limits.memory_mb > 0), ('cpu', limits.cpu_percent > 0)) if needed]
+
+
+def _enable_controllers(path: Path, controllers: List[str]):
+    """path의 하위 cgroup에 컨트롤러 위임 (cgroup.subtree_control, 이미 켜져 있으면 그대로)"""
+    enabled = (path / 'cgroup.subtree_control').read_text().split()
+    missing = [name for name in controllers if name not in enabled]
+    if not missing:
+        return
+    available = (path / 'cgroup.controllers').read_text().split()
+    unavailable = [name for name in missing if name not in available]
+    if unavailable:
+        raise OSError(f"controller(s) {', '.join(unavailable)} not delegated to {path}")
+    # 프로세스가 있는 cgroup은 하위에 컨트롤러를 켤 수 없음 (no internal processes 규칙 → EBUSY)
+    (path / 'cgroup.subtree_control').write_text(' '.join(f'+{name}' for name in missing))
+
+
+def _cgroup_dir(name: str, controllers: List[str]) -> Optional[Path]:
+    """
+    이 프로세스 cgroup 아래 하위 cgroup 생성 + 제한 컨트롤러 위임 (cgroup v2가 아니면 None)
+
+    Raises:
+        OSError: 쓰기 권한이 없거나 컨트롤러를 위임할 수 없음
+    """
+    if not sys.platform.startswith('linux') or not (CGROUP_ROOT / 'cgroup.controllers').exists():
+        return None
+    with open('/proc/self/cgroup', encoding='utf-8') as f:
+        current = next((line.split('::', 1)[1].strip() for line in f if line.startswith('0::')), None)
+    if current is None:
+        return None
+    parent = CGROUP_ROOT / current.lstrip('/')
+    group = parent / CGROUP_NAME
+    group.mkdir(exist_ok=True)
+    _enable_controllers(parent, controllers)
+    _enable_controllers(group, controllers)
+    path = group / name
+    path.mkdir(exist_ok=True)
+    if not os.access(path / 'cgroup.procs', os.W_OK):
+        raise OSError(f"{path / 'cgroup.procs'} is not writable")
+    return path
+
+
+def apply_cgroup(pid: int, name: str, limits: ResourceLimits) -> bool:
+    """실행된 프로세스를 제한이 걸린 cgroup으로 이동 - 실패하면 이유를 출력하고 False"""
+    try:
+        path = _cgroup_dir(name, _limit_controllers(limits))
+        if path is None:
+            return False
+        if limits.memory_mb > 0:
+            (path / 'memory.max').write_text(str(limits.memory_mb * 1024 * 1024))
+        if limits.cpu_percent > 0:
+            period = 100000
+            (path / 'cpu.max').write_text(f'{period * limits.cpu_percent // 100} {period}')
+        (path / 'cgroup.procs').write_text(str(pid))
+        return True
+    except OSError as e:
+        print(f"cgroup limits unavailable for {name}, falling back to rlimit: {e}")
+        return False
+
+
+def rlimit_preexec(limits: ResourceLimits) -> Optional[Callable[[], None]]:
+    """
+    fork 후 exec 전에 자식 프로세스에서 실행할 rlimit 설정 함수 (Windows는 None)
+
+    Linux는 RLIMIT_DATA (힙 + 익명 쓰기 가능 매핑)를 사용한다 - RLIMIT_AS는 스레드 스택과
+    malloc arena 예약 주소 공간까지 세어 CTranslate2처럼 스레드가 많은 프로세스를 너무 일찍 막는다.
+    """
+    if sys.platform == 'win32' or not limits.enabled:
+        return None
+    import resource
+
+    def preexec():
+        if limits.memory_mb > 0:
+            kind = resource.RLIMIT_DATA if sys.platform.startswith('linux') else resource.RLIMIT_AS
+            size = limits.memory_mb * 1024 * 1024
+            resource.setrlimit(kind, (size, size))
+        if limits.cpu_percent > 0:
+            os.nice(10)  # cgroup이 적용되지 않은 경우의 최소 대응 (cgroup 적용 시에도 무해)
+
+    return preexec
+
+
+@dataclass
+class ProcessSpec:
+    """
+    감시 대상 프로세스
+
+    launch(restarts, preexec_fn)는 프로세스를 실행해 Popen을 돌려준다
+    (restarts: 지금까지 재시작 횟수 - 로그를 이어 쓸지 판단 등에 사용).
+    """
+    name: str
+    launch: Callable[[int, Optional[Callable[[], None]]], subprocess.Popen]
+    limits: ResourceLimits = field(default_factory=ResourceLimits)
+    restart: bool = True
+
+
+class _Supervised:
+    def __init__(self, spec: ProcessSpec):
+        self.spec = spec
+        self.process: Optional[subprocess.Popen] = None
+        self.state = STOPPED
+        self.started_at: Optional[float] = None   # time.time()
+        self.restarts = 0
+        self.failures = 0                         # 연속 실패 횟수 (backoff 계산)
+        self.exits: List[float] = []              # 최근 예기치 않은 종료 시각 (crash loop 판단)
+        self.last_exit_code: Optional[int] = None
+        self.last_exit_at: Optional[float] = None
+        self.limit_method: Optional[str] = None   # cgroup | rlimit | None
+        self.cpu_enforced = False                 # CPU 사용량 제한이 실제로 적용됐는지 (rlimit은 nice뿐)
+        self.stopping = threading.Event()
+
+
+class ProcessSupervisor:
+    """
+    자식 프로세스 실행·감시·재시작
+
+    on_event(name, event, info)는 감시 스레드에서 호출된다.
+    event: started | exited | restarting | crashloop | stopped
+    """
+
+    def __init__(self, on_event: Optional[Callable[[str, str, dict], None]] = None):
+        self.on_event = on_event
+        self._procs: Dict[str, _Supervised] = {}
+        self._lock = threading.Lock()
+
+    def start(self, spec: ProcessSpec) -> subprocess.Popen:
+        """프로세스 실행 후 감시 시작 (같은 이름이 실행 중이면 먼저 중지)"""
+        self.stop(spec.name)
+        entry = _Supervised(spec)
+        with self._lock:
+            self._procs[spec.name] = entry
+        self._spawn(entry)
+        threading.Thread(target=self._watch, args=(entry,), name=f'supervise-{spec.name}', daemon=True).start()
+        return entry.process
+
+    def process(self, name: str) -> Optional[subprocess.Popen]:
+        entry = self._procs.get(name)
+        return entry.process if entry is not None else None
+
+    def stop(self, name: str, timeout: float = STOP_TIMEOUT):
+        """재시작 없이 종료 (terminate → timeout 후 kill)"""
+        entry = self._procs.get(name)
+        if entry is None:
+            return
+        entry.stopping.set()
+        process = entry.process
+        if process is not None and process.poll() is None:
+            try:
+                process.terminate()
+                try:
+                    process.wait(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait(timeout=2)
+            except Exception as e:
+                print(f"Error terminating {name}: {e}")
+        entry.state = STOPPED
+
+    def any_active(self) -> bool:
+        """실행 중이거나 재시작 대기 중인 프로세스가 있는지"""
+        return any(entry.state in (RUNNING, BACKOFF) for entry in list(self._procs.values()))
+
+    def stop_all(self, timeout: float = STOP_TIMEOUT):
+        for name in reversed(list(self._procs)):
+            self.stop(name, timeout)
+
+    def stats(self) -> Dict[str, dict]:
+        """대시보드용 프로세스 상태 (재시작 횟수, 가동 시간, 마지막 종료 코드)"""
+        now = time.time()
+        result = {}
+        for name, entry in list(self._procs.items()):
+            running = entry.process is not None and entry.process.poll() is None
+            result[name] = {
+                'state': entry.state,
+                'pid': entry.process.pid if running else None,
+                'restarts': entry.restarts,
+                'uptime_seconds': round(now - entry.started_at, 1) if running and entry.started_at else 0.0,
+                'started_at': entry.started_at,
+                'last_exit_code': entry.last_exit_code,
+                'last_exit_at': entry.last_exit_at,
+                'limits': {
+                    'memory_mb': entry.spec.limits.memory_mb,
+                    'cpu_percent': entry.spec.limits.cpu_percent,
+                    'method': entry.limit_method,
+                    'cpu_enforced': entry.cpu_enforced
+                }
+            }
+        return result
+
+    def _spawn(self, entry: _Supervised):
+        limits = entry.spec.limits
+        entry.process = entry.spec.launch(entry.restarts, rlimit_preexec(limits))
+        entry.started_at = time.time()
+        entry.state = RUNNING
+        entry.limit_method = None
+        entry.cpu_enforced = False
+        if limits.enabled:
+            if apply_cgroup(entry.process.pid, entry.spec.name, limits):
+                entry.limit_method = 'cgroup'
+                entry.cpu_enforced = limits.cpu_percent > 0
+            elif sys.platform != 'win32':
+                entry.limit_method = 'rlimit'
+                if limits.cpu_percent > 0 and entry.restarts == 0:
+                    print(f"CPU limit for {entry.spec.name} is not enforced without cgroup v2 (lowered priority only)")
+        self._emit(entry.spec.name, 'started', {'pid': entry.process.pid, 'restarts': entry.restarts})
+
+    def _watch(self, entry: _Supervised):
+        name = entry.spec.name
+        while True:
+            code = entry.process.wait()
+            now = time.time()
+            entry.last_exit_code = code
+            entry.last_exit_at = now
+            if entry.stopping.is_set():
+                self._emit(name, 'stopped', {'code': code})
+                return
+
+            uptime = now - (entry.started_at or now)
+            entry.failures = 1 if uptime >= STABLE_UPTIME else entry.failures + 1
+            entry.exits = [t for t in entry.exits if now - t < CRASH_LOOP_WINDOW] + [now]
+            self._emit(name, 'exited', {'code': code, 'uptime_seconds': round(uptime, 1)})
+
+            if not entry.spec.restart:
+                entry.state = STOPPED
+                return
+            if len(entry.exits) >= CRASH_LOOP_RESTARTS:
+                entry.state = CRASH_LOOP
+                self._emit(name, 'crashloop', {'code': code, 'exits': len(entry.exits)})
+                return
+
+            delay = min(RESTART_BASE_DELAY * 2 ** (entry.failures - 1), RESTART_MAX_DELAY)
+            entry.state = BACKOFF
+            self._emit(name, 'restarting', {'code': code, 'delay': delay})
+            if entry.stopping.wait(delay):
+                entry.state = STOPPED
+                return
+            entry.restarts += 1
+            try:
+                self._spawn(entry)
+            except Exception as e:
+                # 실행 자체가 실패하면 crash loop와 같이 취급
+                entry.state = CRASH_LOOP
+                self._emit(name, 'crashloop', {'error': str(e)})
+                return
+
+    def _emit(self, name: str, event: str, info: dict):
+        if self.on_event is not None:
+            try:
+                self.on_event(name, event, info)
+            except Exception as e:
+                print(f"Supervisor callback error: {e}")
+
+
+# ---------------------------------------------------------------------------
+# 포트 점유 프로세스 정리 (POSIX)
+# ---------------------------------------------------------------------------
+
+def _listening_inodes(port: int) -> set:
+    """/proc/net/tcp{,6}에서 port를 LISTEN 중인 소켓 inode"""
+    inodes = set()
+    for table in ('/proc/net/tcp', '/proc/net/tcp6'):
+        try:
+            with open(table, encoding='utf-8') as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    local, state, inode = fields[1], fields[3], fields[9]
+                    if state == '0A' and int(local.rsplit(':', 1)[1], 16) == port:
+                        inodes.add(inode)
+        except OSError:
+            continue
+    return inodes
+
+
+def pids_on_port(port: int) -> List[int]:
+    """port를 LISTEN 중인 프로세스 ID (Linux: /proc, 그 외: lsof)"""
+    if sys.platform.startswith('linux'):
+        inodes = _listening_inodes(port)
+        if not inodes:
+            return []
+        targets = {f'socket:[{inode}]' for inode in inodes}
+        pids = []
+        for pid in filter(str.isdigit, os.listdir('/proc')):
+            try:
+                fds = os.listdir(f'/proc/{pid}/fd')
+            except OSError:
+                continue  # 다른 사용자 프로세스 / 이미 종료
+            for fd in fds:
+                try:
+                    if os.readlink(f'/proc/{pid}/fd/{fd}') in targets:
+                        pids.append(int(pid))
+                        break
+                except OSError:
+                    continue
+        return pids
+    try:
+        result = subprocess.run(['lsof', '-ti', f'tcp:{port}', '-sTCP:LISTEN'],
+                                capture_output=True, text=True, timeout=10)
+        return [int(pid) for pid in result.stdout.split() if pid.isdigit()]
+    except (OSError, subprocess.SubprocessError):
+        return []
+
+
+def kill_port_posix(port: int, timeout: float = 3.0) -> List[int]:
+    """port를 점유한 프로세스에 SIGTERM, timeout 안에 안 끝나면 SIGKILL - 종료한 PID 목록"""
+    pids = [pid for pid in pids_on_port(port) if pid != os.getpid()]
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
+    deadline = time.monotonic() + timeout
+    remaining = list(pids)
+    while remaining and time.monotonic() < deadline:
+        time.sleep(0.1)
+        remaining = [pid for pid in remaining if _alive(pid)]
+    for pid in remaining:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+    return pids
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    # 자식 좀비는 waitpid로 정리되기 전까지 살아 있는 것으로 보이므로 상태 확인
+    try:
+        with open(f'/proc/{pid}/stat', encoding='utf-8') as f:
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except OSError:
+        return True
@@ -0,0 +1,172 @@
+"""
+ProcessSupervisor 테스트 (실제 자식 프로세스 실행)
+- 바로 종료되는 자식: started → exited → restarting → ... → crashloop, 이후 재시작 없음
+- 계속 실행되는 자식: stop() → stopped, 재시작 없음
+- cgroup v2 제한: 가짜 cgroup 트리에서 컨트롤러 위임 + memory.max/cpu.max 기록, 실패 시 rlimit으로 (cpu_enforced=False)
+
+실행: python -m pytest tray_app  (또는 python -m unittest discover tray_app)
+"""
+
+import contextlib
+import io
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import supervisor
+from supervisor import CRASH_LOOP, STOPPED, ProcessSpec, ProcessSupervisor, ResourceLimits, apply_cgroup
+
+WAIT_SECONDS = 10.0
+
+
+def python_child(code: str):
+    """python -c code를 실행하는 ProcessSpec.launch"""
+    def launch(restarts, preexec_fn):
+        return subprocess.Popen([sys.executable, '-c', code], preexec_fn=preexec_fn)
+    return launch
+
+
+class EventLog:
+    """on_event 기록 + 특정 이벤트 대기"""
+
+    def __init__(self):
+        self.events = []
+        self._cond = threading.Condition()
+
+    def __call__(self, name, event, info):
+        with self._cond:
+            self.events.append((name, event, info))
+            self._cond.notify_all()
+
+    def wait_for(self, event: str, timeout: float = WAIT_SECONDS) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: any(e == event for _, e, _ in self.events), timeout)
+
+    def names(self):
+        with self._cond:
+            return [event for _, event, _ in self.events]
+
+
+@mock.patch.object(supervisor, 'RESTART_BASE_DELAY', 0.01)
+class ProcessSupervisorTest(unittest.TestCase):
+    def setUp(self):
+        self.log = EventLog()
+        self.supervisor = ProcessSupervisor(on_event=self.log)
+        self.addCleanup(self.supervisor.stop_all, 2.0)
+
+    def test_crash_loop(self):
+        self.supervisor.start(ProcessSpec('crasher', python_child('import sys; sys.exit(3)')))
+        self.assertTrue(self.log.wait_for('crashloop'))
+
+        restarts = supervisor.CRASH_LOOP_RESTARTS - 1
+        expected = ['started', 'exited', 'restarting'] * restarts + ['started', 'exited', 'crashloop']
+        self.assertEqual(self.log.names(), expected)
+
+        delays = [info['delay'] for _, event, info in self.log.events if event == 'restarting']
+        self.assertEqual(delays, [0.01 * 2 ** attempt for attempt in range(restarts)])
+
+        stats = self.supervisor.stats()['crasher']
+        self.assertEqual(stats['state'], CRASH_LOOP)
+        self.assertEqual(stats['restarts'], restarts)
+        self.assertEqual(stats['last_exit_code'], 3)
+        self.assertIsNone(stats['pid'])
+        self.assertFalse(self.supervisor.any_active())
+
+    def test_no_restart(self):
+        self.supervisor.start(ProcessSpec('once', python_child('import sys; sys.exit(1)'), restart=False))
+        self.assertTrue(self.log.wait_for('exited'))
+        self.assertEqual(self.log.names(), ['started', 'exited'])
+        self.assertEqual(self.supervisor.stats()['once']['state'], STOPPED)
+
+    def test_clean_stop(self):
+        process = self.supervisor.start(ProcessSpec('server', python_child('import time; time.sleep(60)')))
+        self.assertTrue(self.supervisor.any_active())
+        self.assertEqual(self.supervisor.stats()['server']['pid'], process.pid)
+
+        self.supervisor.stop('server', timeout=2.0)
+        self.assertTrue(self.log.wait_for('stopped'))
+        self.assertIsNotNone(process.poll())
+        self.assertEqual(self.log.names(), ['started', 'stopped'])
+        self.assertEqual(self.supervisor.stats()['server']['state'], STOPPED)
+        self.assertFalse(self.supervisor.any_active())
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), 'cgroup v2 is Linux only')
+class CgroupTest(unittest.TestCase):
+    """/sys/fs/cgroup 대신 가짜 cgroup v2 트리 (커널이 만드는 인터페이스 파일은 미리 생성)"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.group = self.root / supervisor.CGROUP_NAME
+        (self.group / 'whisper').mkdir(parents=True)
+        self.write(self.root, controllers='cpu memory pids', subtree_control='')
+        self.write(self.group, controllers='cpu memory', subtree_control='')
+        (self.group / 'whisper' / 'cgroup.procs').write_text('')
+        for patcher in (
+            mock.patch.object(supervisor, 'CGROUP_ROOT', self.root),
+            mock.patch('supervisor.open', mock.mock_open(read_data='0::/\n'), create=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def write(path: Path, **files):
+        for name, text in files.items():
+            (path / f'cgroup.{name}').write_text(text)
+
+    def apply(self, limits: ResourceLimits):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            applied = apply_cgroup(4242, 'whisper', limits)
+        return applied, output.getvalue()
+
+    def test_delegates_controllers_and_writes_limits(self):
+        applied, output = self.apply(ResourceLimits(memory_mb=512, cpu_percent=150))
+        self.assertTrue(applied, output)
+        self.assertEqual((self.root / 'cgroup.subtree_control').read_text(), '+memory +cpu')
+        self.assertEqual((self.group / 'cgroup.subtree_control').read_text(), '+memory +cpu')
+        whisper = self.group / 'whisper'
+        self.assertEqual((whisper / 'memory.max').read_text(), str(512 * 1024 * 1024))
+        self.assertEqual((whisper / 'cpu.max').read_text(), '150000 100000')
+        self.assertEqual((whisper / 'cgroup.procs').read_text(), '4242')
+
+    def test_only_needed_controllers(self):
+        self.write(self.root, subtree_control='memory')
+        applied, _ = self.apply(ResourceLimits(memory_mb=512))
+        self.assertTrue(applied)
+        self.assertEqual((self.root / 'cgroup.subtree_control').read_text(), 'memory')
+        self.assertEqual((self.group / 'cgroup.subtree_control').read_text(), '+memory')
+
+    def test_missing_controller_is_reported(self):
+        self.write(self.root, controllers='memory pids')
+        applied, output = self.apply(ResourceLimits(memory_mb=512, cpu_percent=50))
+        self.assertFalse(applied)
+        self.assertIn('cpu', output)
+        self.assertIn('falling back to rlimit', output)
+        self.assertFalse((self.group / 'whisper' / 'memory.max').exists())
+
+
+@mock.patch.object(supervisor, 'apply_cgroup', return_value=False)
+class LimitReportTest(unittest.TestCase):
+    @unittest.skipIf(sys.platform == 'win32', 'rlimit is POSIX only')
+    def test_rlimit_fallback_reports_cpu_unenforced(self, _):
+        log = EventLog()
+        sup = ProcessSupervisor(on_event=log)
+        self.addCleanup(sup.stop_all, 2.0)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            sup.start(ProcessSpec('limited', python_child('pass'), ResourceLimits(memory_mb=1024, cpu_percent=50),
+                                  restart=False))
+        self.assertTrue(log.wait_for('exited'))
+        limits = sup.stats()['limited']['limits']
+        self.assertEqual((limits['method'], limits['cpu_enforced']), ('rlimit', False))
+        self.assertIn('not enforced', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
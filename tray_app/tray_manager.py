@@ -7,23 +7,25 @@ Lecture Summarizer - System Tray Manager
 import sys
 import os
 import subprocess
-import requests
 import time
 import webbrowser
 from pathlib import Path
 from threading import Thread
 import shutil
-import pystray
-from PIL import Image, ImageDraw
+
+from health_monitor import FAILED, READY, HealthMonitor
+from log_store import LogStore
+from output_pump import OutputPump
+from status_server import StatusServer
+from supervisor import (
+    ProcessSpec, ProcessSupervisor, ResourceLimits, format_cpu_list, kill_port_posix, plan_cpu_sets
+)
+
+# pystray / PIL / requests는 사용 시점에 import (트레이 아이콘을 최대한 빨리 표시)
 
 
 class LectureSummarizerTray:
     def __init__(self):
-        self.server_processes = {
-            'whisper': None,
-            'nodejs': None
-        }
-
         # 경로 설정: PyInstaller(onefile)에서는 sys.executable 기준으로 잡아야 외부 리소스 접근 가능
         self.base_path = self._get_base_path()
         self.server_path = self.base_path / 'server'
@@ -33,6 +35,23 @@ class LectureSummarizerTray:
         self.logs_path.mkdir(exist_ok=True)
         self.server_running = False
         self.app_running = True  # 앱 종료 플래그 추가
+        self.icon = None
+        self.output_pumps = []
+        
+        # 서버 로그 (링 버퍼 + 크기 제한 순환 파일, 대시보드는 상태 엔드포인트 /logs로 조회)
+        self.logs = LogStore(self.logs_path)
+
+        # 서버 상태 모니터 (상태 캐시 - 메뉴 동작은 네트워크 요청 없이 캐시를 읽음)
+        self.monitor = HealthMonitor(on_change=self._on_status_change)
+        
+        # 프로세스 감시 (종료 감지 → backoff 재시작, crash loop 시 중단)
+        self.supervisor = ProcessSupervisor(on_event=self._on_process_event)
+        
+        # 대시보드용 상태 엔드포인트 (재시작 횟수, 가동 시간)
+        self.status_server = StatusServer({
+            '/status': lambda query: self.status_payload(),
+            '/logs': self.logs.query
+        })
 
     def _get_base_path(self) -> Path:
         """실행 기준 경로 반환 (포터블/개발 환경 모두 대응)"""
@@ -75,6 +94,7 @@ class LectureSummarizerTray:
         
     def create_icon_image(self, color):
         """간단한 아이콘 생성 (fallback)"""
+        from PIL import Image, ImageDraw
         image = Image.new('RGB', (64, 64), color)
         draw = ImageDraw.Draw(image)
         draw.ellipse([16, 16, 48, 48], fill='white')
@@ -91,6 +111,7 @@ class LectureSummarizerTray:
         icon_path = self.icons_path / icon_files.get(state, 'icon_idle.ico')
         
         if icon_path.exists():
+            from PIL import Image
             return Image.open(icon_path)
         
         # Fallback: 색상으로 간단하게 생성
@@ -98,13 +119,8 @@ class LectureSummarizerTray:
         return self.create_icon_image(colors.get(state, '#4A90E2'))
     
     def check_server_status(self):
-        """서버 실행 상태 확인"""
-        try:
-            whisper = requests.get('http://localhost:5001/', timeout=2)
-            nodejs = requests.get('http://localhost:3000/health', timeout=2)
-            return whisper.ok and nodejs.ok
-        except:
-            return False
+        """서버 실행 상태 확인 (모니터 캐시 - 블로킹 없음)"""
+        return self.monitor.all_ready
     
     def _kill_process_on_port(self, port):
         """지정된 포트에서 실행 중인 프로세스 종료"""
@@ -135,6 +151,10 @@ class LectureSummarizerTray:
                     # 포트 정리 후 대기
                     if killed_pids:
                         time.sleep(1)
+            else:
+                # Linux: /proc, macOS: lsof로 PID 찾아 SIGTERM → SIGKILL
+                for pid in kill_port_posix(port):
+                    print(f"Killed process {pid} on port {port}")
         except Exception as e:
             print(f"Error killing process on port {port}: {e}")
     
@@ -148,6 +168,8 @@ class LectureSummarizerTray:
                 # 기존 포트 정리
                 print(f"[Attempt {retry_count + 1}/{max_retries}] Cleaning up ports...")
                 self._kill_process_on_port(5001)
+                for port, _ in self._whisper_workers():
+                    self._kill_process_on_port(port)
                 self._kill_process_on_port(3000)
                 time.sleep(2)  # 포트 정리 후 충분히 대기
                 
@@ -184,52 +206,34 @@ class LectureSummarizerTray:
                 elif yt_dlp_scripts.exists():
                     env['PATH'] = str(yt_dlp_scripts.parent) + ';' + env.get('PATH', '')
                 
+                env['PYTHONUNBUFFERED'] = '1'  # 준비 완료 로그 줄을 바로 읽기 위해
+                
                 # Whisper 서버 시작
                 icon.notify("모델 로딩 중... (최초 실행 시 시간이 소요될 수 있습니다)", "Lecture Summarizer")
-                whisper_cmd = [str(python_exe), str(self.server_path / 'whisper_server.py')]
-                self.server_processes['whisper'] = subprocess.Popen(
-                    whisper_cmd,
-                    stdout=open(self.logs_path / 'whisper.log', 'w', encoding='utf-8'),
-                    stderr=open(self.logs_path / 'whisper_error.log', 'w', encoding='utf-8'),
-                    creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0,
-                    env=env
-                )
-                
-                # Whisper 모델 로딩 대기 (최초 실행 시 모델 다운로드 포함 최대 60초)
-                whisper_ready = False
-                for i in range(60):  # 최대 60초 대기
-                    try:
-                        resp = requests.get('http://localhost:5001/', timeout=2)
-                        if resp.ok:
-                            whisper_ready = True
-                            print(f"Whisper server ready after {i+1} seconds")
-                            break
-                    except:
-                        pass
-                    time.sleep(1)
+                whisper_process = self._start_whisper(python_exe, env)
                 
-                if not whisper_ready:
+                # Whisper 모델 로딩 대기 (준비 완료 로그 줄 또는 /readyz 200, 실패 시 즉시 중단)
+                # 최초 실행 시 모델 다운로드 포함 최대 60초
+                started = time.time()
+                status = self.monitor.wait_ready('whisper', 60, whisper_process)
+                if status.state == FAILED:
+                    raise RuntimeError(f"Whisper server failed to start: {status.detail}")
+                if status.state != READY:
                     raise RuntimeError("Whisper server failed to start within 60 seconds")
+                print(f"Whisper server ready after {time.time() - started:.1f} seconds")
                 
                 # Node.js 서버 시작
                 icon.notify("서버 시작 중...", "Lecture Summarizer")
                 nodejs_cmd = [str(node_exe), str(self.server_path / 'server.js')]
-                self.server_processes['nodejs'] = subprocess.Popen(
-                    nodejs_cmd,
-                    stdout=open(self.logs_path / 'nodejs.log', 'w', encoding='utf-8'),
-                    stderr=open(self.logs_path / 'nodejs_error.log', 'w', encoding='utf-8'),
-                    creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0,
-                    cwd=str(self.server_path),
-                    env=env
+                nodejs_process = self._launch(
+                    'nodejs', nodejs_cmd, env, cwd=self.server_path, limits=ResourceLimits.from_env('NODE'),
+                    ready_markers=('Server running on',)
                 )
-                time.sleep(2)
+                status = self.monitor.wait_ready('nodejs', 15, nodejs_process)
                 
-                # 서버 상태 업데이트
-                if self.check_server_status():
+                # 서버 상태 업데이트 (아이콘/메뉴는 모니터 콜백에서 갱신)
+                if status.state == READY and self.check_server_status():
                     self.server_running = True
-                    icon.icon = self.get_icon('running')
-                    # 메뉴 즉시 갱신 (enabled 상태 동기화)
-                    icon.update_menu()
                     return True
                 
                 # 상태 확인 실패 시 재시도
@@ -248,6 +252,109 @@ class LectureSummarizerTray:
         
         return False
     
+    def _whisper_workers(self):
+        """
+        Whisper 워커 프로세스 배치: [(포트, CPU 목록), ...] - 빈 목록이면 5001 포트 단일 프로세스
+        
+        WHISPER_PROCESSES (기본: 코어 수 ÷ 전사 1건당 연산 스레드 WHISPER_CPU_THREADS)개를
+        WHISPER_WORKER_BASE_PORT(5011)부터 실행하고, 각 워커는 겹치지 않는 CPU 구간에 고정한다.
+        """
+        cpu_count = os.cpu_count() or 1
+        cpu_threads = max(1, int(os.getenv('WHISPER_CPU_THREADS', str(min(4, cpu_count)))))
+        processes = int(os.getenv('WHISPER_PROCESSES', str(max(1, cpu_count // cpu_threads))))
+        if processes <= 1:
+            return []
+        base_port = int(os.getenv('WHISPER_WORKER_BASE_PORT', '5011'))
+        return [(base_port + index, cpus) for index, cpus in enumerate(plan_cpu_sets(processes, cpu_count))]
+    
+    def _start_whisper(self, python_exe, env):
+        """
+        Whisper 서버 실행 - 워커가 여러 개면 워커들과 5001 포트의 디스패처(최소 부하 워커로 전달)를 실행
+        
+        Returns:
+            5001 포트에서 응답하는 프로세스 (단일 서버 또는 디스패처)
+        """
+        server_cmd = [str(python_exe), str(self.server_path / 'whisper_server.py')]
+        limits = ResourceLimits.from_env('WHISPER')
+        markers = {'ready_markers': ('Startup complete',), 'failure_markers': ('Startup failed',)}
+        workers = self._whisper_workers()
+        if not workers:
+            return self._launch('whisper', server_cmd, env, limits=limits, **markers)
+        
+        for index, (port, cpus) in enumerate(workers, 1):
+            worker_env = dict(env, WHISPER_PORT=str(port), WHISPER_CPU_AFFINITY=format_cpu_list(cpus),
+                              WHISPER_CPU_THREADS=str(len(cpus)))
+            self._launch(f'whisper-{index}', server_cmd, worker_env, limits=limits, **markers)
+        print("Whisper workers: " + ", ".join(f"{port} (CPU {format_cpu_list(cpus)})" for port, cpus in workers))
+        
+        dispatcher_cmd = [str(python_exe), str(self.server_path / 'whisper_dispatcher.py'),
+                          '--workers', ','.join(str(port) for port, _ in workers)]
+        return self._launch('whisper', dispatcher_cmd, env,
+                            ready_markers=('Dispatch ready',), failure_markers=('Dispatch failed',))
+    
+    def _launch(self, name, cmd, env, cwd=None, limits=None, ready_markers=(), failure_markers=()):
+        """
+        서버 프로세스를 감시 대상으로 실행 - stdout/stderr는 출력 펌프가 로그 저장소로 넘기면서
+        준비 완료 줄을 감지하면 모니터가 즉시 상태를 다시 확인
+        
+        새로 시작할 때는 이전 실행 로그를 순환해 보관하고, 예기치 않게 종료되어
+        supervisor가 다시 실행할 때는 같은 파일에 이어 쓴다 (종료 원인 보존).
+        """
+        def launch(restarts, preexec_fn):
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0,
+                preexec_fn=preexec_fn,
+                cwd=str(cwd) if cwd else None,
+                env=env
+            )
+            # Python 로깅(uvicorn 포함)은 stderr, Node console.log는 stdout으로 출력
+            for stream, log_name in ((process.stdout, name), (process.stderr, f'{name}_error')):
+                self.output_pumps.append(OutputPump(
+                    stream, self.logs, self.logs.channel(log_name, fresh=not restarts), name,
+                    ready_markers=ready_markers, failure_markers=failure_markers,
+                    on_ready=self.monitor.poke
+                ).start())
+            return process
+        
+        return self.supervisor.start(ProcessSpec(name, launch, limits or ResourceLimits()))
+    
+    def status_payload(self):
+        """상태 엔드포인트 응답: 프로세스 감시 상태 + 모니터 캐시"""
+        return {
+            'processes': self.supervisor.stats(),
+            'servers': {
+                name: {
+                    'state': status.state,
+                    'checked_at': status.checked_at,
+                    'latency_ms': status.latency_ms,
+                    'detail': status.detail
+                }
+                for name, status in self.monitor.snapshot().items()
+            }
+        }
+    
+    def _on_process_event(self, name, event, info):
+        """프로세스 종료/재시작/crash loop 알림 (감시 스레드에서 호출)"""
+        label = {'whisper': 'Whisper', 'nodejs': 'Node.js'}.get(name, name.replace('whisper-', 'Whisper 워커 '))
+        print(f"[Supervisor] {name} {event} {info}")
+        icon = self.icon
+        if icon is None or not self.app_running:
+            return
+        if event == 'restarting':
+            icon.notify(
+                f"{label} 서버가 종료되었습니다 (코드 {info['code']}) - {info['delay']:.0f}초 후 재시작",
+                "Lecture Summarizer"
+            )
+        elif event == 'started' and info['restarts'] > 0:
+            self.monitor.expect(60)
+        elif event == 'crashloop':
+            icon.icon = self.get_icon('error')
+            icon.notify(f"{label} 서버가 반복해서 종료되어 재시작을 중단했습니다 - 로그를 확인하세요",
+                        "Lecture Summarizer")
+    
     def start_servers(self, icon, item):
         """서버 시작 (메뉴에서 호출 - 스레드에서 실행하여 UI 블로킹 방지)"""
         if self.check_server_status():
@@ -258,17 +365,8 @@ class LectureSummarizerTray:
         def start_in_thread():
             try:
                 if self._start_servers_internal(icon):
-                    # 서버가 완전히 시작될 때까지 대기
-                    time.sleep(3)
-                    if self.check_server_status():
-                        icon.notify("서버가 시작되었습니다", "Lecture Summarizer")
-                        self.server_running = True
-                        icon.update_menu()  # 메뉴 상태 즉시 갱신
-                    else:
-                        icon.notify("서버 시작 실패 - 로그를 확인하세요", "Lecture Summarizer")
-                        self.server_running = False
-                        icon.update_menu()
-                        self.stop_servers(icon, item)
+                    icon.notify("서버가 시작되었습니다", "Lecture Summarizer")
+                    icon.update_menu()  # 메뉴 상태 즉시 갱신
                 else:
                     icon.notify("서버 시작 실패 - 로그를 확인하세요", "Lecture Summarizer")
                     self.server_running = False
@@ -284,31 +382,23 @@ class LectureSummarizerTray:
     
     def stop_servers(self, icon, item):
         """서버 중지 - 안전한 정리"""
-        if not self.check_server_status() and not any(self.server_processes.values()):
+        if not self.monitor.any_up and not self.supervisor.any_active():
             icon.notify("서버가 실행되지 않았습니다", "Lecture Summarizer")
             return
         
         try:
-            # 프로세스 종료 (안전한 순서: Node → Whisper)
-            for name in ['nodejs', 'whisper']:
-                process = self.server_processes.get(name)
-                if process and process.poll() is None:
-                    try:
-                        process.terminate()
-                        try:
-                            process.wait(timeout=5)
-                        except subprocess.TimeoutExpired:
-                            process.kill()
-                            process.wait(timeout=2)
-                    except Exception as e:
-                        print(f"Error terminating {name}: {e}")
+            # 프로세스 종료 (안전한 순서: Node → Whisper, 재시작하지 않음)
+            self.supervisor.stop_all(timeout=5)
             
             # 포트 강제 정리 (좀비 프로세스)
             self._kill_process_on_port(3000)
             self._kill_process_on_port(5001)
+            for port, _ in self._whisper_workers():
+                self._kill_process_on_port(port)
             
-            self.server_processes = {'whisper': None, 'nodejs': None}
+            self.output_pumps = []
             self.server_running = False
+            self.monitor.expect(10)  # 중지 상태를 빠르게 반영
             
             icon.icon = self.get_icon('idle')
             icon.update_menu()  # 메뉴 상태 즉시 갱신
@@ -318,9 +408,19 @@ class LectureSummarizerTray:
             icon.notify(f"서버 중지 실패: {str(e)}", "Lecture Summarizer")
     
     def show_status(self, icon, item):
-        """서버 상태 확인"""
+        """서버 상태 확인 (모니터 캐시 - 네트워크 대기 없음)"""
+        snapshot = self.monitor.snapshot()
+        lines = []
+        for name, label, url in (('whisper', 'Whisper', 'http://localhost:5001'),
+                                 ('nodejs', 'Node.js', 'http://localhost:3000')):
+            status = snapshot[name]
+            age = f", {status.age:.0f}초 전 확인" if status.age is not None else ""
+            lines.append(f"{label}: {status.state}{age}\n  {url}")
+        
         if self.check_server_status():
-            message = "서버 실행 중\n\nWhisper: http://localhost:5001\nNode.js: http://localhost:3000"
+            message = "서버 실행 중\n\n" + "\n".join(lines)
+        elif self.monitor.any_up:
+            message = "서버 시작 중 / 일부 중지\n\n" + "\n".join(lines)
         else:
             message = "서버 중지됨\n\n우클릭 → '서버 시작'을 클릭하세요"
         
@@ -334,15 +434,8 @@ class LectureSummarizerTray:
                 # 서버가 실행 중이 아니면 먼저 시작
                 if not self.check_server_status():
                     icon.notify("서버를 시작하는 중...", "Lecture Summarizer")
-                    self._start_servers_internal(icon)
-                    
-                    # 서버가 완전히 시작될 때까지 대기 (최대 15초)
-                    for _ in range(15):
-                        time.sleep(1)
-                        if self.check_server_status():
-                            self.server_running = True
-                            icon.update_menu()
-                            break
+                    if self._start_servers_internal(icon):
+                        icon.update_menu()
                     
                     if not self.check_server_status():
                         icon.notify("서버 시작 실패 - 로그를 확인하세요", "Lecture Summarizer")
@@ -372,16 +465,13 @@ class LectureSummarizerTray:
         """트레이 앱 종료 (서버도 함께 종료)"""
         # 종료 플래그 설정
         self.app_running = False
+        self.monitor.stop()
         
         try:
             # 서버 프로세스 종료
-            for name, process in self.server_processes.items():
-                if process and process.poll() is None:
-                    process.terminate()
-                    try:
-                        process.wait(timeout=3)
-                    except subprocess.TimeoutExpired:
-                        process.kill()
+            self.supervisor.stop_all(timeout=3)
+            self.status_server.stop()
+            self.logs.flush()
         except Exception as e:
             pass  # 종료 중 오류 무시
         
@@ -393,6 +483,7 @@ class LectureSummarizerTray:
     
     def create_menu(self):
         """우클릭 메뉴 생성"""
+        import pystray
         return pystray.Menu(
             pystray.MenuItem(
                 "서버 시작",
@@ -424,31 +515,34 @@ class LectureSummarizerTray:
             )
         )
     
-    def update_icon_status(self, icon):
-        """주기적으로 서버 상태 확인 및 아이콘 업데이트"""
-        while self.app_running and icon.visible:
-            try:
-                current_status = self.check_server_status()
-                if current_status != self.server_running:
-                    self.server_running = current_status
-                    icon.icon = self.get_icon('running' if current_status else 'idle')
-                    icon.update_menu()  # 메뉴 상태 동기화
-            except:
-                pass  # 아이콘 업데이트 중 오류 무시
-            time.sleep(5)
+    def _on_status_change(self, snapshot):
+        """서버 상태가 바뀌면 아이콘/메뉴 갱신 (모니터 스레드에서 호출)"""
+        icon = self.icon
+        if icon is None or not self.app_running:
+            return
+        current_status = all(status.state == READY for status in snapshot.values())
+        failed = any(status.state == FAILED for status in snapshot.values())
+        self.server_running = current_status
+        try:
+            icon.icon = self.get_icon('running' if current_status else 'error' if failed else 'idle')
+            icon.update_menu()  # 메뉴 상태 동기화
+        except Exception:
+            pass  # 아이콘 업데이트 중 오류 무시
     
     def run(self):
         """트레이 앱 실행"""
+        import pystray
         icon = pystray.Icon(
             "LectureSummarizer",
             self.get_icon('idle'),
             "Lecture Summarizer",
             menu=self.create_menu()
         )
+        self.icon = icon
         
-        # 상태 모니터링 스레드 시작
-        monitor_thread = Thread(target=self.update_icon_status, args=(icon,), daemon=True)
-        monitor_thread.start()
+        # 상태 모니터링 스레드 시작 (상태 변화 시 _on_status_change 호출)
+        self.monitor.start()
+        self.status_server.start()
         
         icon.run()
 